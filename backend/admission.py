@@ -0,0 +1,148 @@
+"""Admission control and duplicate suppression for contact submissions.
+
+A submission is first looked up in a short-lived cache of recent ones, keyed
+by the sending client plus its ``Idempotency-Key`` or, without a key, by a
+hash of the form fields: a double-click or a bot replaying the same post gets
+the original answer back and never reaches the write path. A key is bound to
+the body it was first used with; reusing it for a different body is an
+``IdempotencyConflict``, never a replay of someone else's submission. New submissions must then take
+a token from the sender's bucket and from the global bucket. Limits can be
+changed at runtime with ``configure``; a rate of 0 turns that bucket off.
+"""
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from typing import Hashable, Optional, Tuple
+
+
+class IdempotencyConflict(Exception):
+    """The Idempotency-Key was already used with a different body."""
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, scope: str, retry_after: int):
+        super().__init__(f"{scope} submission rate exceeded")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class AdmissionLimits:
+    ip_per_minute: float = 5.0
+    ip_burst: float = 5.0
+    global_per_second: float = 20.0
+    global_burst: float = 100.0
+    dedup_seconds: float = 600.0
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Take a token; returns 0 on success, else seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+def submission_key(form: dict, client: str, idempotency_key: Optional[str] = None) -> Tuple[Hashable, str]:
+    """The dedup key of a submission and the hash of its body."""
+    normalized = "\x1f".join(" ".join(str(form.get(f, "")).split()).lower() for f in sorted(form))
+    body_hash = hashlib.sha256(normalized.encode()).hexdigest()
+    if idempotency_key:
+        return ("key", client, idempotency_key), body_hash
+    return ("content", body_hash), body_hash
+
+
+class AdmissionControl:
+    def __init__(self, limits: AdmissionLimits, max_clients: int = 10000, max_recent: int = 10000):
+        self.limits = limits
+        self.max_clients = max_clients
+        self.max_recent = max_recent
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._global: Optional[TokenBucket] = None
+        self._recent: "OrderedDict[Hashable, Tuple[float, str, dict]]" = OrderedDict()
+        self.counters = {"admitted": 0, "deduplicated": 0, "conflicts": 0, "rejected_client": 0, "rejected_global": 0}
+        self.configure()
+
+    def configure(self, **changes) -> AdmissionLimits:
+        """Apply new limits; buckets restart full at the new burst size."""
+        self.limits = replace(self.limits, **changes)
+        self._buckets.clear()
+        self._global = None
+        if self.limits.global_per_second > 0:
+            self._global = TokenBucket(self.limits.global_per_second, self.limits.global_burst, time.monotonic())
+        return self.limits
+
+    def recall(self, key: Hashable, body_hash: str) -> Optional[dict]:
+        """The earlier answer to an identical submission still inside the dedup window.
+
+        Raises ``IdempotencyConflict`` if ``key`` was used for a different body.
+        """
+        entry = self._recent.get(key)
+        if entry is None:
+            return None
+        expires, stored_hash, submission = entry
+        if time.monotonic() >= expires:
+            del self._recent[key]
+            return None
+        if stored_hash != body_hash:
+            self.counters["conflicts"] += 1
+            raise IdempotencyConflict()
+        self.counters["deduplicated"] += 1
+        return submission
+
+    def remember(self, key: Hashable, body_hash: str, submission: dict) -> None:
+        if self.limits.dedup_seconds <= 0:
+            return
+        self._recent[key] = (time.monotonic() + self.limits.dedup_seconds, body_hash, submission)
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.max_recent:
+            self._recent.popitem(last=False)
+
+    def forget(self, key: Hashable) -> None:
+        self._recent.pop(key, None)
+
+    def admit(self, client: str) -> None:
+        """Take a token for ``client`` and one globally, or raise ``AdmissionRejected``."""
+        now = time.monotonic()
+        limits = self.limits
+        bucket = None
+        if limits.ip_per_minute > 0:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = TokenBucket(limits.ip_per_minute / 60, limits.ip_burst, now)
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            self._buckets.move_to_end(client)
+            wait = bucket.take(now)
+            if wait:
+                self.counters["rejected_client"] += 1
+                raise AdmissionRejected("Client", max(1, math.ceil(wait)))
+        if self._global is not None:
+            wait = self._global.take(now)
+            if wait:
+                if bucket is not None:
+                    # Not the sender's fault; give its token back.
+                    bucket.tokens += 1
+                self.counters["rejected_global"] += 1
+                raise AdmissionRejected("Global", max(1, math.ceil(wait)))
+        self.counters["admitted"] += 1
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "limits": asdict(self.limits),
+            "tracked_clients": len(self._buckets),
+            "recent_submissions": len(self._recent),
+        }
+
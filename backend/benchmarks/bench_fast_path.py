@@ -0,0 +1,72 @@
+"""Throughput of the pre-encoded fast path against response_model validation.
+
+Runs the app in-process over httpx's ASGI transport with the seed catalog
+installed directly into the cache, so MongoDB is never contacted and the
+numbers reflect validation and serialization cost only.
+
+    cd backend && python -m benchmarks.bench_fast_path --requests 3000 --concurrency 50
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+# Installing the seed catalog must not publish this process's snapshot file for other workers.
+os.environ["CATALOG_SNAPSHOT_PATH"] = ""
+
+import httpx  # noqa: E402
+
+import server  # noqa: E402
+from seed import load_seed_data  # noqa: E402
+
+PATHS = ["/api/services", "/api/cities"]
+
+
+def install_seed_catalog() -> None:
+    server.catalog.install(load_seed_data())
+
+
+async def measure(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> float:
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int, concurrency: int) -> None:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    install_seed_catalog()
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'path':<20}{'response_model':>18}{'fast path':>14}{'speedup':>10}")
+        for path in PATHS:
+            results = {}
+            for enabled in (False, True):
+                server.encoded_catalog.enabled = enabled
+                first = (await client.get(path)).content
+                await measure(client, path, min(200, requests), concurrency)  # warm up
+                results[enabled] = await measure(client, path, requests, concurrency)
+                if enabled:
+                    assert first == baseline, f"{path}: fast path body differs"
+                baseline = first
+            print(f"{path:<20}{results[False]:>14.0f}/s{results[True]:>10.0f}/s{results[True] / results[False]:>9.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
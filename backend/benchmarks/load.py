@@ -0,0 +1,275 @@
+"""Load benchmark for the API, run in-process against a Mongo stand-in.
+
+The app is started with its real startup hooks and driven through httpx's ASGI
+transport. By default it talks to ``memory_mongo``, an in-memory stand-in for
+Motor, unless a local mongod answers at ``--mongo-url`` (then a scratch
+database is used and dropped before the run; other hosts are refused unless
+``--allow-remote-mongo`` is given); ``--storage embedded`` runs the
+database-less embedded storage instead. Each scenario runs as its own
+phase at the requested concurrency; requests are drawn from a seeded RNG so
+runs are repeatable.
+
+    cd backend && python -m benchmarks.load --requests 2000 --concurrency 50 --output bench.json
+    cd backend && python -m benchmarks.load --baseline bench.json --threshold 0.15
+
+With ``--baseline`` the run exits non-zero if any route's p95 grew, or its
+throughput fell, by more than the threshold.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import urllib.parse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+
+SCRATCH_DB = "pytech_benchmark"
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+# (route label, method, path, json body)
+Request = Tuple[str, str, str, Optional[dict]]
+
+
+def is_local_url(url: str) -> bool:
+    """True when every host in a mongodb:// URL is this machine."""
+    if not url.startswith("mongodb://"):
+        # mongodb+srv:// always resolves to a remote cluster.
+        return False
+    hosts = urllib.parse.urlsplit(url).netloc.rpartition("@")[2]
+    for host in hosts.split(","):
+        name = host[1:].partition("]")[0] if host.startswith("[") else host.partition(":")[0]
+        if name not in LOCAL_HOSTS:
+            return False
+    return True
+
+
+def local_mongod(url: str) -> bool:
+    from pymongo import MongoClient
+    from pymongo.errors import PyMongoError
+
+    try:
+        with MongoClient(url, serverSelectionTimeoutMS=500) as probe:
+            probe.admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+
+
+def boot_app(storage: str, mongo_url: str):
+    """Import ``server`` against the chosen backend; returns the module and the backend used."""
+    if storage == "auto":
+        storage = "local" if local_mongod(mongo_url) else "memory"
+    os.environ["MONGO_URL"] = mongo_url
+    os.environ["DB_NAME"] = SCRATCH_DB
+    # Every run starts from the seed files, not from another process's snapshot.
+    os.environ["CATALOG_SNAPSHOT_PATH"] = ""
+    # All requests come from one client; measure the write path, not the rate limiter.
+    os.environ.setdefault("CONTACT_IP_PER_MINUTE", "0")
+    os.environ.setdefault("CONTACT_GLOBAL_PER_SECOND", "0")
+    if storage == "embedded":
+        os.environ["STORAGE_BACKEND"] = "embedded"
+        os.environ["EMBEDDED_CONTACT_LOG"] = os.path.join(tempfile.mkdtemp(prefix="pytech-bench-"), "contacts.jsonl")
+    elif storage == "local":
+        from pymongo import MongoClient
+
+        with MongoClient(mongo_url) as scratch:
+            scratch.drop_database(SCRATCH_DB)
+    else:
+        import motor.motor_asyncio
+        from benchmarks.memory_mongo import MemoryClient
+
+        motor.motor_asyncio.AsyncIOMotorClient = MemoryClient
+
+    import server
+
+    return server, storage
+
+
+def build_scenarios(catalog) -> Dict[str, Callable[[random.Random], Request]]:
+    services = [s["slug"] for s in catalog.services]
+    cities = [c["slug"] for c in catalog.cities]
+    home_params = "services=id,slug,name,short_description&cities=id,slug,name,state"
+
+    def service_city(rng):
+        return ("GET /api/service-city/{service_slug}/{city_slug}", "GET",
+                f"/api/service-city/{rng.choice(services)}/{rng.choice(cities)}", None)
+
+    def home(rng):
+        if rng.random() < 0.5:
+            return "GET /api/home", "GET", "/api/home", None
+        return "GET /api/home?projection", "GET", f"/api/home?{home_params}", None
+
+    def catalog_reads(rng):
+        return rng.choice([
+            ("GET /api/services", "GET", "/api/services", None),
+            ("GET /api/cities", "GET", "/api/cities", None),
+            ("GET /api/testimonials", "GET", "/api/testimonials", None),
+            ("GET /api/portfolio", "GET", "/api/portfolio", None),
+            ("GET /api/services/{service_slug}", "GET", f"/api/services/{rng.choice(services)}", None),
+            ("GET /api/cities/{city_slug}", "GET", f"/api/cities/{rng.choice(cities)}", None),
+        ])
+
+    def sitemap(rng):
+        return rng.choice([
+            ("GET /api/sitemap.xml", "GET", "/api/sitemap.xml", None),
+            ("GET /api/sitemap-{shard}.xml.gz", "GET", "/api/sitemap-0.xml.gz", None),
+            ("GET /api/sitemap-data", "GET", "/api/sitemap-data", None),
+        ])
+
+    def contact_burst(rng):
+        n = rng.randrange(1_000_000)
+        return ("POST /api/contact", "POST", "/api/contact", {
+            "name": f"Load Test {n}",
+            "email": f"load{n}@example.com",
+            "phone": "+91 90000 00000",
+            "city": rng.choice(cities),
+            "service": rng.choice(services),
+            "message": "Benchmark submission",
+        })
+
+    return {
+        "service_city": service_city,
+        "home": home,
+        "catalog": catalog_reads,
+        "sitemap": sitemap,
+        "contact_burst": contact_burst,
+    }
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(q * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+async def run_phase(client: httpx.AsyncClient, make: Callable[[random.Random], Request],
+                    rng: random.Random, requests: int, concurrency: int) -> Dict[str, dict]:
+    plan = [make(rng) for _ in range(requests)]
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    remaining = iter(plan)
+
+    async def worker():
+        for route, method, path, body in remaining:
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.setdefault(route, []).append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors[route] = errors.get(route, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    results = {}
+    for route, values in latencies.items():
+        values.sort()
+        results[route] = {
+            "requests": len(values),
+            "errors": errors.get(route, 0),
+            # Routes share the phase's wall clock, so this is their share of its throughput.
+            "rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        }
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    regressions = []
+    for key, current in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        if before["p95_ms"] and current["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{key}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms")
+        if before["rps"] and current["rps"] < before["rps"] * (1 - threshold):
+            regressions.append(f"{key}: throughput {before['rps']}/s -> {current['rps']}/s")
+    return regressions
+
+
+async def main(args) -> int:
+    logging.basicConfig(level=logging.WARNING)
+    server, backend = boot_app(args.storage, args.mongo_url)
+    # Only the numbers should reach the terminal.
+    for name in ("httpx", "server", "catalog", "pages", "seed", "indexes", "notifications", "contact_queue", "metrics", "storage", "admission"):
+        logging.getLogger(name).setLevel(logging.ERROR)
+
+    await server.app.router.startup()
+    try:
+        scenarios = build_scenarios(await server.catalog.get())
+        selected = args.scenario or list(scenarios)
+        rng = random.Random(args.seed)
+        results: Dict[str, dict] = {}
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in selected:
+                await run_phase(client, scenarios[name], random.Random(args.seed), args.warmup, args.concurrency)
+                for route, stats in (await run_phase(client, scenarios[name], rng, args.requests, args.concurrency)).items():
+                    results[f"{name} {route}"] = stats
+    finally:
+        await server.app.router.shutdown()
+
+    print(f"{'scenario / route':<64}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'err':>6}")
+    for key, stats in results.items():
+        print(f"{key:<64}{stats['rps']:>9.0f}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['errors']:>6}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "backend": backend,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "seed": args.seed,
+                "python": platform.python_version(),
+                "written_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            },
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions over {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=200, help="unmeasured requests per scenario")
+    parser.add_argument("--scenario", action="append",
+                        choices=["service_city", "home", "catalog", "sitemap", "contact_burst"],
+                        help="run only these scenarios (repeatable)")
+    parser.add_argument("--storage", choices=["auto", "memory", "local", "embedded"], default="auto")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017",
+                        help="mongod to benchmark against; the scratch database on it is dropped")
+    parser.add_argument("--allow-remote-mongo", action="store_true",
+                        help="allow a --mongo-url that is not on this machine")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed regression, e.g. 0.10 for 10%%")
+    args = parser.parse_args()
+    if args.storage in ("auto", "local") and not args.allow_remote_mongo and not is_local_url(args.mongo_url):
+        parser.error(f"refusing to drop {SCRATCH_DB} on a non-local server ({args.mongo_url}); pass --allow-remote-mongo")
+    sys.exit(asyncio.run(main(args)))
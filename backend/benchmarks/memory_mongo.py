@@ -0,0 +1,480 @@
+"""In-memory stand-in for the subset of Motor that the backend uses.
+
+It is not a MongoDB emulator: filters, updates and projections cover only the
+operators the app and its tools issue. Collections live in plain lists, so a
+benchmark run measures the application rather than the database.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+_MISSING = object()
+
+
+def _get(doc: dict, path: str):
+    value: Any = doc
+    for part in path.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return _MISSING
+    return value
+
+
+def _set(doc: dict, path: str, value) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _compare(value, op: str, operand) -> bool:
+    if op == "$eq":
+        return value == operand or (isinstance(value, list) and operand in value)
+    if op == "$ne":
+        return not _compare(value, "$eq", operand)
+    if op == "$in":
+        if isinstance(value, list):
+            return any(v in operand for v in value)
+        return value in operand
+    if op == "$nin":
+        return not _compare(value, "$in", operand)
+    if op == "$exists":
+        return (value is not _MISSING) == bool(operand)
+    if op == "$regex":
+        return isinstance(value, str) and re.search(operand, value) is not None
+    if value is _MISSING or value is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > operand
+        if op == "$gte":
+            return value >= operand
+        if op == "$lt":
+            return value < operand
+        if op == "$lte":
+            return value <= operand
+    except TypeError:
+        return False
+    raise OperationFailure(f"unsupported query operator {op}")
+
+
+def matches(doc: dict, query: Optional[dict]) -> bool:
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+            continue
+        if key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+            continue
+        value = _get(doc, key)
+        if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+            if not all(_compare(value, op, operand) for op, operand in condition.items()):
+                return False
+        elif not _compare(value, "$eq", condition):
+            return False
+    return True
+
+
+def project(doc: dict, projection: Optional[dict]) -> dict:
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    include_id = projection.get("_id", 1)
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    if fields and all(fields.values()):
+        result = {}
+        for key in fields:
+            value = _get(doc, key)
+            if value is not _MISSING:
+                _set(result, key, value)
+        if include_id and "_id" in doc:
+            result["_id"] = doc["_id"]
+        return result
+    for key in fields:
+        doc.pop(key, None)
+    if not include_id:
+        doc.pop("_id", None)
+    return doc
+
+
+def _sort_key(value):
+    # Order None/missing first, then numbers, then strings, like MongoDB's BSON order.
+    if value is _MISSING or value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, str(value))
+
+
+def apply_update(doc: dict, update: dict, inserting: bool = False) -> None:
+    for op, fields in update.items():
+        if op == "$set":
+            for key, value in fields.items():
+                _set(doc, key, copy.deepcopy(value))
+        elif op == "$setOnInsert":
+            if inserting:
+                for key, value in fields.items():
+                    _set(doc, key, copy.deepcopy(value))
+        elif op == "$inc":
+            for key, value in fields.items():
+                current = _get(doc, key)
+                _set(doc, key, (0 if current is _MISSING else current) + value)
+        elif op == "$unset":
+            for key in fields:
+                parts = key.split(".")
+                target = doc
+                for part in parts[:-1]:
+                    target = target.get(part, {})
+                target.pop(parts[-1], None)
+        elif op == "$max":
+            for key, value in fields.items():
+                current = _get(doc, key)
+                if current is _MISSING or value > current:
+                    _set(doc, key, value)
+        elif op == "$min":
+            for key, value in fields.items():
+                current = _get(doc, key)
+                if current is _MISSING or value < current:
+                    _set(doc, key, value)
+        else:
+            raise OperationFailure(f"unsupported update operator {op}")
+
+
+class MemoryCursor:
+    def __init__(self, collection: "MemoryCollection", query, projection):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort: List[tuple] = []
+        self._skip = 0
+        self._limit = 0
+        self._results: Optional[Iterable[dict]] = None
+
+    def sort(self, key, direction=None):
+        self._sort = [(key, direction or 1)] if isinstance(key, str) else list(key)
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int):
+        return self
+
+    def _materialize(self) -> List[dict]:
+        docs = [d for d in self._collection._docs if matches(d, self._query)]
+        for key, direction in reversed(self._sort):
+            docs.sort(key=lambda d: _sort_key(_get(d, key)), reverse=direction == -1)
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[: self._limit]
+        return [project(d, self._projection) for d in docs]
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        self._collection._db._count(self._collection.name, "find")
+        await asyncio.sleep(0)
+        docs = self._materialize()
+        return docs if length is None else docs[:length]
+
+    def __aiter__(self):
+        self._collection._db._count(self._collection.name, "find")
+        self._results = iter(self._materialize())
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._results)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class MemoryCollection:
+    def __init__(self, db: "MemoryDatabase", name: str):
+        self._db = db
+        self.name = name
+        self._docs: List[dict] = []
+        self._indexes: Dict[str, dict] = {"_id_": {"key": [("_id", 1)], "v": 2}}
+
+    def _unique_keys(self) -> List[List[str]]:
+        return [[k for k, _ in spec["key"]] for spec in self._indexes.values() if spec.get("unique")]
+
+    def _check_unique(self, doc: dict, ignore: Optional[dict] = None) -> None:
+        for fields in [["_id"]] + self._unique_keys():
+            value = tuple(_get(doc, f) for f in fields)
+            if any(v is _MISSING for v in value):
+                continue
+            for other in self._docs:
+                if other is not ignore and tuple(_get(other, f) for f in fields) == value:
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} dup key: {value}")
+
+    def _insert(self, doc: dict) -> Any:
+        doc.setdefault("_id", ObjectId())
+        stored = copy.deepcopy(doc)
+        self._check_unique(stored)
+        self._docs.append(stored)
+        return doc["_id"]
+
+    def find(self, query=None, projection=None, **kwargs) -> MemoryCursor:
+        cursor = MemoryCursor(self, query, projection)
+        if kwargs.get("sort"):
+            cursor.sort(kwargs["sort"])
+        if kwargs.get("limit"):
+            cursor.limit(kwargs["limit"])
+        return cursor
+
+    async def find_one(self, query=None, projection=None, **kwargs):
+        self._db._count(self.name, "find_one")
+        await asyncio.sleep(0)
+        cursor = MemoryCursor(self, query, projection)
+        if kwargs.get("sort"):
+            cursor.sort(kwargs["sort"])
+        docs = cursor.limit(1)._materialize()
+        return docs[0] if docs else None
+
+    async def insert_one(self, doc: dict) -> InsertOneResult:
+        self._db._count(self.name, "insert_one")
+        await asyncio.sleep(0)
+        return InsertOneResult(self._insert(doc), True)
+
+    async def insert_many(self, docs: List[dict], ordered: bool = True) -> InsertManyResult:
+        self._db._count(self.name, "insert_many")
+        await asyncio.sleep(0)
+        ids, errors = [], []
+        for index, doc in enumerate(docs):
+            try:
+                ids.append(self._insert(doc))
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(ids)})
+        return InsertManyResult(ids, True)
+
+    async def count_documents(self, query: dict, **kwargs) -> int:
+        self._db._count(self.name, "count_documents")
+        await asyncio.sleep(0)
+        return sum(1 for d in self._docs if matches(d, query))
+
+    async def estimated_document_count(self) -> int:
+        return len(self._docs)
+
+    def _upsert_seed(self, query: dict) -> dict:
+        doc = {}
+        for key, value in query.items():
+            if not key.startswith("$") and not (isinstance(value, dict) and any(k.startswith("$") for k in value)):
+                _set(doc, key, copy.deepcopy(value))
+        return doc
+
+    def _update(self, query, update, upsert=False, many=False) -> UpdateResult:
+        matched = [d for d in self._docs if matches(d, query)]
+        if not many:
+            matched = matched[:1]
+        for doc in matched:
+            candidate = copy.deepcopy(doc)
+            apply_update(candidate, update)
+            self._check_unique(candidate, ignore=doc)
+            doc.clear()
+            doc.update(candidate)
+        upserted_id = None
+        if not matched and upsert:
+            doc = self._upsert_seed(query)
+            apply_update(doc, update, inserting=True)
+            upserted_id = self._insert(doc)
+        return UpdateResult(
+            {"n": len(matched) or (1 if upserted_id is not None else 0), "nModified": len(matched),
+             "upserted": upserted_id},
+            True,
+        )
+
+    async def update_one(self, query, update, upsert=False, **kwargs) -> UpdateResult:
+        self._db._count(self.name, "update")
+        await asyncio.sleep(0)
+        return self._update(query, update, upsert=upsert)
+
+    async def update_many(self, query, update, upsert=False, **kwargs) -> UpdateResult:
+        self._db._count(self.name, "update")
+        await asyncio.sleep(0)
+        return self._update(query, update, upsert=upsert, many=True)
+
+    async def replace_one(self, query, replacement, upsert=False, **kwargs) -> UpdateResult:
+        self._db._count(self.name, "update")
+        await asyncio.sleep(0)
+        for doc in self._docs:
+            if matches(doc, query):
+                _id = doc["_id"]
+                doc.clear()
+                doc.update(copy.deepcopy(replacement), _id=_id)
+                return UpdateResult({"n": 1, "nModified": 1}, True)
+        if upsert:
+            doc = {**self._upsert_seed(query), **copy.deepcopy(replacement)}
+            return UpdateResult({"n": 1, "nModified": 0, "upserted": self._insert(doc)}, True)
+        return UpdateResult({"n": 0, "nModified": 0}, True)
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False,
+                                  return_document=ReturnDocument.BEFORE, sort=None, **kwargs):
+        self._db._count(self.name, "findAndModify")
+        await asyncio.sleep(0)
+        docs = [d for d in self._docs if matches(d, query)]
+        for key, direction in reversed(sort or []):
+            docs.sort(key=lambda d: _sort_key(_get(d, key)), reverse=direction == -1)
+        if docs:
+            doc = docs[0]
+            before = copy.deepcopy(doc)
+            apply_update(doc, update)
+            return project(doc if return_document else before, projection)
+        if not upsert:
+            return None
+        doc = self._upsert_seed(query)
+        apply_update(doc, update, inserting=True)
+        self._insert(doc)
+        return project(doc, projection) if return_document else None
+
+    async def delete_one(self, query) -> DeleteResult:
+        self._db._count(self.name, "delete")
+        for doc in self._docs:
+            if matches(doc, query):
+                self._docs.remove(doc)
+                return DeleteResult({"n": 1}, True)
+        return DeleteResult({"n": 0}, True)
+
+    async def delete_many(self, query) -> DeleteResult:
+        self._db._count(self.name, "delete")
+        before = len(self._docs)
+        self._docs = [d for d in self._docs if not matches(d, query)]
+        return DeleteResult({"n": before - len(self._docs)}, True)
+
+    async def bulk_write(self, requests: list, ordered: bool = True) -> BulkWriteResult:
+        self._db._count(self.name, "bulk_write")
+        await asyncio.sleep(0)
+        counts = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nUpserted": 0, "upserted": []}
+        for request in requests:
+            name = type(request).__name__
+            doc = request._doc
+            if name == "InsertOne":
+                self._insert(doc)
+                counts["nInserted"] += 1
+                continue
+            query = request._filter
+            upsert = bool(request._upsert)
+            if name == "ReplaceOne":
+                result = await self.replace_one(query, doc, upsert=upsert)
+            elif name in ("UpdateOne", "UpdateMany"):
+                result = self._update(query, doc, upsert=upsert, many=name == "UpdateMany")
+            else:
+                raise OperationFailure(f"unsupported bulk operation {name}")
+            counts["nMatched"] += result.matched_count
+            counts["nModified"] += result.modified_count
+            if result.upserted_id is not None:
+                counts["nUpserted"] += 1
+        return BulkWriteResult(counts, True)
+
+    async def create_index(self, keys, name=None, **options) -> str:
+        keys = [(keys, 1)] if isinstance(keys, str) else list(keys)
+        name = name or "_".join(f"{k}_{d}" for k, d in keys)
+        self._indexes[name] = {"key": keys, "v": 2, **options}
+        return name
+
+    async def create_indexes(self, models) -> List[str]:
+        names = []
+        for model in models:
+            spec = dict(model.document)
+            keys = list(spec.pop("key").items())
+            names.append(await self.create_index(keys, **spec))
+        return names
+
+    async def drop_index(self, name: str) -> None:
+        if name not in self._indexes:
+            raise OperationFailure(f"index not found with name [{name}]", code=27)
+        del self._indexes[name]
+
+    def list_indexes(self):
+        collection = self
+
+        class _IndexCursor:
+            async def to_list(self, length=None):
+                return [{"name": n, **{**spec, "key": dict(spec["key"])}} for n, spec in collection._indexes.items()]
+
+        return _IndexCursor()
+
+    async def index_information(self) -> dict:
+        return copy.deepcopy(self._indexes)
+
+    def aggregate(self, pipeline: list, **kwargs):
+        raise OperationFailure("aggregate is not supported by the in-memory store")
+
+
+class MemoryDatabase:
+    def __init__(self, name: str = "memory"):
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+        self.operations: Dict[str, int] = {}
+
+    def _count(self, collection: str, op: str) -> None:
+        key = f"{collection}.{op}"
+        self.operations[key] = self.operations.get(key, 0) + 1
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_collection(self, name: str) -> MemoryCollection:
+        return self[name]
+
+    async def list_collection_names(self) -> List[str]:
+        return list(self._collections)
+
+    async def command(self, name, **kwargs):
+        if name == "ping":
+            return {"ok": 1}
+        if name == "dbHash":
+            collections = {}
+            for coll in kwargs.get("collections") or list(self._collections):
+                docs = [{k: v for k, v in d.items() if k != "_id"} for d in self[coll]._docs]
+                encoded = json.dumps(docs, sort_keys=True, default=str).encode()
+                collections[coll] = hashlib.md5(encoded).hexdigest()
+            encoded = json.dumps(collections, sort_keys=True).encode()
+            return {"collections": collections, "md5": hashlib.md5(encoded).hexdigest(), "ok": 1}
+        raise OperationFailure(f"no such command: '{name}'", code=59)
+
+    def watch(self, *args, **kwargs):
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+
+class MemoryClient:
+    def __init__(self, *args, **kwargs):
+        self._databases: Dict[str, MemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(name)
+        return self._databases[name]
+
+    def get_database(self, name: str) -> MemoryDatabase:
+        return self[name]
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,248 @@
+"""In-process read-through cache for the catalog collections.
+
+Services, cities, testimonials and portfolio only change when someone re-seeds
+or edits them, so they are loaded once into an immutable ``CatalogSnapshot``
+and served from memory. A snapshot is replaced when its TTL expires or when a
+change is observed through a MongoDB change stream (or, on a standalone
+mongod, by polling ``dbHash``). Embedded storage has no database to watch, so
+only the TTL applies there.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+CATALOG_COLLECTIONS = ("services", "cities", "testimonials", "portfolio")
+
+
+def content_digest(value) -> str:
+    """Stable sha256 of a JSON-compatible value."""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: int
+    digest: str
+    digests: Mapping[str, str]
+    services: List[dict]
+    cities: List[dict]
+    testimonials: List[dict]
+    portfolio: List[dict]
+    services_by_slug: Mapping[str, dict]
+    cities_by_slug: Mapping[str, dict]
+    changed_at: float
+
+    @classmethod
+    def build(cls, version: int, collections: Dict[str, List[dict]], changed_at: float) -> "CatalogSnapshot":
+        digests = {name: content_digest(collections[name]) for name in CATALOG_COLLECTIONS}
+        return cls(
+            version=version,
+            digest=content_digest(digests),
+            digests=MappingProxyType(digests),
+            services=collections["services"],
+            cities=collections["cities"],
+            testimonials=collections["testimonials"],
+            portfolio=collections["portfolio"],
+            services_by_slug=MappingProxyType({s["slug"]: s for s in collections["services"]}),
+            cities_by_slug=MappingProxyType({c["slug"]: c for c in collections["cities"]}),
+            changed_at=changed_at,
+        )
+
+
+SnapshotListener = Callable[[Optional[CatalogSnapshot], CatalogSnapshot], None]
+
+
+class CatalogCache:
+    """Versioned in-memory copy of the catalog collections.
+
+    ``invalidation`` is one of ``"ttl"`` (expire after ``ttl`` seconds only),
+    ``"change_stream"`` (watch the database, falling back to polling when change
+    streams are unsupported) or ``"poll"``. The TTL stays active as a backstop in
+    every mode; ``ttl=0`` disables it.
+    """
+
+    def __init__(self, storage, ttl: float = 300.0, invalidation: str = "change_stream", poll_interval: float = 30.0,
+                 debounce: float = 0.5):
+        if invalidation not in ("ttl", "change_stream", "poll"):
+            raise ValueError(f"Unknown catalog invalidation mode: {invalidation}")
+        if storage.db is None and invalidation != "ttl":
+            raise ValueError(f"Catalog invalidation '{invalidation}' needs MongoDB; {storage.name} storage supports 'ttl' only")
+        self._storage = storage
+        self._db = storage.db
+        self.ttl = ttl
+        self.invalidation = invalidation
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._watcher: Optional[asyncio.Task] = None
+        self._listeners: List[SnapshotListener] = []
+        self._fingerprint: Optional[str] = None
+        self._watching: Optional[str] = None
+        # Requests that miss together share one reload instead of queueing on the lock.
+        self._flight = SingleFlight()
+        self.counters = {"hits": 0, "misses": 0, "reloads": 0, "changes": 0, "coalesced": 0, "errors": 0}
+
+    @property
+    def snapshot(self) -> Optional[CatalogSnapshot]:
+        return self._snapshot
+
+    def subscribe(self, listener: SnapshotListener) -> None:
+        """Call ``listener(old, new)`` whenever the catalog content changes."""
+        self._listeners.append(listener)
+
+    def _fresh(self) -> bool:
+        return self._snapshot is not None and (not self.ttl or time.monotonic() < self._expires_at)
+
+    async def get(self) -> CatalogSnapshot:
+        if self._fresh():
+            self.counters["hits"] += 1
+            return self._snapshot
+        self.counters["misses"] += 1
+        return await self._flight.do("refresh", self.refresh)
+
+    async def refresh(self, force: bool = False) -> CatalogSnapshot:
+        async with self._lock:
+            # Another request may have reloaded while we waited for the lock.
+            if not force and self._fresh():
+                return self._snapshot
+            try:
+                collections = await self._storage.load_catalog()
+            except (PyMongoError, OSError) as e:
+                self.counters["errors"] += 1
+                if self._snapshot is None:
+                    raise
+                logger.error(f"Catalog reload failed, serving version {self._snapshot.version}: {e}")
+                self._expires_at = time.monotonic() + min(self.ttl or self.poll_interval, 5.0)
+                return self._snapshot
+            self.counters["reloads"] += 1
+            self._expires_at = time.monotonic() + self.ttl
+            self._apply(collections)
+            return self._snapshot
+
+    def install(self, collections: Dict[str, List[dict]]) -> CatalogSnapshot:
+        """Serve ``collections`` as if they had just been loaded from storage."""
+        self._expires_at = time.monotonic() + self.ttl
+        self._apply(collections)
+        return self._snapshot
+
+    def _apply(self, collections: Dict[str, List[dict]]) -> None:
+        old = self._snapshot
+        version = old.version + 1 if old else 1
+        new = CatalogSnapshot.build(version, collections, time.time())
+        if old is not None and old.digest == new.digest:
+            return
+        self._snapshot = new
+        self.counters["changes"] += 1
+        logger.info(f"Catalog loaded: version {new.version} ({new.digest[:12]})")
+        for listener in self._listeners:
+            try:
+                listener(old, new)
+            except Exception:
+                logger.exception("Catalog listener failed")
+
+    async def start(self, initial: Optional[Dict[str, List[dict]]] = None) -> None:
+        """Load the catalog (from ``initial`` if given, else storage) and begin invalidation."""
+        if initial is not None:
+            self.install(initial)
+        else:
+            await self.refresh(force=True)
+        if self.invalidation == "change_stream":
+            self._watcher = asyncio.create_task(self._watch_changes())
+        elif self.invalidation == "poll":
+            self._watcher = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._watcher:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+            self._watching = None
+
+    async def _watch_changes(self) -> None:
+        self._watching = "change_stream"
+        pipeline = [{"$match": {"ns.coll": {"$in": list(CATALOG_COLLECTIONS)}}}]
+        while True:
+            try:
+                async with self._db.watch(pipeline) as stream:
+                    async for _ in stream:
+                        await self._settle(stream)
+                        await self.refresh(force=True)
+            except OperationFailure as e:
+                # Standalone mongod has no oplog, so change streams are rejected.
+                logger.info(f"Change streams unavailable ({e.code}), polling the catalog instead")
+                await self._poll()
+                return
+            except PyMongoError as e:
+                self.counters["errors"] += 1
+                logger.warning(f"Catalog change stream interrupted: {e}")
+                await asyncio.sleep(self.poll_interval)
+                await self.refresh(force=True)
+
+    async def _settle(self, stream) -> None:
+        """Swallow the events that follow one another, so a bulk write costs one reload.
+
+        Waits until ``debounce`` seconds pass without a new event, but no longer
+        than ten windows in all so a steady trickle of edits still gets applied.
+        """
+        if not self.debounce:
+            return
+        deadline = time.monotonic() + self.debounce * 10
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.debounce)
+            drained = 0
+            while await stream.try_next() is not None:
+                drained += 1
+            if not drained:
+                return
+            self.counters["coalesced"] += drained
+
+    async def _poll(self) -> None:
+        self._watching = "poll"
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                fingerprint = await self._db_hash()
+                if fingerprint is None or fingerprint != self._fingerprint:
+                    self._fingerprint = fingerprint
+                    await self.refresh(force=True)
+            except PyMongoError as e:
+                self.counters["errors"] += 1
+                logger.warning(f"Catalog poll failed: {e}")
+
+    async def _db_hash(self) -> Optional[str]:
+        """Server-side hash of the catalog collections, or None if not permitted."""
+        try:
+            result = await self._db.command("dbHash", collections=list(CATALOG_COLLECTIONS))
+        except OperationFailure:
+            return None
+        return result.get("md5")
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            **self.counters,
+            "version": snapshot.version if snapshot else None,
+            "digest": snapshot.digest if snapshot else None,
+            "invalidation": self.invalidation,
+            "watching": self._watching,
+            "ttl": self.ttl,
+            "debounce": self.debounce,
+            "single_flight": self._flight.stats(),
+        }
@@ -0,0 +1,210 @@
+"""Memory-mapped catalog snapshot shared by the workers on a node.
+
+Layout: an 8-byte magic, an 8-byte little-endian header length, a JSON header,
+then the segments it indexes by ``[offset, length]``: one JSON array per
+catalog collection and the pre-serialized JSON of every service-city page.
+
+Workers open the file with ``mmap``, so the page bytes live once in the kernel
+page cache instead of once per worker, and a freshly started worker can serve
+the catalog before it has talked to MongoDB. Files are replaced atomically, and
+mappings of a replaced file stay valid until they are closed, which happens a
+grace period after they stop being current.
+"""
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from catalog import CATALOG_COLLECTIONS, CatalogSnapshot
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+MAGIC = b"PTCATv1\n"
+_HEADER_LENGTH = struct.Struct("<Q")
+
+logger = logging.getLogger(__name__)
+
+PageKey = Tuple[str, str]
+
+
+def _loads(view: memoryview):
+    # orjson parses straight out of the mapping; json needs a bytes copy.
+    return orjson.loads(view) if orjson is not None else json.loads(bytes(view))
+
+
+def write_catalog_snapshot(path: Path, snapshot: CatalogSnapshot, pages: Mapping[PageKey, bytes]) -> None:
+    segments: List[bytes] = []
+    index: Dict[str, list] = {}
+    page_index: Dict[str, list] = {}
+    offset = 0
+
+    def add(body: bytes) -> list:
+        nonlocal offset
+        segments.append(body)
+        entry = [offset, len(body)]
+        offset += len(body)
+        return entry
+
+    for name in CATALOG_COLLECTIONS:
+        index[name] = add(json.dumps(getattr(snapshot, name), separators=(",", ":"), default=str).encode())
+    for (service_slug, city_slug), body in pages.items():
+        page_index[f"{service_slug}/{city_slug}"] = add(body)
+
+    header = json.dumps({
+        "digest": snapshot.digest,
+        "catalog_version": snapshot.version,
+        "written_at": time.time(),
+        "collections": index,
+        "pages": page_index,
+    }, separators=(",", ":")).encode()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(_HEADER_LENGTH.pack(len(header)))
+            f.write(header)
+            for body in segments:
+                f.write(body)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class MappedPages(Mapping[PageKey, bytes]):
+    """Read-only page map whose values are sliced out of the mapping on demand."""
+
+    def __init__(self, mapped: mmap.mmap, base: int, index: Dict[str, list]):
+        self._mapped = mapped
+        self._base = base
+        self._index = {tuple(key.split("/", 1)): entry for key, entry in index.items()}
+
+    def __getitem__(self, key: PageKey) -> bytes:
+        offset, length = self._index[key]
+        start = self._base + offset
+        return self._mapped[start:start + length]
+
+    def __iter__(self) -> Iterator[PageKey]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class MappedCatalogSnapshot:
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mapped[:len(MAGIC)] != MAGIC:
+            self._mapped.close()
+            raise ValueError(f"{path} is not a catalog snapshot")
+        (header_length,) = _HEADER_LENGTH.unpack_from(self._mapped, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LENGTH.size
+        self._view = memoryview(self._mapped)
+        self.header = _loads(self._view[header_start:header_start + header_length])
+        self._base = header_start + header_length
+        self.digest: str = self.header["digest"]
+        self.written_at: float = self.header["written_at"]
+        self.pages = MappedPages(self._mapped, self._base, self.header["pages"])
+
+    @classmethod
+    def open(cls, path: Path, max_age: Optional[float] = None) -> Optional["MappedCatalogSnapshot"]:
+        """The snapshot at ``path``, or None if it is missing, unreadable or older than ``max_age``."""
+        try:
+            snapshot = cls(path)
+        except (OSError, ValueError):
+            return None
+        if max_age is not None and time.time() - snapshot.written_at > max_age:
+            snapshot.close()
+            return None
+        return snapshot
+
+    def close(self) -> None:
+        self._view.release()
+        self._mapped.close()
+
+    def collections(self) -> Dict[str, List[dict]]:
+        result = {}
+        for name, (offset, length) in self.header["collections"].items():
+            start = self._base + offset
+            result[name] = _loads(self._view[start:start + length])
+        return result
+
+
+class CatalogSnapshotFile:
+    """Loads the node's snapshot at startup and republishes it when the catalog changes."""
+
+    def __init__(self, path: Path, pages, max_age: Optional[float] = None, retire_after: float = 60.0):
+        self.path = Path(path)
+        self._pages = pages
+        self.max_age = max_age
+        self.retire_after = retire_after
+        self.current: Optional[MappedCatalogSnapshot] = None
+        self._retiring = 0
+        self.counters = {"loads": 0, "writes": 0, "closed": 0}
+
+    def load(self) -> Optional[MappedCatalogSnapshot]:
+        """A fresh snapshot to start from; its pages are handed to the page store."""
+        self.current = MappedCatalogSnapshot.open(self.path, self.max_age)
+        if self.current is not None:
+            self.counters["loads"] += 1
+            self._pages.attach(self.current.pages, self.current.digest)
+        return self.current
+
+    def publish(self, old: Optional[CatalogSnapshot], new: CatalogSnapshot) -> None:
+        """Catalog listener (after the page store): write the snapshot unless another worker already did."""
+        if self.current is None or self.current.digest != new.digest:
+            on_disk = MappedCatalogSnapshot.open(self.path)
+            if on_disk is None or on_disk.digest != new.digest:
+                if on_disk is not None:
+                    on_disk.close()
+                write_catalog_snapshot(self.path, new, self._pages.pages)
+                self.counters["writes"] += 1
+                on_disk = MappedCatalogSnapshot.open(self.path)
+            previous, self.current = self.current, on_disk
+            self._pages.attach(self.current.pages, self.current.digest)
+            if previous is not None:
+                self._retire(previous)
+            return
+        self._pages.attach(self.current.pages, self.current.digest)
+
+    def _retire(self, mapping: MappedCatalogSnapshot) -> None:
+        """Close a replaced mapping once requests that started before the swap are done with it."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._close(mapping)
+            return
+        self._retiring += 1
+        loop.call_later(self.retire_after, self._close, mapping, True)
+
+    def _close(self, mapping: MappedCatalogSnapshot, retiring: bool = False) -> None:
+        if retiring:
+            self._retiring -= 1
+        try:
+            mapping.close()
+        except BufferError:
+            # Still exported somewhere; the mapping is freed when that goes away.
+            logger.warning(f"Catalog snapshot mapping {mapping.digest[:12]} still in use, not closed")
+            return
+        self.counters["closed"] += 1
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "path": str(self.path),
+            "retiring": self._retiring,
+            "digest": self.current.digest if self.current else None,
+            "written_at": self.current.written_at if self.current else None,
+        }
@@ -0,0 +1,234 @@
+"""Response compression negotiated from Accept-Encoding (gzip, and brotli when installed).
+
+Catalog routes answer with the same bytes until the catalog changes, so
+``CompressionMiddleware`` compresses a complete response that carries an ETag
+once, at the highest quality and in a worker thread, and keeps the result in
+``CompressedVariants`` keyed by ETag and encoding; later requests get the
+stored bytes. The cache is emptied on every catalog version. Routes build
+their ETags from the parameters they recognise, so unrelated query parameters
+do not create new variants; paths whose ETags follow free-form input (search)
+are not cached. Everything else above ``minimum_size``, and streamed
+responses, are compressed on the fly at a cheap level.
+
+Compressed responses get an encoding-specific ETag (``"<etag>-gzip"``) as
+RFC 9110 requires; ``http_cache`` treats it as a match for the identity ETag.
+"""
+import asyncio
+import gzip
+import zlib
+from collections import OrderedDict
+from functools import partial
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from catalog import CatalogSnapshot
+from http_cache import encoded_etag
+from singleflight import SingleFlight
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Server preference when the client weighs several encodings equally.
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/xml", "application/javascript")
+
+VariantKey = Tuple[str, str]
+
+
+def negotiate(accept_encoding: str, available: Sequence[str] = ENCODINGS) -> Optional[str]:
+    """The preferred encoding out of ``available`` the client accepts, or None for identity."""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        weights[name.strip()] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Smallest encoding, for variants that are compressed once and served many times."""
+    if encoding == "br":
+        return brotli.compress(body, quality=11)
+    # mtime=0 keeps the bytes identical across processes.
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+class StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=4)
+            self._finish = self._compressor.finish
+            self._compress = self._compressor.process
+        else:
+            self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+            self._finish = self._compressor.flush
+            self._compress = self._compressor.compress
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compress(chunk)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+def compress_once(body: bytes, encoding: str) -> bytes:
+    """Cheap encoding for a body that is compressed for a single response."""
+    compressor = StreamCompressor(encoding)
+    return compressor.compress(body) + compressor.finish()
+
+
+class CompressedVariants:
+    """Compressed bodies of ETagged responses for the current catalog version."""
+
+    def __init__(self, max_entries: int = 2000):
+        self.max_entries = max_entries
+        self._variants: "OrderedDict[VariantKey, bytes]" = OrderedDict()
+        self._flight = SingleFlight()
+        self.counters = {"hits": 0, "misses": 0, "streamed": 0, "identity_bytes": 0, "compressed_bytes": 0}
+
+    async def get(self, key: VariantKey, body: bytes) -> bytes:
+        compressed = self._variants.get(key)
+        if compressed is not None:
+            self._variants.move_to_end(key)
+            self.counters["hits"] += 1
+        else:
+            self.counters["misses"] += 1
+            # Brotli quality 11 takes long enough to stall the event loop on large bodies.
+            compressed = await self._flight.do(key, partial(asyncio.to_thread, compress, body, key[1]))
+            self._variants[key] = compressed
+            while len(self._variants) > self.max_entries:
+                self._variants.popitem(last=False)
+        self.record(len(body), len(compressed))
+        return compressed
+
+    def record(self, identity: int, compressed: int) -> None:
+        self.counters["identity_bytes"] += identity
+        self.counters["compressed_bytes"] += compressed
+
+    def invalidate(self, old: Optional[CatalogSnapshot], new: CatalogSnapshot) -> None:
+        """Catalog listener: ETags of the previous version will not be served again."""
+        self._variants.clear()
+
+    def stats(self) -> dict:
+        identity = self.counters["identity_bytes"]
+        return {
+            **self.counters,
+            "encodings": list(ENCODINGS),
+            "entries": len(self._variants),
+            "single_flight": self._flight.stats(),
+            "cached_bytes": sum(len(body) for body in self._variants.values()),
+            "ratio": round(self.counters["compressed_bytes"] / identity, 3) if identity else None,
+        }
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses, reusing ``CompressedVariants`` for ETagged ones.
+
+    Responses under ``uncached_paths`` prefixes are always compressed on the fly.
+    """
+
+    def __init__(self, app, variants: CompressedVariants, minimum_size: int = 1024,
+                 uncached_paths: Sequence[str] = ()):
+        self.app = app
+        self.variants = variants
+        self.minimum_size = minimum_size
+        self.uncached_paths = tuple(uncached_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding", ""))
+        if_none_match = request_headers.get("if-none-match", "")
+        cacheable = not scope["path"].startswith(self.uncached_paths)
+        start: Optional[dict] = None
+        compressor: Optional[StreamCompressor] = None
+        streamed: List[int] = [0, 0]
+
+        async def send_compressed(message):
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                start = message
+                if start["status"] == 304 and encoding:
+                    # Keep the ETag the client validated with when it holds the compressed variant.
+                    headers = MutableHeaders(scope=start)
+                    etag = headers.get("etag")
+                    if etag and encoded_etag(etag, encoding) in if_none_match:
+                        headers["etag"] = encoded_etag(etag, encoding)
+                    await send(start)
+                    start = None
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body, more = message.get("body", b""), message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(scope=start)
+                eligible = (
+                    "content-encoding" not in headers
+                    and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+                    and (more or len(body) >= self.minimum_size)
+                )
+                pending, start = start, None
+                if not eligible:
+                    await send(pending)
+                    await send(message)
+                    return
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    await send(pending)
+                    await send(message)
+                    return
+                etag = headers.get("etag")
+                if not more:
+                    if etag and cacheable and pending["status"] == 200:
+                        body = await self.variants.get((etag, encoding), body)
+                    else:
+                        identity = len(body)
+                        body = compress_once(body, encoding)
+                        self.variants.record(identity, len(body))
+                    if etag:
+                        headers["etag"] = encoded_etag(etag, encoding)
+                    headers["content-encoding"] = encoding
+                    headers["content-length"] = str(len(body))
+                    await send(pending)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                compressor = StreamCompressor(encoding)
+                self.variants.counters["streamed"] += 1
+                if etag:
+                    headers["etag"] = encoded_etag(etag, encoding)
+                headers["content-encoding"] = encoding
+                del headers["content-length"]
+                await send(pending)
+            if compressor is None:
+                await send(message)
+                return
+            chunk = compressor.compress(body)
+            streamed[0] += len(body)
+            if not more:
+                chunk += compressor.finish()
+            streamed[1] += len(chunk)
+            if not more:
+                self.variants.record(*streamed)
+            if chunk or not more:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more})
+
+        await self.app(scope, receive, send_compressed)
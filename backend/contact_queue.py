@@ -0,0 +1,209 @@
+"""Write-behind batching for contact form submissions.
+
+Submissions are queued in memory and written with ``insert_many`` once a batch
+fills up or the flush interval elapses, so Mongo write latency is not on the
+request path. The queue is bounded: when it is full, callers get
+``ContactQueueFull`` and should answer 503 with ``Retry-After``. In durable
+mode each caller waits for the batch holding its document to be written.
+
+Listeners run once documents are written. Required listeners (the
+notification outbox) are part of the write and are retried like it, so
+they must be idempotent; the others are best-effort.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+_FLUSH_RETRIES = 3
+
+WrittenListener = Callable[[List[dict]], Awaitable[None]]
+
+
+class ContactQueueFull(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Contact queue is full")
+        self.retry_after = retry_after
+
+
+class ContactWriteQueue:
+    def __init__(
+        self,
+        collection,
+        max_size: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 0.05,
+        durable: bool = False,
+    ):
+        self._collection = collection
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.durable = durable
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
+        self._recent = deque(maxlen=200)  # (batch size, flush seconds)
+        self._listeners: List[Tuple[WrittenListener, bool]] = []
+        self.counters = {"enqueued": 0, "written": 0, "batches": 0, "rejected": 0, "failed": 0, "listener_failed": 0}
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def subscribe(self, listener: WrittenListener, required: bool = False) -> None:
+        """Await ``listener(docs)`` with every group of documents once they are written.
+
+        A ``required`` listener is retried with backoff like the write itself.
+        """
+        self._listeners.append((listener, required))
+
+    async def _written(self, docs: List[dict]) -> None:
+        for listener, required in self._listeners:
+            attempts = _FLUSH_RETRIES if required else 1
+            for attempt in range(attempts):
+                try:
+                    await listener(docs)
+                    break
+                except Exception as e:
+                    if attempt + 1 < attempts:
+                        await asyncio.sleep(0.1 * 2 ** attempt)
+                        continue
+                    if required:
+                        self.counters["listener_failed"] += len(docs)
+                        logger.error(
+                            f"Required contact write listener failed after {attempts} attempts for "
+                            f"{', '.join(doc['id'] for doc in docs)}: {e}"
+                        )
+                    else:
+                        logger.exception("Contact write listener failed")
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._closing = False
+        self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, doc: dict) -> None:
+        if self._queue is None or self._closing:
+            # Not running (startup failed or shutting down): write through.
+            await self._collection.insert_one(doc)
+            self.counters["written"] += 1
+            await self._written([doc])
+            return
+        future = asyncio.get_running_loop().create_future() if self.durable else None
+        try:
+            self._queue.put_nowait((doc, future))
+        except asyncio.QueueFull:
+            self.counters["rejected"] += 1
+            raise ContactQueueFull(retry_after=max(1, round(self.flush_interval * 2)))
+        self.counters["enqueued"] += 1
+        if future is not None:
+            await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch, stopping = [item], False
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                await self._flush(batch)
+            except Exception:
+                logger.exception("Contact flush failed")
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[Tuple[dict, Optional[asyncio.Future]]]) -> None:
+        docs = [doc for doc, _ in batch]
+        started = time.perf_counter()
+        error: Optional[Exception] = None
+        failed_indexes = set()
+        for attempt in range(_FLUSH_RETRIES):
+            try:
+                await self._collection.insert_many(docs, ordered=False)
+                error = None
+                break
+            except BulkWriteError as e:
+                # With ordered=False everything but the reported documents was written.
+                write_errors = e.details.get("writeErrors", [])
+                if attempt:
+                    # insert_many gave every document an _id, so the ones an earlier
+                    # interrupted attempt already stored come back as duplicates.
+                    write_errors = [w for w in write_errors if w.get("code") != 11000]
+                failed_indexes = {w["index"] for w in write_errors}
+                error = e if failed_indexes else None
+                break
+            except PyMongoError as e:
+                error = e
+                await asyncio.sleep(0.1 * 2 ** attempt)
+        elapsed = time.perf_counter() - started
+
+        if error is not None and not failed_indexes:
+            failed_indexes = set(range(len(docs)))
+        self._recent.append((len(docs), elapsed))
+        self.counters["batches"] += 1
+        self.counters["written"] += len(docs) - len(failed_indexes)
+        self.counters["failed"] += len(failed_indexes)
+        if failed_indexes:
+            logger.error(f"Failed to write {len(failed_indexes)} contact submissions: {error}")
+            for index in failed_indexes:
+                logger.error(f"Unwritten contact submission: {docs[index]}")
+
+        written = [doc for index, doc in enumerate(docs) if index not in failed_indexes]
+        if written:
+            await self._written(written)
+
+        for index, (_, future) in enumerate(batch):
+            if future is None or future.done():
+                continue
+            if index in failed_indexes:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
+
+    async def stop(self) -> None:
+        """Stop accepting work and flush everything already queued."""
+        if self._worker is None:
+            return
+        self._closing = True
+        pending = self.depth
+        # The sentinel queues behind every accepted submission.
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+        if pending:
+            logger.info(f"Drained {pending} queued contact submissions")
+
+    def stats(self) -> dict:
+        sizes = [size for size, _ in self._recent]
+        latencies = sorted(seconds for _, seconds in self._recent)
+        return {
+            **self.counters,
+            "depth": self.depth,
+            "max_size": self.max_size,
+            "durable": self.durable,
+            "recent_batches": len(sizes),
+            "avg_batch_size": round(sum(sizes) / len(sizes), 2) if sizes else 0,
+            "max_batch_size": max(sizes, default=0),
+            "flush_ms_p50": round(latencies[len(latencies) // 2] * 1000, 3) if latencies else 0,
+            "flush_ms_max": round(latencies[-1] * 1000, 3) if latencies else 0,
+        }
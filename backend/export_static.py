@@ -0,0 +1,194 @@
+"""Export every service-city page and the sitemaps as static files.
+
+The tree mirrors the API paths, so a CDN or nginx can serve it in front of the
+backend (``try_files $uri.json`` for pages, plus ``gzip_static``/``brotli_static``
+for the precompressed variants)::
+
+    <out>/api/service-city/<service>/<city>.json[.gz|.br]
+    <out>/api/sitemap.xml, <out>/api/sitemap-<n>.xml[.gz|.br]
+
+``<out>/.export-manifest.json`` records the content hash of each file's inputs;
+later runs rewrite only files whose inputs changed and delete pages that no
+longer exist. Large rebuilds are rendered by a process pool.
+
+    cd backend && python export_static.py --out ../build/static --gzip --brotli
+    cd backend && python export_static.py --out ../build/static --source seed
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from catalog import CatalogSnapshot, content_digest
+from pages import render_service_city_page
+from sitemap import SitemapBuilder
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+MANIFEST = ".export-manifest.json"
+# Bump when the page or file format changes, so every file is rewritten once.
+FORMAT_VERSION = 1
+
+PageJob = Tuple[str, dict, dict]
+
+
+def _write_atomic(path: Path, body: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(body)
+    os.replace(tmp, path)
+
+
+def write_variants(path: Path, body: bytes, variants: Sequence[str]) -> None:
+    _write_atomic(path, body)
+    if "gz" in variants:
+        # mtime=0 keeps reruns byte-identical.
+        _write_atomic(path.with_name(path.name + ".gz"), gzip.compress(body, compresslevel=9, mtime=0))
+    if "br" in variants:
+        _write_atomic(path.with_name(path.name + ".br"), brotli.compress(body, quality=11))
+
+
+def remove_variants(path: Path) -> None:
+    for candidate in (path, path.with_name(path.name + ".gz"), path.with_name(path.name + ".br")):
+        candidate.unlink(missing_ok=True)
+
+
+def render_pages(out: str, jobs: List[PageJob], variants: Sequence[str]) -> int:
+    """Render and write a batch of pages; runs in pool workers, so it only takes picklable arguments."""
+    root = Path(out)
+    for relpath, service, city in jobs:
+        write_variants(root / relpath, render_service_city_page(service, city), variants)
+    return len(jobs)
+
+
+def page_path(service_slug: str, city_slug: str) -> str:
+    return f"api/service-city/{service_slug}/{city_slug}.json"
+
+
+async def load_catalog(source: str, db_name: Optional[str]) -> Dict[str, List[dict]]:
+    if source == "seed":
+        from seed import load_seed_data
+
+        return load_seed_data()
+    from storage import EmbeddedStorage, MotorStorage
+
+    if source == "mongo":
+        storage = MotorStorage(os.environ['MONGO_URL'], db_name or os.environ['DB_NAME'])
+    else:
+        storage = EmbeddedStorage(os.environ.get('EMBEDDED_SNAPSHOT_PATH') or os.environ.get('CATALOG_SNAPSHOT_PATH'))
+    try:
+        return await storage.load_catalog()
+    finally:
+        storage.close()
+
+
+def export(snapshot: CatalogSnapshot, out: Path, sitemaps: SitemapBuilder, variants: Sequence[str],
+           force: bool = False, workers: Optional[int] = None, parallel_threshold: int = 2000) -> dict:
+    manifest_path = out / MANIFEST
+    previous: Dict[str, str] = {}
+    if manifest_path.exists() and not force:
+        stored = json.loads(manifest_path.read_text())
+        if stored.get("format") == FORMAT_VERSION and stored.get("variants") == list(variants):
+            previous = stored["files"]
+
+    files: Dict[str, str] = {}
+    jobs: List[PageJob] = []
+    service_digests = {slug: content_digest(doc) for slug, doc in snapshot.services_by_slug.items()}
+    city_digests = {slug: content_digest(doc) for slug, doc in snapshot.cities_by_slug.items()}
+    for service_slug, service in snapshot.services_by_slug.items():
+        for city_slug, city in snapshot.cities_by_slug.items():
+            relpath = page_path(service_slug, city_slug)
+            files[relpath] = digest = hashlib.sha256(
+                f"{service_digests[service_slug]}:{city_digests[city_slug]}".encode()
+            ).hexdigest()
+            if previous.get(relpath) != digest or not (out / relpath).exists():
+                jobs.append((relpath, service, city))
+
+    if len(jobs) >= parallel_threshold and (workers or os.cpu_count() or 1) > 1:
+        workers = workers or os.cpu_count()
+        chunk = -(-len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(render_pages, str(out), jobs[i:i + chunk], list(variants))
+                for i in range(0, len(jobs), chunk)
+            ]
+            for future in futures:
+                future.result()
+    else:
+        render_pages(str(out), jobs, variants)
+
+    sitemaps_written = 0
+    shards = sitemaps.shard_count(snapshot)
+    sitemap_files = {f"api/sitemap-{shard}.xml": b"".join(sitemaps.iter_shard_xml(snapshot, shard)) for shard in range(shards)}
+    sitemap_files["api/sitemap.xml"] = (
+        b"".join(sitemaps.iter_index(snapshot)) if shards > 1 else sitemap_files["api/sitemap-0.xml"]
+    )
+    for relpath, body in sitemap_files.items():
+        files[relpath] = digest = hashlib.sha256(body).hexdigest()
+        if previous.get(relpath) != digest or not (out / relpath).exists():
+            write_variants(out / relpath, body, variants)
+            sitemaps_written += 1
+
+    removed = [relpath for relpath in previous if relpath not in files]
+    for relpath in removed:
+        remove_variants(out / relpath)
+
+    _write_atomic(manifest_path, json.dumps(
+        {"format": FORMAT_VERSION, "variants": list(variants), "catalog_digest": snapshot.digest, "files": files},
+        indent=0, sort_keys=True,
+    ).encode())
+    return {"pages": len(files) - len(sitemap_files), "pages_written": len(jobs),
+            "sitemaps_written": sitemaps_written, "removed": len(removed)}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from dotenv import load_dotenv
+
+    load_dotenv(Path(__file__).parent / '.env')
+    parser = argparse.ArgumentParser(description="Export service-city pages and sitemaps as static files")
+    parser.add_argument("--out", required=True, type=Path, help="output directory")
+    parser.add_argument("--source", choices=["mongo", "embedded", "seed"],
+                        default=os.environ.get('STORAGE_BACKEND', 'mongo'), help="where to read the catalog")
+    parser.add_argument("--db", help="database name (defaults to DB_NAME)")
+    parser.add_argument("--gzip", action="store_true", help="also write .gz variants")
+    parser.add_argument("--brotli", action="store_true", help="also write .br variants (needs the brotli package)")
+    parser.add_argument("--force", action="store_true", help="rewrite every file")
+    parser.add_argument("--workers", type=int, help="process pool size (defaults to the CPU count)")
+    parser.add_argument("--parallel-threshold", type=int, default=2000,
+                        help="use the process pool when at least this many pages need rendering")
+    parser.add_argument("--site-url", default=os.environ.get('SITE_URL', 'https://pytech.digital'))
+    args = parser.parse_args(argv)
+
+    if args.brotli and brotli is None:
+        print("--brotli needs the 'brotli' package", file=sys.stderr)
+        return 2
+    variants = [name for name, wanted in (("gz", args.gzip), ("br", args.brotli)) if wanted]
+
+    started = time.perf_counter()
+    snapshot = CatalogSnapshot.build(1, asyncio.run(load_catalog(args.source, args.db)), time.time())
+    sitemaps = SitemapBuilder(
+        args.site_url,
+        shard_size=int(os.environ.get('SITEMAP_SHARD_SIZE', '50000')),
+        api_url=os.environ.get('SITEMAP_API_URL'),
+    )
+    result = export(snapshot, args.out, sitemaps, variants, args.force, args.workers, args.parallel_threshold)
+    print(
+        f"{result['pages']} pages ({result['pages_written']} written, {result['removed']} removed), "
+        f"{result['sitemaps_written']} sitemaps written to {args.out} "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Pre-serialized catalog responses.
+
+With ``response_model`` FastAPI re-validates and re-encodes every catalog
+document on every request. ``EncodedCatalog`` instead validates each catalog
+version once, when it is loaded, and keeps the JSON bytes of every list and
+slug response so routes can return them as-is. orjson is used when installed.
+"""
+import json
+import logging
+from typing import Dict, Optional
+
+from catalog import CatalogSnapshot
+from models import Service, City, Testimonial, Portfolio
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+CATALOG_MODELS = {"services": Service, "cities": City, "testimonials": Testimonial, "portfolio": Portfolio}
+
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class EncodedCatalog:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.version: Optional[int] = None
+        self._lists: Dict[str, bytes] = {}
+        self._items: Dict[str, Dict[str, bytes]] = {}
+        self._home: Optional[bytes] = None
+
+    def rebuild(self, old: Optional[CatalogSnapshot], new: CatalogSnapshot) -> None:
+        """Catalog listener: validate and encode the new version once."""
+        # Never serve bytes from an older version if this one fails to validate.
+        self.version = None
+        lists, items = {}, {}
+        for name, model in CATALOG_MODELS.items():
+            validated = [model.model_validate(doc).model_dump(mode="json") for doc in getattr(new, name)]
+            lists[name] = dumps(validated)
+            if name in ("services", "cities"):
+                items[name] = {doc["slug"]: dumps(doc) for doc in validated}
+        self._lists, self._items = lists, items
+        self._home = b"{" + b",".join(b'"%s":%s' % (name.encode(), body) for name, body in lists.items()) + b"}"
+        self.version = new.version
+
+    def _ready(self, snapshot: CatalogSnapshot) -> bool:
+        return self.enabled and self.version == snapshot.version
+
+    def list(self, snapshot: CatalogSnapshot, name: str) -> Optional[bytes]:
+        return self._lists[name] if self._ready(snapshot) else None
+
+    def item(self, snapshot: CatalogSnapshot, name: str, slug: str) -> Optional[bytes]:
+        return self._items[name].get(slug) if self._ready(snapshot) else None
+
+    def home(self, snapshot: CatalogSnapshot) -> Optional[bytes]:
+        return self._home if self._ready(snapshot) else None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "encoder": "orjson" if orjson is not None else "json",
+            "version": self.version,
+            "bytes": sum(len(body) for body in self._lists.values()),
+        }
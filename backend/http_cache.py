@@ -0,0 +1,83 @@
+"""HTTP validators (ETag / Last-Modified) for catalog-backed read routes."""
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def make_etag(*parts: str) -> str:
+    """Strong ETag over the content digests a representation was built from."""
+    return '"' + hashlib.sha256(":".join(parts).encode()).hexdigest()[:32] + '"'
+
+
+CONTENT_CODINGS = ("gzip", "br")
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of the ``encoding`` content-coding of the representation tagged ``etag``."""
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _identity_etag(tag: str) -> str:
+    tag = tag.removeprefix("W/")
+    for encoding in CONTENT_CODINGS:
+        if tag.endswith(f'-{encoding}"'):
+            return tag[:-len(encoding) - 2] + '"'
+    return tag
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison function (RFC 9110 13.1.2); a
+    # compressed variant's ETag still validates the same representation.
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(_identity_etag(tag) == etag for tag in candidates)
+
+
+def _not_modified_since(header: str, last_modified: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return int(last_modified) <= since.timestamp()
+
+
+class ConditionalGet:
+    """Builds validator headers and answers conditional requests with 304."""
+
+    def __init__(self, cache_control: str):
+        self.cache_control = cache_control
+        self.counters = {"not_modified": 0, "full": 0}
+
+    def headers(self, etag: str, last_modified: float) -> Dict[str, str]:
+        return {
+            "ETag": etag,
+            "Last-Modified": formatdate(last_modified, usegmt=True),
+            "Cache-Control": self.cache_control,
+        }
+
+    def is_fresh(self, request: Request, etag: str, last_modified: float) -> bool:
+        # If-None-Match takes precedence; If-Modified-Since is only consulted without it.
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return _etag_matches(if_none_match, etag)
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is not None:
+            return _not_modified_since(if_modified_since, last_modified)
+        return False
+
+    def check(self, request: Request, response: Response, etag: str, last_modified: float) -> Optional[Response]:
+        """Return a 304 if the client copy is current, else stamp ``response`` with validators."""
+        headers = self.headers(etag, last_modified)
+        if self.is_fresh(request, etag, last_modified):
+            self.counters["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        self.counters["full"] += 1
+        response.headers.update(headers)
+        return None
+
+    def stats(self) -> dict:
+        return {**self.counters, "cache_control": self.cache_control}
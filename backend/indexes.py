@@ -0,0 +1,174 @@
+"""Declared MongoDB indexes, startup reconciliation and a query-plan audit.
+
+``REQUIRED_INDEXES`` is the single source of truth. ``ensure_indexes`` creates
+whatever is missing and rebuilds indexes whose definition drifted; it never
+drops indexes it does not own. The audit runs ``explain()`` on every hot query
+and reports the ones not served by an index:
+
+    cd backend && python indexes.py sync
+    cd backend && python indexes.py audit
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Options that make two indexes with the same key different indexes.
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+REQUIRED_INDEXES: Dict[str, List[IndexModel]] = {
+    "services": [
+        IndexModel([("slug", ASCENDING)], name="slug_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "cities": [
+        IndexModel([("slug", ASCENDING)], name="slug_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "testimonials": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "portfolio": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "contact_submissions": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("timestamp", DESCENDING)], name="timestamp_desc"),
+        IndexModel([("city", ASCENDING), ("timestamp", DESCENDING)], name="city_timestamp"),
+        IndexModel([("service", ASCENDING), ("timestamp", DESCENDING)], name="service_timestamp"),
+    ],
+    "notification_outbox": [
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt"),
+    ],
+    "lead_rollups": [
+        IndexModel([("day", ASCENDING)], name="day"),
+    ],
+}
+
+# (collection, filter, sort) for every query on a hot path.
+HOT_QUERIES = [
+    ("services", {"slug": "website-design"}, None),
+    ("cities", {"slug": "delhi"}, None),
+    ("contact_submissions", {"timestamp": {"$gte": "2024-01-01"}}, [("timestamp", DESCENDING)]),
+    ("contact_submissions", {"city": "Delhi", "timestamp": {"$gte": "2024-01-01"}}, [("timestamp", DESCENDING)]),
+    ("contact_submissions", {"service": "SEO", "timestamp": {"$gte": "2024-01-01"}}, [("timestamp", DESCENDING)]),
+    ("notification_outbox", {"status": "pending", "next_attempt_at": {"$lte": "2100-01-01"}}, [("next_attempt_at", ASCENDING)]),
+    ("lead_rollups", {"day": {"$gte": "2024-01-01"}}, [("day", ASCENDING)]),
+]
+
+
+def _spec(model: IndexModel) -> dict:
+    document = model.document
+    return {
+        "key": list(document["key"].items()),
+        **{option: document[option] for option in _COMPARED_OPTIONS if option in document},
+    }
+
+
+def _existing_spec(info: dict) -> dict:
+    return {
+        # Older servers report directions as floats (1.0).
+        "key": [(field, direction if isinstance(direction, str) else int(direction)) for field, direction in info["key"]],
+        **{option: info[option] for option in _COMPARED_OPTIONS if option in info},
+    }
+
+
+async def ensure_indexes(db) -> Dict[str, List[str]]:
+    """Create missing indexes and rebuild drifted ones; returns the names created per collection."""
+    created: Dict[str, List[str]] = {}
+    for collection_name, models in REQUIRED_INDEXES.items():
+        collection = db[collection_name]
+        existing = {name: _existing_spec(info) for name, info in (await collection.index_information()).items()}
+        missing = []
+        for model in models:
+            name, wanted = model.document["name"], _spec(model)
+            if existing.get(name) == wanted or wanted in existing.values():
+                continue
+            if name in existing:
+                logger.warning(f"Index {collection_name}.{name} changed definition, rebuilding")
+                await collection.drop_index(name)
+            missing.append(model)
+        if not missing:
+            continue
+        try:
+            created[collection_name] = await collection.create_indexes(missing)
+            logger.info(f"Created indexes on {collection_name}: {', '.join(created[collection_name])}")
+        except OperationFailure as e:
+            # e.g. duplicate values blocking a unique index; keep serving and report it.
+            logger.error(f"Could not create indexes on {collection_name}: {e}")
+    return created
+
+
+def _plan_nodes(plan: dict):
+    yield plan
+    for child in ("inputStage", "outerStage", "innerStage"):
+        if child in plan:
+            yield from _plan_nodes(plan[child])
+    for child in plan.get("inputStages", []):
+        yield from _plan_nodes(child)
+
+
+async def audit_queries(db) -> List[dict]:
+    """explain() every hot query and describe how it is served."""
+    report = []
+    for collection_name, query, sort in HOT_QUERIES:
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = await cursor.explain()
+        winning = plan.get("queryPlanner", {}).get("winningPlan", {})
+        nodes = list(_plan_nodes(winning))
+        stages = [node["stage"] for node in nodes if node.get("stage")]
+        index_names = [node["indexName"] for node in nodes if node.get("indexName")]
+        report.append({
+            "collection": collection_name,
+            "query": query,
+            "sort": sort,
+            "stages": stages,
+            "indexes": index_names,
+            "indexed": "COLLSCAN" not in stages,
+            "in_memory_sort": "SORT" in stages,
+        })
+    return report
+
+
+async def _main(command: str, db_name: Optional[str]) -> int:
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[db_name or os.environ['DB_NAME']]
+    try:
+        if command == "sync":
+            created = await ensure_indexes(db)
+            print("All indexes present" if not created else f"Created: {created}")
+            return 0
+        failures = 0
+        for entry in await audit_queries(db):
+            status = "ok  " if entry["indexed"] and not entry["in_memory_sort"] else "SLOW"
+            failures += status == "SLOW"
+            print(f"{status} {entry['collection']:<22} {entry['query']} sort={entry['sort']} "
+                  f"plan={'>'.join(entry['stages'])} indexes={entry['indexes']}")
+        return 1 if failures else 0
+    except PyMongoError as e:
+        print(f"MongoDB error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage and audit MongoDB indexes")
+    parser.add_argument("command", choices=["sync", "audit"])
+    parser.add_argument("--db", help="database name (defaults to DB_NAME)")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(_main(args.command, args.db)))
@@ -0,0 +1,192 @@
+"""Lead export and pre-aggregated lead counts.
+
+Exports stream ``contact_submissions`` straight from a batched cursor as NDJSON
+or CSV, so memory use does not depend on the date range requested.
+
+``LeadRollups`` keeps ``lead_rollups`` (one document per day, city and
+service) up to date: it listens to the contact write queue and ``$inc``s the
+counts for every batch written, so dashboards read a handful of small
+documents instead of aggregating the raw collection. ``rebuild`` recomputes
+the rollups from scratch, e.g. for submissions written before it existed:
+
+    cd backend && python leads.py rebuild-rollups
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+ROLLUPS = "lead_rollups"
+EXPORT_FIELDS = ("id", "timestamp", "name", "email", "phone", "city", "service", "message")
+EXPORT_BATCH_SIZE = 500
+# Spreadsheet apps evaluate cells starting with these as formulas.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+RollupKey = Tuple[str, str, str]
+
+
+def _iso(value: datetime) -> str:
+    # Submissions store timezone-aware UTC isoformat strings, which sort chronologically.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def lead_filter(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                city: Optional[str] = None, service: Optional[str] = None) -> dict:
+    query: dict = {}
+    if start or end:
+        query["timestamp"] = {}
+        if start:
+            query["timestamp"]["$gte"] = _iso(start)
+        if end:
+            query["timestamp"]["$lt"] = _iso(end)
+    if city:
+        query["city"] = city
+    if service:
+        query["service"] = service
+    return query
+
+
+async def iter_leads(collection, query: dict, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[List[dict]]:
+    """Matching submissions, oldest first, a cursor batch at a time."""
+    cursor = collection.find(query, {"_id": 0}).sort("timestamp", ASCENDING).batch_size(batch_size)
+    batch: List[dict] = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def export_ndjson(collection, query: dict) -> AsyncIterator[bytes]:
+    async for batch in iter_leads(collection, query):
+        yield "".join(json.dumps(doc, default=str) + "\n" for doc in batch).encode()
+
+
+def _csv_cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+async def export_csv(collection, query: dict) -> AsyncIterator[bytes]:
+    """Submissions as CSV; form text that would run as a formula is prefixed with ``'``."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    async for batch in iter_leads(collection, query):
+        writer.writerows({field: _csv_cell(doc.get(field)) for field in EXPORT_FIELDS} for doc in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def rollup_key(doc: dict) -> RollupKey:
+    return str(doc.get("timestamp", ""))[:10], doc.get("city", ""), doc.get("service", "")
+
+
+def _rollup_updates(counts: Dict[RollupKey, int], now: datetime) -> List[UpdateOne]:
+    return [
+        UpdateOne(
+            {"_id": f"{day}|{city}|{service}"},
+            {"$inc": {"count": count}, "$set": {"updated_at": now},
+             "$setOnInsert": {"day": day, "city": city, "service": service}},
+            upsert=True,
+        )
+        for (day, city, service), count in counts.items()
+    ]
+
+
+class LeadRollups:
+    def __init__(self, db):
+        self._rollups = db[ROLLUPS]
+        self._submissions = db.contact_submissions
+        self.counters = {"batches": 0, "leads": 0, "errors": 0}
+
+    async def record(self, submissions: List[dict]) -> None:
+        """Contact write listener: count the written submissions into their rollups."""
+        counts = Counter(rollup_key(doc) for doc in submissions)
+        try:
+            await self._rollups.bulk_write(_rollup_updates(counts, datetime.now(timezone.utc)), ordered=False)
+        except PyMongoError as e:
+            # The submissions are safe; only the counts drift until the next rebuild.
+            self.counters["errors"] += 1
+            logger.error(f"Lead rollup update failed for {len(submissions)} submissions: {e}")
+            return
+        self.counters["batches"] += 1
+        self.counters["leads"] += len(submissions)
+
+    async def query(self, start_day: Optional[str] = None, end_day: Optional[str] = None,
+                    city: Optional[str] = None, service: Optional[str] = None) -> List[dict]:
+        query: dict = {}
+        if start_day or end_day:
+            query["day"] = {}
+            if start_day:
+                query["day"]["$gte"] = start_day
+            if end_day:
+                query["day"]["$lte"] = end_day
+        if city:
+            query["city"] = city
+        if service:
+            query["service"] = service
+        cursor = self._rollups.find(query, {"_id": 0, "updated_at": 0}).sort("day", ASCENDING)
+        return await cursor.to_list(None)
+
+    async def rebuild(self) -> int:
+        """Recompute every rollup from ``contact_submissions``; returns the number of rollup documents."""
+        counts: Counter = Counter()
+        async for batch in iter_leads(self._submissions, {}):
+            counts.update(rollup_key(doc) for doc in batch)
+        now = datetime.now(timezone.utc)
+        await self._rollups.delete_many({})
+        updates = _rollup_updates(counts, now)
+        for start in range(0, len(updates), 1000):
+            await self._rollups.bulk_write(updates[start:start + 1000], ordered=False)
+        return len(updates)
+
+    def stats(self) -> dict:
+        return dict(self.counters)
+
+
+async def _main(command: str, db_name: Optional[str]) -> int:
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[db_name or os.environ['DB_NAME']]
+    try:
+        rebuilt = await LeadRollups(db).rebuild()
+        print(f"Rebuilt {rebuilt} lead rollups")
+        return 0
+    except PyMongoError as e:
+        print(f"MongoDB error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain lead rollups")
+    parser.add_argument("command", choices=["rebuild-rollups"])
+    parser.add_argument("--db", help="database name (defaults to DB_NAME)")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(_main(args.command, args.db)))
@@ -0,0 +1,131 @@
+"""Filtered, paginated and projected views of the catalog lists.
+
+Reads are served from the in-memory catalog snapshot, so filters are backed by
+per-version secondary indexes (field value -> positions in catalog order)
+instead of MongoDB indexes, and paging is keyset-based: the cursor names the
+last ``id`` returned and the next page starts right after its position.
+Projection keeps only the requested model fields, so the response size
+follows what the client asked for.
+"""
+import base64
+import binascii
+import json
+from bisect import bisect_right
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from catalog import CatalogSnapshot
+from models import City, Portfolio, Service, Testimonial
+
+LISTINGS = {"services": Service, "cities": City, "testimonials": Testimonial, "portfolio": Portfolio}
+# Fields each list can be filtered on (case-insensitive equality).
+FILTERS: Dict[str, Tuple[str, ...]] = {
+    "services": (),
+    "cities": ("tier", "state"),
+    "testimonials": ("city",),
+    "portfolio": ("category", "city"),
+}
+
+
+class ListingError(ValueError):
+    """A bad ``fields``, filter or cursor value; the message is safe to return to the client."""
+
+
+def encode_cursor(name: str, last_id: str) -> str:
+    raw = json.dumps({"l": name, "after": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(name: str, cursor: str) -> str:
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if decoded["l"] == name:
+            return str(decoded["after"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        pass
+    raise ListingError("Invalid cursor")
+
+
+def parse_fields(name: str, fields: Optional[str]) -> List[str]:
+    model = LISTINGS[name]
+    if not fields:
+        return list(model.model_fields)
+    wanted = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in wanted if f not in model.model_fields]
+    if unknown:
+        raise ListingError(f"Unknown fields: {', '.join(unknown)}")
+    return wanted
+
+
+class _Listing:
+    def __init__(self, name: str, docs: List[dict]):
+        self.docs = docs
+        self.positions = {str(doc.get("id")): i for i, doc in enumerate(docs)}
+        self.by_value: Dict[Tuple[str, str], List[int]] = {}
+        for i, doc in enumerate(docs):
+            for field in FILTERS[name]:
+                value = doc.get(field)
+                if value is not None:
+                    self.by_value.setdefault((field, str(value).lower()), []).append(i)
+
+
+class ListingIndex:
+    def __init__(self, max_limit: int = 200):
+        self.max_limit = max_limit
+        self.version: Optional[int] = None
+        self._listings: Dict[str, _Listing] = {}
+        self.counters = {"builds": 0, "pages": 0}
+
+    def rebuild(self, old: Optional[CatalogSnapshot], new: CatalogSnapshot) -> None:
+        """Catalog listener: index the filterable fields of the new version."""
+        self._listings = {name: _Listing(name, getattr(new, name)) for name in LISTINGS}
+        self.version = new.version
+        self.counters["builds"] += 1
+
+    def page(self, snapshot: CatalogSnapshot, name: str, filters: Mapping[str, Optional[str]],
+             fields: Sequence[str], cursor: Optional[str], limit: Optional[int]) -> Tuple[List[dict], Optional[str]]:
+        """One page of ``name`` in catalog order, and the cursor of the next page (None on the last)."""
+        if self.version != snapshot.version:
+            self.rebuild(None, snapshot)
+        listing = self._listings[name]
+        self.counters["pages"] += 1
+
+        candidates: Optional[List[int]] = None
+        for field, value in filters.items():
+            if value is None:
+                continue
+            positions = listing.by_value.get((field, value.lower()), [])
+            # Intersect, keeping catalog order.
+            if candidates is None:
+                candidates = positions
+            else:
+                keep = set(positions)
+                candidates = [i for i in candidates if i in keep]
+
+        start = 0
+        if cursor is not None:
+            after = listing.positions.get(decode_cursor(name, cursor))
+            if after is None:
+                raise ListingError("Cursor is no longer valid, restart from the first page")
+            start = after + 1
+        limit = min(limit or self.max_limit, self.max_limit)
+
+        if candidates is None:
+            selected = range(start, min(start + limit + 1, len(listing.docs)))
+        else:
+            offset = bisect_right(candidates, start - 1)
+            selected = candidates[offset:offset + limit + 1]
+        docs = [listing.docs[i] for i in selected]
+
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(name, str(docs[-1].get("id")))
+        return [{f: doc[f] for f in fields if f in doc} for doc in docs], next_cursor
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "version": self.version,
+            "max_limit": self.max_limit,
+            "filter_values": sum(len(listing.by_value) for listing in self._listings.values()),
+        }
@@ -0,0 +1,82 @@
+"""Cross-process lease locks stored in MongoDB.
+
+A lease is a document in ``_locks`` naming its owner and an expiry. Acquiring
+is a single upsert that only matches when the lease is free or expired, so
+exactly one process holds it at a time; the holder renews it in the
+background and a crashed holder's lease simply runs out.
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+LOCKS_COLLECTION = "_locks"
+
+
+class LeaseTimeout(Exception):
+    pass
+
+
+class MongoLease:
+    def __init__(self, db, name: str, ttl: float = 30.0, wait_timeout: float = 120.0, poll_interval: float = 0.5):
+        self._locks = db[LOCKS_COLLECTION]
+        self.name = name
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._renewer: Optional[asyncio.Task] = None
+
+    async def try_acquire(self) -> bool:
+        now = datetime.now(timezone.utc)
+        try:
+            await self._locks.update_one(
+                {"_id": self.name, "$or": [{"expires_at": {"$lte": now}}, {"owner": self.owner}]},
+                {"$set": {"owner": self.owner, "expires_at": now + timedelta(seconds=self.ttl), "acquired_at": now}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # The upsert tried to insert a second document for a lease someone holds.
+            return False
+        return True
+
+    async def acquire(self) -> None:
+        """Wait until the lease is ours, or raise ``LeaseTimeout``."""
+        deadline = asyncio.get_running_loop().time() + self.wait_timeout
+        waited = False
+        while not await self.try_acquire():
+            if not waited:
+                logger.info(f"Waiting for lease '{self.name}' held by another process")
+                waited = True
+            if asyncio.get_running_loop().time() >= deadline:
+                raise LeaseTimeout(f"Timed out waiting for lease '{self.name}'")
+            await asyncio.sleep(self.poll_interval)
+        self._renewer = asyncio.create_task(self._renew())
+
+    async def _renew(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            await self._locks.update_one(
+                {"_id": self.name, "owner": self.owner},
+                {"$set": {"expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.ttl)}},
+            )
+
+    async def release(self) -> None:
+        if self._renewer:
+            self._renewer.cancel()
+            self._renewer = None
+        await self._locks.delete_one({"_id": self.name, "owner": self.owner})
+
+    async def __aenter__(self) -> "MongoLease":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.release()
@@ -0,0 +1,226 @@
+"""Request and MongoDB command metrics in Prometheus text format.
+
+``MetricsMiddleware`` times every ``/api`` request by route template, tracks
+in-flight requests and counts response statuses. ``MongoCommandMetrics`` is a
+pymongo command listener timing each command by name and collection; Motor
+runs pymongo on an executor with a copy of the caller's context, so command
+time is also attributed to the request that issued it and the slow-request
+log can split Mongo time from the time spent in the handler and serializing.
+
+pymongo reports commands, not driver methods: ``find_one`` is a ``find``,
+``insert_one`` an ``insert`` and ``count_documents`` an ``aggregate``.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+from starlette.routing import Match
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, object]) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def exposition(self, name: str, labels: Dict[str, object]) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {cumulative}")
+        lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {self.count}")
+        lines.append(f"{name}_sum{_labels(labels)} {self.sum}")
+        lines.append(f"{name}_count{_labels(labels)} {self.count}")
+        return lines
+
+
+class RequestTiming:
+    """Mongo time accumulated by the request in flight (shared with executor threads)."""
+    __slots__ = ("mongo_seconds", "mongo_commands")
+
+    def __init__(self):
+        self.mongo_seconds = 0.0
+        self.mongo_commands = 0
+
+
+_current_request: ContextVar[Optional[RequestTiming]] = ContextVar("current_request", default=None)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collections: Dict[Tuple, str] = {}
+        self._durations: Dict[Tuple[str, str], Histogram] = {}
+        self._failures: Dict[Tuple[str, str], int] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        # Completion events do not carry the command document, so remember its collection.
+        collection = event.command.get(event.command_name)
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = collection if isinstance(collection, str) else ""
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finished(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finished(event, failed=True)
+
+    def _finished(self, event, failed: bool) -> None:
+        seconds = event.duration_micros / 1_000_000
+        with self._lock:
+            collection = self._collections.pop((event.connection_id, event.request_id), "")
+            key = (event.command_name, collection)
+            histogram = self._durations.get(key)
+            if histogram is None:
+                histogram = self._durations[key] = Histogram()
+            histogram.observe(seconds)
+            if failed:
+                self._failures[key] = self._failures.get(key, 0) + 1
+        timing = _current_request.get()
+        if timing is not None:
+            timing.mongo_seconds += seconds
+            timing.mongo_commands += 1
+
+    def exposition(self) -> List[str]:
+        lines = [
+            "# HELP pytech_mongo_command_duration_seconds MongoDB command latency by command and collection.",
+            "# TYPE pytech_mongo_command_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (command, collection), histogram in sorted(self._durations.items()):
+                lines.extend(histogram.exposition(
+                    "pytech_mongo_command_duration_seconds", {"command": command, "collection": collection}
+                ))
+            lines.append("# HELP pytech_mongo_command_failures_total Failed MongoDB commands.")
+            lines.append("# TYPE pytech_mongo_command_failures_total counter")
+            for (command, collection), count in sorted(self._failures.items()):
+                lines.append(f"pytech_mongo_command_failures_total{_labels({'command': command, 'collection': collection})} {count}")
+        return lines
+
+
+class HttpMetrics:
+    def __init__(self, slow_request_ms: float = 500.0):
+        self.slow_request_ms = slow_request_ms
+        self._durations: Dict[Tuple[str, str], Histogram] = {}
+        self._in_flight: Dict[Tuple[str, str], int] = {}
+        self._statuses: Dict[Tuple[str, str, int], int] = {}
+        self.slow_requests = 0
+
+    def started(self, method: str, route: str) -> None:
+        key = (method, route)
+        self._in_flight[key] = self._in_flight.get(key, 0) + 1
+
+    def finished(self, method: str, route: str, status: int, seconds: float, timing: RequestTiming) -> None:
+        key = (method, route)
+        self._in_flight[key] -= 1
+        histogram = self._durations.get(key)
+        if histogram is None:
+            histogram = self._durations[key] = Histogram()
+        histogram.observe(seconds)
+        status_key = (method, route, status)
+        self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+
+        elapsed_ms = seconds * 1000
+        if self.slow_request_ms > 0 and elapsed_ms >= self.slow_request_ms:
+            self.slow_requests += 1
+            mongo_ms = timing.mongo_seconds * 1000
+            logger.warning(
+                f"Slow request {method} {route} -> {status} in {elapsed_ms:.1f}ms "
+                f"(mongo {mongo_ms:.1f}ms in {timing.mongo_commands} commands, "
+                f"handler and serialization {elapsed_ms - mongo_ms:.1f}ms)"
+            )
+
+    def exposition(self) -> List[str]:
+        lines = [
+            "# HELP pytech_http_request_duration_seconds Request latency by route.",
+            "# TYPE pytech_http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self._durations.items()):
+            lines.extend(histogram.exposition("pytech_http_request_duration_seconds", {"method": method, "route": route}))
+        lines.append("# HELP pytech_http_requests_total Responses by route and status.")
+        lines.append("# TYPE pytech_http_requests_total counter")
+        for (method, route, status), count in sorted(self._statuses.items()):
+            lines.append(f"pytech_http_requests_total{_labels({'method': method, 'route': route, 'status': status})} {count}")
+        lines.append("# HELP pytech_http_requests_in_flight Requests currently being handled by route.")
+        lines.append("# TYPE pytech_http_requests_in_flight gauge")
+        for (method, route), count in sorted(self._in_flight.items()):
+            lines.append(f"pytech_http_requests_in_flight{_labels({'method': method, 'route': route})} {count}")
+        lines.append("# HELP pytech_http_slow_requests_total Requests slower than the slow-request threshold.")
+        lines.append("# TYPE pytech_http_slow_requests_total counter")
+        lines.append(f"pytech_http_slow_requests_total {self.slow_requests}")
+        return lines
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording ``HttpMetrics`` for requests under ``prefix``."""
+
+    def __init__(self, app, metrics: HttpMetrics, router, prefix: str = "/api"):
+        self.app = app
+        self.metrics = metrics
+        self.router = router
+        self.prefix = prefix
+
+    def _route(self, scope) -> str:
+        # Resolved up front so in-flight requests are attributed to their route template.
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return UNMATCHED_ROUTE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        method, route = scope["method"], self._route(scope)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        timing = RequestTiming()
+        token = _current_request.set(timing)
+        self.metrics.started(method, route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.finished(method, route, status, time.perf_counter() - started, timing)
+            _current_request.reset(token)
+
+
+def render_metrics(*sources) -> str:
+    lines: List[str] = []
+    for source in sources:
+        lines.extend(source.exposition())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,86 @@
+from pydantic import BaseModel, Field, ConfigDict
+from typing import List, Optional
+import uuid
+from datetime import datetime, timezone
+
+class Service(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    name: str
+    slug: str
+    description: str
+    short_description: str
+    features: List[str]
+    process_steps: List[dict]
+    keywords: List[str]
+
+class City(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    name: str
+    slug: str
+    state: str
+    tier: str
+    areas: List[str]
+
+class Testimonial(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    client_name: str
+    company: str
+    rating: int
+    content: str
+    city: Optional[str] = None
+
+class Portfolio(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    title: str
+    category: str
+    description: str
+    image_url: str
+    city: Optional[str] = None
+
+class ContactForm(BaseModel):
+    name: str
+    email: str
+    phone: str
+    city: str
+    service: str
+    message: str
+
+class AdmissionLimitsUpdate(BaseModel):
+    ip_per_minute: Optional[float] = Field(None, ge=0)
+    ip_burst: Optional[float] = Field(None, ge=1)
+    global_per_second: Optional[float] = Field(None, ge=0)
+    global_burst: Optional[float] = Field(None, ge=1)
+    dedup_seconds: Optional[float] = Field(None, ge=0)
+
+class ContactSubmission(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    name: str
+    email: str
+    phone: str
+    city: str
+    service: str
+    message: str
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class ServiceCityPage(BaseModel):
+    service: Service
+    city: City
+    meta_title: str
+    meta_description: str
+    keywords: List[str]
+
+class ServiceCityAreaPage(ServiceCityPage):
+    area: str
+    area_slug: str
+
+class ServiceCityPair(BaseModel):
+    service_slug: str
+    city_slug: str
+
+class ServiceCityBatchRequest(BaseModel):
+    pairs: List[ServiceCityPair] = Field(..., min_length=1)
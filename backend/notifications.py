@@ -0,0 +1,309 @@
+"""Lead notifications delivered from a persistent outbox by background workers.
+
+Every written contact submission gets a row in ``notification_outbox``. Each
+worker in the pool claims a due row only when it is free to deliver it
+(leasing it so a crashed worker's rows are picked up again), delivers it
+through a pluggable transport, and failures are retried with exponential
+backoff until ``max_attempts``, after which the row moves to
+``notification_dead_letter``.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import smtplib
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from pathlib import Path
+from typing import List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+OUTBOX = "notification_outbox"
+DEAD_LETTER = "notification_dead_letter"
+
+
+def render_lead(payload: dict) -> tuple:
+    """Subject and plain-text body for a contact submission."""
+    subject = f"New enquiry from {payload['name']} ({payload['service']}, {payload['city']})"
+    body = "\n".join(
+        f"{label}: {payload.get(key, '')}"
+        for label, key in (
+            ("Name", "name"), ("Email", "email"), ("Phone", "phone"), ("City", "city"),
+            ("Service", "service"), ("Message", "message"), ("Submitted", "timestamp"),
+        )
+    )
+    return subject, body
+
+
+class LogTransport:
+    """Writes notifications to the application log; the default stand-in."""
+
+    name = "log"
+
+    async def send(self, notification: dict) -> None:
+        subject, body = render_lead(notification["payload"])
+        logger.info(f"Notification: {subject}\n{body}")
+
+
+class FileTransport:
+    """Appends one JSON line per notification, handy for local testing."""
+
+    name = "file"
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def _append(self, line: str) -> None:
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    async def send(self, notification: dict) -> None:
+        line = json.dumps({"id": notification["_id"], **notification["payload"]}, default=str)
+        await asyncio.to_thread(self._append, line)
+
+
+class WebhookTransport:
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, data: bytes) -> None:
+        request = urllib.request.Request(self.url, data=data, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    async def send(self, notification: dict) -> None:
+        subject, _ = render_lead(notification["payload"])
+        data = json.dumps({"id": notification["_id"], "subject": subject, "lead": notification["payload"]}, default=str)
+        await asyncio.to_thread(self._post, data.encode())
+
+
+class SmtpTransport:
+    name = "smtp"
+
+    def __init__(self, host: str, port: int, sender: str, recipients: List[str],
+                 username: Optional[str] = None, password: Optional[str] = None,
+                 starttls: bool = True, timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = recipients
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def _deliver(self, message: EmailMessage) -> None:
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            smtp.send_message(message)
+
+    async def send(self, notification: dict) -> None:
+        subject, body = render_lead(notification["payload"])
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = self.sender
+        message["To"] = ", ".join(self.recipients)
+        message["Reply-To"] = notification["payload"]["email"]
+        message.set_content(body)
+        await asyncio.to_thread(self._deliver, message)
+
+
+def transport_from_env():
+    kind = os.environ.get('NOTIFY_TRANSPORT', 'log')
+    if kind == "log":
+        return LogTransport()
+    if kind == "file":
+        return FileTransport(os.environ.get('NOTIFY_FILE', 'notifications.jsonl'))
+    if kind == "webhook":
+        return WebhookTransport(os.environ['NOTIFY_WEBHOOK_URL'])
+    if kind == "smtp":
+        return SmtpTransport(
+            host=os.environ['SMTP_HOST'],
+            port=int(os.environ.get('SMTP_PORT', '587')),
+            sender=os.environ['SMTP_FROM'],
+            recipients=os.environ['NOTIFY_EMAIL_TO'].split(','),
+            username=os.environ.get('SMTP_USER'),
+            password=os.environ.get('SMTP_PASSWORD'),
+            starttls=os.environ.get('SMTP_STARTTLS', 'true').lower() in ('1', 'true', 'yes'),
+        )
+    raise ValueError(f"Unknown NOTIFY_TRANSPORT: {kind}")
+
+
+class NotificationWorkerPool:
+    def __init__(
+        self,
+        db,
+        transport,
+        concurrency: int = 4,
+        max_attempts: int = 6,
+        base_delay: float = 2.0,
+        max_delay: float = 600.0,
+        lease: float = 120.0,
+        poll_interval: float = 5.0,
+        shutdown_grace: float = 10.0,
+    ):
+        self._outbox = db[OUTBOX]
+        self._dead_letter = db[DEAD_LETTER]
+        self.transport = transport
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.shutdown_grace = shutdown_grace
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+        self._in_flight = 0
+        self.counters = {"enqueued": 0, "delivered": 0, "retried": 0, "dead_lettered": 0, "errors": 0}
+
+    async def enqueue(self, submissions: List[dict]) -> None:
+        """Contact write listener: add an outbox row for each written submission."""
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "_id": doc["id"],
+                "kind": "contact_submission",
+                "payload": {k: v for k, v in doc.items() if k != "_id"},
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": now,
+                "created_at": now,
+            }
+            for doc in submissions
+        ]
+        try:
+            await self._outbox.insert_many(rows, ordered=False)
+        except BulkWriteError as e:
+            # A duplicate _id means the row already exists, which is what we want.
+            if any(w.get("code") != 11000 for w in e.details.get("writeErrors", [])):
+                raise
+        self.counters["enqueued"] += len(rows)
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        logger.info(f"Notification workers started: {self.concurrency} x {self.transport.name}")
+
+    async def stop(self) -> None:
+        """Stop claiming rows and let deliveries in progress finish, up to ``shutdown_grace``.
+
+        A delivery cancelled midway keeps running in its transport thread while
+        its row stays leased, so it would be sent again once the lease expires;
+        workers are only cancelled when the grace period runs out.
+        """
+        # Idle workers see the flag as soon as they wake, busy ones after their delivery.
+        self._stopping = True
+        self._wakeup.set()
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(self._tasks, timeout=self.shutdown_grace)
+        if pending:
+            logger.warning(
+                f"{self._in_flight} notification deliveries still running after {self.shutdown_grace:.0f}s; "
+                f"their rows are retried once the lease expires"
+            )
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await self._outbox.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"status": "sending", "lease_until": {"$lte": now}},
+            ]},
+            {"$set": {"status": "sending", "lease_until": now + timedelta(seconds=self.lease)},
+             "$inc": {"attempts": 1}},
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _work(self) -> None:
+        # Rows are only claimed by a worker about to deliver them, so a lease
+        # never runs out while the row waits behind slow deliveries.
+        while not self._stopping:
+            # Cleared before claiming, so a wakeup arriving during the claim is kept.
+            self._wakeup.clear()
+            try:
+                row = await self._claim()
+            except PyMongoError as e:
+                self.counters["errors"] += 1
+                logger.warning(f"Notification outbox claim failed: {e}")
+                row = None
+            if row is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._in_flight += 1
+            try:
+                await self._deliver(row)
+            except PyMongoError as e:
+                self.counters["errors"] += 1
+                logger.warning(f"Notification bookkeeping failed for {row['_id']}: {e}")
+            finally:
+                self._in_flight -= 1
+
+    async def _deliver(self, row: dict) -> None:
+        try:
+            await self.transport.send(row)
+        except Exception as e:
+            await self._failed(row, e)
+            return
+        await self._outbox.delete_one({"_id": row["_id"]})
+        self.counters["delivered"] += 1
+
+    async def _failed(self, row: dict, error: Exception) -> None:
+        message = f"{type(error).__name__}: {error}"
+        if row["attempts"] >= self.max_attempts:
+            await self._dead_letter.replace_one(
+                {"_id": row["_id"]},
+                {**row, "status": "dead", "last_error": message, "failed_at": datetime.now(timezone.utc)},
+                upsert=True,
+            )
+            await self._outbox.delete_one({"_id": row["_id"]})
+            self.counters["dead_lettered"] += 1
+            logger.error(f"Notification {row['_id']} dead-lettered after {row['attempts']} attempts: {message}")
+            return
+        delay = min(self.max_delay, self.base_delay * 2 ** (row["attempts"] - 1))
+        delay *= random.uniform(0.8, 1.2)
+        await self._outbox.update_one(
+            {"_id": row["_id"]},
+            {"$set": {"status": "pending", "last_error": message,
+                      "next_attempt_at": datetime.now(timezone.utc) + timedelta(seconds=delay)}},
+        )
+        self.counters["retried"] += 1
+        if delay < self.poll_interval:
+            asyncio.get_running_loop().call_later(delay, self._wakeup.set)
+        logger.warning(f"Notification {row['_id']} attempt {row['attempts']} failed, retrying in {delay:.0f}s: {message}")
+
+    async def stats(self) -> dict:
+        try:
+            backlog = await self._outbox.count_documents({})
+        except PyMongoError:
+            backlog = None
+        return {
+            **self.counters,
+            "transport": self.transport.name,
+            "concurrency": self.concurrency,
+            "in_flight": self._in_flight,
+            "outbox_backlog": backlog,
+        }
@@ -0,0 +1,229 @@
+"""Precomputed service x city landing pages.
+
+Every ``ServiceCityPage`` is fully determined by one service and one city
+document, so the store materializes all of them as pre-serialized JSON whenever
+the catalog changes. Only the rows and columns of services or cities whose
+content changed are rebuilt.
+
+Service x city x area pages multiply that space by the number of areas, so
+they are rendered on first request instead and kept in a bounded LRU.
+"""
+import logging
+import re
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+from catalog import CatalogSnapshot, content_digest
+from models import Service, City, ServiceCityPage, ServiceCityAreaPage
+from singleflight import NegativeCache
+
+logger = logging.getLogger(__name__)
+
+PageKey = Tuple[str, str]
+AreaPageKey = Tuple[int, str, str, str]
+
+
+def area_slug(area: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", area.lower()).strip("-")
+
+
+def build_service_city_page(service: dict, city: dict) -> ServiceCityPage:
+    service_name = service['name']
+    service_lower = service_name.lower()
+    city_name = city['name']
+    city_lower = city_name.lower()
+
+    meta_title = f"{service_name} Company in {city_name} | PyTech Digital"
+    meta_description = f"Professional {service_name} services in {city_name}. PyTech Digital offers expert {service_lower} solutions. Contact us: +91 9205 222 170"
+    keywords = [
+        f"{service_lower} company in {city_lower}",
+        f"{service_lower} services in {city_lower}",
+        f"best {service_lower} agency in {city_lower}",
+        f"{service_lower} near me",
+        f"professional {service_lower} {city_lower}"
+    ]
+
+    return ServiceCityPage(
+        service=Service(**service),
+        city=City(**city),
+        meta_title=meta_title,
+        meta_description=meta_description,
+        keywords=keywords
+    )
+
+
+def render_service_city_page(service: dict, city: dict) -> bytes:
+    return build_service_city_page(service, city).model_dump_json().encode()
+
+
+def build_service_city_area_page(service: dict, city: dict, area: str) -> ServiceCityAreaPage:
+    service_name = service['name']
+    service_lower = service_name.lower()
+    place = f"{area}, {city['name']}"
+    area_lower = area.lower()
+
+    meta_title = f"{service_name} Company in {place} | PyTech Digital"
+    meta_description = f"Professional {service_name} services in {place}. PyTech Digital offers expert {service_lower} solutions. Contact us: +91 9205 222 170"
+    keywords = [
+        f"{service_lower} company in {area_lower}",
+        f"{service_lower} services in {area_lower}",
+        f"best {service_lower} agency in {area_lower} {city['name'].lower()}",
+        f"{service_lower} near {area_lower}",
+        f"professional {service_lower} {area_lower}"
+    ]
+
+    return ServiceCityAreaPage(
+        service=Service(**service),
+        city=City(**city),
+        area=area,
+        area_slug=area_slug(area),
+        meta_title=meta_title,
+        meta_description=meta_description,
+        keywords=keywords
+    )
+
+
+class ServiceCityPageStore:
+    """Immutable map of ``(service_slug, city_slug)`` to page JSON bytes."""
+
+    def __init__(self):
+        self._pages: Mapping[PageKey, bytes] = MappingProxyType({})
+        self._service_digests: Dict[str, str] = {}
+        self._city_digests: Dict[str, str] = {}
+        self._catalog_digest: Optional[str] = None
+        self._attached: Optional[Tuple[str, Mapping[PageKey, bytes]]] = None
+        self.generation = 0
+        self.catalog_version: Optional[int] = None
+        self.counters = {"full_builds": 0, "incremental_builds": 0, "pages_built": 0, "attached": 0}
+
+    @property
+    def pages(self) -> Mapping[PageKey, bytes]:
+        return self._pages
+
+    def get(self, service_slug: str, city_slug: str) -> Optional[bytes]:
+        return self._pages.get((service_slug, city_slug))
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def attach(self, pages: Mapping[PageKey, bytes], catalog_digest: str) -> None:
+        """Serve ``pages`` (e.g. from a mapped snapshot file) while the catalog digest matches.
+
+        If the store is already at that catalog version the pages are swapped in
+        now, releasing the in-memory copies; otherwise the next rebuild for that
+        digest adopts them instead of rendering.
+        """
+        if self._catalog_digest == catalog_digest:
+            self._pages = pages
+        else:
+            self._attached = (catalog_digest, pages)
+
+    def rebuild(self, old: Optional[CatalogSnapshot], new: CatalogSnapshot) -> None:
+        """Catalog listener: bring the pages in line with ``new``."""
+        started = time.perf_counter()
+        service_digests = {slug: content_digest(doc) for slug, doc in new.services_by_slug.items()}
+        city_digests = {slug: content_digest(doc) for slug, doc in new.cities_by_slug.items()}
+
+        attached, self._attached = self._attached, None
+        if attached is not None and attached[0] == new.digest:
+            pages = attached[1]
+            changed_services, changed_cities = set(), set()
+            self.counters["attached"] += 1
+        elif not self._pages:
+            pages = {}
+            changed_services, changed_cities = set(service_digests), set(city_digests)
+            self.counters["full_builds"] += 1
+        else:
+            changed_services = {s for s, d in service_digests.items() if self._service_digests.get(s) != d}
+            changed_cities = {c for c, d in city_digests.items() if self._city_digests.get(c) != d}
+            pages = {
+                key: page for key, page in self._pages.items()
+                if key[0] in service_digests and key[1] in city_digests
+            }
+            self.counters["incremental_builds"] += 1
+
+        built = 0
+        for service_slug, service in new.services_by_slug.items():
+            service_changed = service_slug in changed_services
+            for city_slug, city in new.cities_by_slug.items():
+                if service_changed or city_slug in changed_cities:
+                    pages[(service_slug, city_slug)] = render_service_city_page(service, city)
+                    built += 1
+
+        self._pages = pages if attached is not None and pages is attached[1] else MappingProxyType(pages)
+        self._catalog_digest = new.digest
+        self._service_digests = service_digests
+        self._city_digests = city_digests
+        self.generation += 1
+        self.catalog_version = new.version
+        self.counters["pages_built"] += built
+        logger.info(
+            f"Service-city pages generation {self.generation}: rebuilt {built} of {len(pages)} "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "generation": self.generation,
+            "catalog_version": self.catalog_version,
+            "pages": len(self._pages),
+        }
+
+
+class AreaPageCache:
+    """Service x city x area page JSON, rendered on demand and bounded to ``max_entries``.
+
+    Keys include the catalog version, so a page is never served from an older
+    catalog; the cache is also emptied when the catalog changes to release them.
+    Combinations that do not exist are remembered for ``negative_ttl`` seconds.
+    """
+
+    def __init__(self, max_entries: int = 2000, negative_ttl: float = 30.0):
+        self.max_entries = max_entries
+        self._pages: "OrderedDict[AreaPageKey, bytes]" = OrderedDict()
+        self._missing = NegativeCache(ttl=negative_ttl, max_entries=max_entries)
+        self.counters = {"hits": 0, "renders": 0, "evictions": 0, "not_found": 0}
+
+    def get(self, snapshot: CatalogSnapshot, service_slug: str, city_slug: str, slug: str) -> Optional[bytes]:
+        key = (snapshot.version, service_slug, city_slug, slug)
+        page = self._pages.get(key)
+        if page is not None:
+            self._pages.move_to_end(key)
+            self.counters["hits"] += 1
+            return page
+        if key in self._missing:
+            self.counters["not_found"] += 1
+            return None
+
+        service = snapshot.services_by_slug.get(service_slug)
+        city = snapshot.cities_by_slug.get(city_slug)
+        area = next((a for a in (city or {}).get("areas") or [] if area_slug(a) == slug), None)
+        if service is None or area is None:
+            self.counters["not_found"] += 1
+            self._missing.add(key)
+            return None
+
+        page = build_service_city_area_page(service, city, area).model_dump_json().encode()
+        self._pages[key] = page
+        self.counters["renders"] += 1
+        while len(self._pages) > self.max_entries:
+            self._pages.popitem(last=False)
+            self.counters["evictions"] += 1
+        return page
+
+    def invalidate(self, old: Optional[CatalogSnapshot], new: CatalogSnapshot) -> None:
+        """Catalog listener: pages keyed by older versions can no longer be requested."""
+        self._pages.clear()
+        self._missing.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "entries": len(self._pages),
+            "max_entries": self.max_entries,
+            "bytes": sum(len(page) for page in self._pages.values()),
+            "negative_cache": self._missing.stats(),
+        }
@@ -0,0 +1,274 @@
+"""In-memory typeahead index over services, cities and their areas.
+
+Services are indexed by name, keywords and features; cities by name and
+state; each area gets its own entry. Terms live in a sorted list, so prefix
+lookups are a bisect, and typo tolerance (one edit) comes from a
+deletion-neighbourhood table over term prefixes. A query is answered from
+these in-process structures without touching MongoDB.
+
+The index follows the catalog: only entries whose source document changed
+between catalog versions are re-indexed.
+"""
+import logging
+import re
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from catalog import CatalogSnapshot, content_digest
+from pages import area_slug
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Typo tolerance only kicks in once a token is long enough to be unambiguous.
+MIN_TYPO_LENGTH = 4
+MAX_PREFIX_TERMS = 200
+
+EXACT, PREFIX, TYPO = 3.0, 2.0, 1.0
+SERVICE_FIELDS = (("name", 3.0), ("keywords", 2.0), ("features", 1.0))
+CITY_FIELDS = (("name", 3.0), ("state", 2.0))
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def _deletes(term: str) -> Iterator[str]:
+    for i in range(len(term)):
+        yield term[:i] + term[i + 1:]
+
+
+@dataclass(frozen=True)
+class Entry:
+    kind: str
+    label: str
+    service_slug: Optional[str] = None
+    city_slug: Optional[str] = None
+    area: Optional[str] = None
+
+
+def _weigh(terms: Dict[str, float], values, weight: float) -> None:
+    for value in values:
+        for term in tokenize(value):
+            terms[term] = max(terms.get(term, 0.0), weight)
+
+
+def _field_values(doc: dict, field: str) -> List[str]:
+    value = doc.get(field)
+    if value is None:
+        return []
+    return list(value) if isinstance(value, list) else [value]
+
+
+class SearchIndex:
+    def __init__(self):
+        self._entries: Dict[str, Entry] = {}
+        self._entry_terms: Dict[str, Dict[str, float]] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._terms: List[str] = []
+        # deletion variant of a term prefix -> terms it was derived from
+        self._variants: Dict[str, Dict[str, int]] = {}
+        self._service_digests: Dict[str, str] = {}
+        self._city_digests: Dict[str, str] = {}
+        self.catalog_version: Optional[int] = None
+        self.counters = {"builds": 0, "entries_updated": 0, "queries": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # -- maintenance -------------------------------------------------------
+
+    def _add_term(self, term: str) -> None:
+        insort(self._terms, term)
+        for length in range(MIN_TYPO_LENGTH, len(term) + 1):
+            prefix = term[:length]
+            for variant in (prefix, *_deletes(prefix)):
+                owners = self._variants.setdefault(variant, {})
+                owners[term] = owners.get(term, 0) + 1
+
+    def _remove_term(self, term: str) -> None:
+        del self._terms[bisect_left(self._terms, term)]
+        for length in range(MIN_TYPO_LENGTH, len(term) + 1):
+            prefix = term[:length]
+            for variant in (prefix, *_deletes(prefix)):
+                owners = self._variants[variant]
+                owners[term] -= 1
+                if not owners[term]:
+                    del owners[term]
+                    if not owners:
+                        del self._variants[variant]
+
+    def _put(self, key: str, entry: Entry, terms: Dict[str, float]) -> None:
+        self._drop(key)
+        self._entries[key] = entry
+        self._entry_terms[key] = terms
+        for term, weight in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._add_term(term)
+            postings[key] = weight
+        self.counters["entries_updated"] += 1
+
+    def _drop(self, key: str) -> None:
+        if key not in self._entries:
+            return
+        del self._entries[key]
+        for term in self._entry_terms.pop(key):
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+                self._remove_term(term)
+
+    def _put_service(self, service: dict) -> None:
+        terms: Dict[str, float] = {}
+        for field, weight in SERVICE_FIELDS:
+            _weigh(terms, _field_values(service, field), weight)
+        self._put(f"service:{service['slug']}", Entry("service", service["name"], service_slug=service["slug"]), terms)
+
+    def _put_city(self, city: dict) -> None:
+        self._drop_city(city["slug"])
+        terms: Dict[str, float] = {}
+        for field, weight in CITY_FIELDS:
+            _weigh(terms, _field_values(city, field), weight)
+        self._put(f"city:{city['slug']}", Entry("city", city["name"], city_slug=city["slug"]), terms)
+        for area in city.get("areas") or []:
+            area_terms: Dict[str, float] = {}
+            _weigh(area_terms, [area], 3.0)
+            _weigh(area_terms, [city["name"]], 1.0)
+            self._put(
+                f"area:{city['slug']}:{area}",
+                Entry("area", f"{area}, {city['name']}", city_slug=city["slug"], area=area),
+                area_terms,
+            )
+
+    def _drop_city(self, slug: str) -> None:
+        self._drop(f"city:{slug}")
+        for key in [k for k in self._entries if k.startswith(f"area:{slug}:")]:
+            self._drop(key)
+
+    def update(self, old: Optional[CatalogSnapshot], new: CatalogSnapshot) -> None:
+        """Catalog listener: re-index the services and cities that changed."""
+        started = time.perf_counter()
+        service_digests = {slug: content_digest(doc) for slug, doc in new.services_by_slug.items()}
+        city_digests = {slug: content_digest(doc) for slug, doc in new.cities_by_slug.items()}
+        before = self.counters["entries_updated"]
+
+        for slug in self._service_digests.keys() - service_digests.keys():
+            self._drop(f"service:{slug}")
+        for slug, digest in service_digests.items():
+            if self._service_digests.get(slug) != digest:
+                self._put_service(new.services_by_slug[slug])
+        for slug in self._city_digests.keys() - city_digests.keys():
+            self._drop_city(slug)
+        for slug, digest in city_digests.items():
+            if self._city_digests.get(slug) != digest:
+                self._put_city(new.cities_by_slug[slug])
+
+        self._service_digests = service_digests
+        self._city_digests = city_digests
+        self.catalog_version = new.version
+        self.counters["builds"] += 1
+        logger.info(
+            f"Search index for catalog version {new.version}: {self.counters['entries_updated'] - before} "
+            f"entries updated, {len(self._entries)} total in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+
+    # -- queries -----------------------------------------------------------
+
+    def _match_token(self, token: str) -> Dict[str, float]:
+        """Best score per entry for one query token."""
+        matched: Dict[str, float] = {}
+
+        def credit(term: str, quality: float) -> None:
+            # Longer completions of a short prefix rank below closer ones.
+            closeness = min(len(token), len(term)) / max(len(token), len(term))
+            for key, weight in self._postings[term].items():
+                score = weight * quality * (0.5 + 0.5 * closeness)
+                if score > matched.get(key, 0.0):
+                    matched[key] = score
+
+        start = bisect_left(self._terms, token)
+        for term in self._terms[start:start + MAX_PREFIX_TERMS]:
+            if not term.startswith(token):
+                break
+            credit(term, EXACT if term == token else PREFIX)
+
+        if len(token) >= MIN_TYPO_LENGTH:
+            candidates: Set[str] = set()
+            for variant in (token, *_deletes(token)):
+                candidates.update(self._variants.get(variant, ()))
+            for term in candidates:
+                if not term.startswith(token):
+                    credit(term, TYPO)
+        return matched
+
+    def search(self, query: str, limit: int = 8) -> List[dict]:
+        self.counters["queries"] += 1
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        per_token = [self._match_token(token) for token in tokens]
+
+        scored: Dict[Tuple[str, ...], float] = {}
+        common = set(per_token[0]).intersection(*per_token[1:])
+        for key in common:
+            scored[(key,)] = sum(matches[key] for matches in per_token)
+
+        if len(tokens) > 1:
+            # "seo delhi": every token matches either the service or the place.
+            def top(kind_prefix: Tuple[str, ...]) -> List[str]:
+                totals: Dict[str, float] = {}
+                for matches in per_token:
+                    for key, score in matches.items():
+                        if key.startswith(kind_prefix):
+                            totals[key] = totals.get(key, 0.0) + score
+                return sorted(totals, key=totals.get, reverse=True)[:10]
+
+            for service_key in top(("service:",)):
+                for place_key in top(("city:", "area:")):
+                    best = [max(m.get(service_key, 0.0), m.get(place_key, 0.0)) for m in per_token]
+                    if all(best) and any(service_key in m for m in per_token) and any(place_key in m for m in per_token):
+                        # Slightly ahead of either half alone: the combination is what was asked for.
+                        scored[(service_key, place_key)] = sum(best) + 1.0
+
+        ranked = sorted(scored.items(), key=lambda item: (-item[1], self._label(item[0])))
+        return [self._suggestion(keys, score) for keys, score in ranked[:limit]]
+
+    def _label(self, keys: Tuple[str, ...]) -> str:
+        return " in ".join(self._entries[key].label for key in keys)
+
+    def _suggestion(self, keys: Tuple[str, ...], score: float) -> dict:
+        entries = [self._entries[key] for key in keys]
+        if len(entries) == 1:
+            entry = entries[0]
+            suggestion = {"type": entry.kind, "label": entry.label}
+            for field in ("service_slug", "city_slug", "area"):
+                if getattr(entry, field):
+                    suggestion[field] = getattr(entry, field)
+        else:
+            service, place = entries
+            suggestion = {
+                "type": "service_city",
+                "label": self._label(keys),
+                "service_slug": service.service_slug,
+                "city_slug": place.city_slug,
+                "path": f"/{service.service_slug}/{place.city_slug}",
+            }
+            if place.area:
+                suggestion["area"] = place.area
+                suggestion["path"] += f"/{area_slug(place.area)}"
+        suggestion["score"] = round(score, 3)
+        return suggestion
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "catalog_version": self.catalog_version,
+            "entries": len(self._entries),
+            "terms": len(self._terms),
+            "typo_variants": len(self._variants),
+        }
@@ -0,0 +1,84 @@
+"""Versioned seed data for the catalog collections.
+
+Each ``seed_data/<collection>.json`` holds ``{"version": N, "documents": [...]}``.
+The checksum of every file is recorded in the ``_meta`` collection, so a warm
+start costs a single ``find_one`` to confirm nothing changed. Collections whose
+seed file changed (or was never applied) are upserted concurrently by ``id``,
+which makes seeding idempotent.
+
+Seeding only adds documents: one that already exists keeps its content, since
+it may have been edited in the database since. A non-empty collection with no
+recorded checksum was seeded before checksums existed; its checksum is
+recorded without writing, so deleted documents do not come back either.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+SEED_DIR = Path(__file__).parent / "seed_data"
+SEED_COLLECTIONS = ("services", "cities", "testimonials", "portfolio")
+META_COLLECTION = "_meta"
+META_ID = "seed"
+
+
+def _read_seed_file(name: str) -> Tuple[bytes, str]:
+    raw = (SEED_DIR / f"{name}.json").read_bytes()
+    return raw, hashlib.sha256(raw).hexdigest()
+
+
+def load_seed_data() -> Dict[str, List[dict]]:
+    """Documents of every seed file, keyed by collection."""
+    return {name: json.loads(_read_seed_file(name)[0])["documents"] for name in SEED_COLLECTIONS}
+
+
+async def _upsert(collection, documents: List[dict]) -> int:
+    if not documents:
+        return 0
+    result = await collection.bulk_write(
+        [UpdateOne({"id": doc["id"]}, {"$setOnInsert": doc}, upsert=True) for doc in documents],
+        ordered=False,
+    )
+    return result.upserted_count
+
+
+async def seed_database(db) -> Dict[str, int]:
+    """Apply any seed files not yet recorded in ``_meta``; returns documents added per collection."""
+    started = time.perf_counter()
+    checksums = {name: _read_seed_file(name) for name in SEED_COLLECTIONS}
+    meta = await db[META_COLLECTION].find_one({"_id": META_ID}) or {}
+    applied = meta.get("collections", {})
+    stale = [name for name, (_, checksum) in checksums.items() if applied.get(name, {}).get("checksum") != checksum]
+
+    if not stale:
+        logger.info(f"Seed data current (warm start) in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return {}
+
+    # Only files that changed are parsed.
+    files = {name: json.loads(checksums[name][0]) for name in stale}
+    adopted = [name for name in stale if name not in applied and await db[name].estimated_document_count()]
+    counts = await asyncio.gather(*(
+        _upsert(db[name], [] if name in adopted else files[name]["documents"]) for name in stale
+    ))
+    await db[META_COLLECTION].update_one(
+        {"_id": META_ID},
+        {"$set": {
+            f"collections.{name}": {"version": files[name]["version"], "checksum": checksums[name][1]}
+            for name in stale
+        }},
+        upsert=True,
+    )
+    changed = dict(zip(stale, counts))
+    summary = ", ".join(
+        f"{name} v{files[name]['version']} " + ("(existing data adopted)" if name in adopted else f"({changed[name]} added)")
+        for name in stale
+    )
+    logger.info(f"Seeded {summary} (cold start) in {(time.perf_counter() - started) * 1000:.1f}ms")
+    return changed
@@ -1,22 +1,161 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
+import time
+import json
+import asyncio
+import hmac
+from datetime import datetime
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional
-import uuid
-from datetime import datetime, timezone
+
+from catalog import CatalogCache
+from models import Service, City, Testimonial, Portfolio, ContactForm, ContactSubmission, AdmissionLimitsUpdate, ServiceCityPage, ServiceCityAreaPage, ServiceCityBatchRequest
+from pages import ServiceCityPageStore, AreaPageCache
+from http_cache import ConditionalGet, make_etag, encoded_etag
+from sitemap import SitemapBuilder
+from fast_json import EncodedCatalog, dumps
+from contact_queue import ContactWriteQueue, ContactQueueFull
+from notifications import NotificationWorkerPool, transport_from_env
+from indexes import ensure_indexes
+from seed import seed_database
+from locks import MongoLease, LeaseTimeout
+from catalog_snapshot import CatalogSnapshotFile
+from metrics import HttpMetrics, MongoCommandMetrics, MetricsMiddleware, render_metrics
+from storage import storage_from_env
+from search import SearchIndex
+from listing import ListingIndex, ListingError, decode_cursor, parse_fields
+from compression import CompressedVariants, CompressionMiddleware, negotiate
+from admission import AdmissionControl, AdmissionLimits, AdmissionRejected, IdempotencyConflict, submission_key
+from leads import LeadRollups, lead_filter, export_csv, export_ndjson
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Storage: MongoDB, or embedded (catalog from a local snapshot, no database connection)
+# The snapshot is trusted as a catalog source, so it lives in a directory the app owns
+catalog_snapshot_path = os.environ.get('CATALOG_SNAPSHOT_PATH', str(ROOT_DIR / "var" / f"catalog-{os.environ.get('DB_NAME', 'pytech')}.snap"))
+mongo_metrics = MongoCommandMetrics()
+storage = storage_from_env(event_listeners=[mongo_metrics], snapshot_path=catalog_snapshot_path)
+db = storage.db
+
+# In-memory catalog cache (services, cities, testimonials, portfolio)
+catalog = CatalogCache(
+    storage,
+    ttl=float(os.environ.get('CATALOG_TTL_SECONDS', '300')),
+    invalidation=os.environ.get('CATALOG_INVALIDATION', 'change_stream' if db is not None else 'ttl'),
+    poll_interval=float(os.environ.get('CATALOG_POLL_SECONDS', '30')),
+    debounce=float(os.environ.get('CATALOG_DEBOUNCE_MS', '500')) / 1000,
+)
+
+# Pre-serialized service-city landing pages, rebuilt whenever the catalog changes
+service_city_pages = ServiceCityPageStore()
+catalog.subscribe(service_city_pages.rebuild)
+
+# Upper bound on pairs per POST /api/service-city/batch
+SERVICE_CITY_BATCH_MAX = int(os.environ.get('SERVICE_CITY_BATCH_MAX', '500'))
+
+# Service-city-area pages, rendered on first request into a bounded LRU
+area_pages = AreaPageCache(
+    max_entries=int(os.environ.get('AREA_PAGE_CACHE_SIZE', '2000')),
+    negative_ttl=float(os.environ.get('NEGATIVE_CACHE_SECONDS', '30')),
+)
+catalog.subscribe(area_pages.invalidate)
+
+# Catalog and pages shared by the workers on this node through a memory-mapped file
+catalog_snapshot = None
+if catalog_snapshot_path:
+    catalog_snapshot = CatalogSnapshotFile(
+        Path(catalog_snapshot_path),
+        service_city_pages,
+        max_age=float(os.environ.get('CATALOG_SNAPSHOT_MAX_AGE', os.environ.get('CATALOG_TTL_SECONDS', '300'))),
+    )
+    catalog.subscribe(catalog_snapshot.publish)
+
+# Only one worker reconciles indexes and seeds at a time; the rest wait and find the seed current
+startup_lease = None
+if db is not None:
+    startup_lease = MongoLease(db, "startup", wait_timeout=float(os.environ.get('STARTUP_LOCK_TIMEOUT', '120')))
+database_ready: Optional[asyncio.Task] = None
+
+# Opt-in fast path: catalog responses validated once per version and served as raw JSON bytes
+encoded_catalog = EncodedCatalog(enabled=os.environ.get('FAST_JSON_RESPONSES', 'false').lower() in ('1', 'true', 'yes'))
+catalog.subscribe(encoded_catalog.rebuild)
+
+# ETag / Last-Modified validation for catalog read routes
+conditional_get = ConditionalGet(os.environ.get('CATALOG_CACHE_CONTROL', 'public, max-age=300'))
+
+# XML sitemaps streamed from the catalog, sharded at the 50k-URL protocol limit
+sitemaps = SitemapBuilder(
+    os.environ.get('SITE_URL', 'https://pytech.digital'),
+    shard_size=int(os.environ.get('SITEMAP_SHARD_SIZE', '50000')),
+    api_url=os.environ.get('SITEMAP_API_URL'),
+)
+catalog.subscribe(sitemaps.invalidate)
+
+# Filter indexes and keyset pagination for the catalog list routes
+listings = ListingIndex(max_limit=int(os.environ.get('LIST_MAX_LIMIT', '200')))
+catalog.subscribe(listings.rebuild)
+
+# Typeahead index over services, cities and areas, updated per catalog version
+search_index = SearchIndex()
+catalog.subscribe(search_index.update)
+
+# Write-behind batching for contact submissions (none on an embedded node without a contact log)
+contact_queue = None
+if storage.contacts is not None:
+    contact_queue = ContactWriteQueue(
+        storage.contacts,
+        max_size=int(os.environ.get('CONTACT_QUEUE_SIZE', '1000')),
+        batch_size=int(os.environ.get('CONTACT_BATCH_SIZE', '100')),
+        flush_interval=float(os.environ.get('CONTACT_FLUSH_MS', '50')) / 1000,
+        durable=os.environ.get('CONTACT_WRITE_DURABLE', 'false').lower() in ('1', 'true', 'yes'),
+    )
+
+# Lead notifications, delivered from an outbox by background workers (MongoDB only)
+notifier = None
+if db is not None:
+    notifier = NotificationWorkerPool(
+        db,
+        transport_from_env(),
+        concurrency=int(os.environ.get('NOTIFY_WORKERS', '4')),
+        max_attempts=int(os.environ.get('NOTIFY_MAX_ATTEMPTS', '6')),
+        shutdown_grace=float(os.environ.get('NOTIFY_SHUTDOWN_SECONDS', '10')),
+    )
+    # The outbox row is part of the write: retried with it, not best-effort
+    contact_queue.subscribe(notifier.enqueue, required=True)
+
+# Only behind a proxy that sets X-Forwarded-For; otherwise clients could pick their own bucket
+TRUST_FORWARDED_FOR = os.environ.get('TRUST_FORWARDED_FOR', 'false').lower() in ('1', 'true', 'yes')
+# Trusted proxies in front of the app, each appending to X-Forwarded-For; entries left of theirs are client-supplied
+FORWARDED_FOR_HOPS = max(1, int(os.environ.get('FORWARDED_FOR_HOPS', '1')))
+
+# Token buckets and duplicate suppression in front of the contact write path.
+# Behind a proxy request.client is the proxy, so without trusted forwarding every
+# visitor would share one bucket: the per-client limit is then off unless
+# CONTACT_IP_PER_MINUTE is set (e.g. when uvicorn runs with --proxy-headers).
+admission = AdmissionControl(AdmissionLimits(
+    ip_per_minute=float(os.environ.get('CONTACT_IP_PER_MINUTE', '5' if TRUST_FORWARDED_FOR else '0')),
+    ip_burst=float(os.environ.get('CONTACT_IP_BURST', '5')),
+    global_per_second=float(os.environ.get('CONTACT_GLOBAL_PER_SECOND', '20')),
+    global_burst=float(os.environ.get('CONTACT_GLOBAL_BURST', '100')),
+    dedup_seconds=float(os.environ.get('CONTACT_DEDUP_SECONDS', '600')),
+))
+
+# Leads per day, city and service, counted as submissions are written (MongoDB only)
+lead_rollups = None
+if db is not None:
+    lead_rollups = LeadRollups(db)
+    contact_queue.subscribe(lead_rollups.record)
+
+# Compressed bodies of ETagged (catalog) responses, reused until the catalog changes
+compressed_variants = CompressedVariants(max_entries=int(os.environ.get('COMPRESSION_CACHE_SIZE', '2000')))
+catalog.subscribe(compressed_variants.invalidate)
+
+ADMIN_API_TOKEN = os.environ.get('ADMIN_API_TOKEN', '')
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -24,158 +163,410 @@ app = FastAPI()
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Models
-class Service(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str
-    name: str
-    slug: str
-    description: str
-    short_description: str
-    features: List[str]
-    process_steps: List[dict]
-    keywords: List[str]
-
-class City(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str
-    name: str
-    slug: str
-    state: str
-    tier: str
-    areas: List[str]
-
-class Testimonial(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str
-    client_name: str
-    company: str
-    rating: int
-    content: str
-    city: Optional[str] = None
-
-class Portfolio(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str
-    title: str
-    category: str
-    description: str
-    image_url: str
-    city: Optional[str] = None
-
-class ContactForm(BaseModel):
-    name: str
-    email: str
-    phone: str
-    city: str
-    service: str
-    message: str
-
-class ContactSubmission(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    name: str
-    email: str
-    phone: str
-    city: str
-    service: str
-    message: str
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-class ServiceCityPage(BaseModel):
-    service: Service
-    city: City
-    meta_title: str
-    meta_description: str
-    keywords: List[str]
-
 # Routes
 @api_router.get("/")
 async def root():
     return {"message": "PyTech Digital API"}
 
+def fast_response(response: Response, body: Optional[bytes]) -> Optional[Response]:
+    """Wrap pre-encoded JSON (see EncodedCatalog) keeping headers already set on ``response``"""
+    if body is None:
+        return None
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
+
+def field_list(fields: Optional[str]) -> List[str]:
+    """The distinct names in a comma-separated ``fields`` parameter, in order"""
+    return list(dict.fromkeys(f.strip() for f in (fields or "").split(",") if f.strip()))
+
+def project_fields(docs: List[dict], fields: Optional[str], model) -> List[dict]:
+    """Keep only the comma-separated ``fields`` of each document"""
+    if not fields:
+        return docs
+    wanted = field_list(fields)
+    unknown = [f for f in wanted if f not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return [{f: doc[f] for f in wanted if f in doc} for doc in docs]
+
+def list_page(request: Request, response: Response, snapshot, name: str, filters: dict,
+              fields: Optional[str], cursor: Optional[str], limit: Optional[int]) -> Optional[Response]:
+    """A filtered/paginated/projected list, or None when none of those were asked for.
+
+    The body stays a JSON array; the next page is announced in ``X-Next-Cursor``
+    and a ``Link: rel="next"`` header.
+    """
+    if fields is None and cursor is None and limit is None and not any(filters.values()):
+        return None
+    try:
+        wanted = parse_fields(name, fields)
+        after = decode_cursor(name, cursor) if cursor is not None else ""
+    except ListingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Only the parameters that shape the page go into the ETag, so unrelated ones
+    # cannot mint new ETags (and new compressed variants) for the same body.
+    etag = make_etag(
+        snapshot.digests[name], "list", ",".join(wanted), after, str(min(limit or listings.max_limit, listings.max_limit)),
+        *(f"{field}={value.lower()}" for field, value in sorted(filters.items()) if value is not None),
+    )
+    not_modified = conditional_get.check(request, response, etag, snapshot.changed_at)
+    if not_modified:
+        return not_modified
+    try:
+        docs, next_cursor = listings.page(snapshot, name, filters, wanted, cursor, limit)
+    except ListingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = dict(response.headers)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return Response(content=dumps(docs), media_type="application/json", headers=headers)
+
+LIMIT_QUERY = Query(None, ge=1, le=listings.max_limit, description="page size; enables cursor pagination")
+
 @api_router.get("/services", response_model=List[Service])
-async def get_services():
-    services = await db.services.find({}, {"_id": 0}).to_list(100)
-    return services
+async def get_services(
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = LIMIT_QUERY,
+):
+    snapshot = await catalog.get()
+    paged = list_page(request, response, snapshot, "services", {}, fields, cursor, limit)
+    if paged:
+        return paged
+    etag = make_etag(snapshot.digests["services"])
+    return (
+        conditional_get.check(request, response, etag, snapshot.changed_at)
+        or fast_response(response, encoded_catalog.list(snapshot, "services"))
+        or snapshot.services
+    )
 
 @api_router.get("/services/{service_slug}", response_model=Service)
-async def get_service(service_slug: str):
-    service = await db.services.find_one({"slug": service_slug}, {"_id": 0})
+async def get_service(service_slug: str, request: Request, response: Response):
+    snapshot = await catalog.get()
+    service = snapshot.services_by_slug.get(service_slug)
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
-    return service
+    etag = make_etag(snapshot.digests["services"], service_slug)
+    return (
+        conditional_get.check(request, response, etag, snapshot.changed_at)
+        or fast_response(response, encoded_catalog.item(snapshot, "services", service_slug))
+        or service
+    )
 
 @api_router.get("/cities", response_model=List[City])
-async def get_cities():
-    cities = await db.cities.find({}, {"_id": 0}).to_list(1000)
-    return cities
+async def get_cities(
+    request: Request,
+    response: Response,
+    tier: Optional[str] = None,
+    state: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = LIMIT_QUERY,
+):
+    snapshot = await catalog.get()
+    paged = list_page(request, response, snapshot, "cities", {"tier": tier, "state": state}, fields, cursor, limit)
+    if paged:
+        return paged
+    etag = make_etag(snapshot.digests["cities"])
+    return (
+        conditional_get.check(request, response, etag, snapshot.changed_at)
+        or fast_response(response, encoded_catalog.list(snapshot, "cities"))
+        or snapshot.cities
+    )
 
 @api_router.get("/cities/{city_slug}", response_model=City)
-async def get_city(city_slug: str):
-    city = await db.cities.find_one({"slug": city_slug}, {"_id": 0})
+async def get_city(city_slug: str, request: Request, response: Response):
+    snapshot = await catalog.get()
+    city = snapshot.cities_by_slug.get(city_slug)
     if not city:
         raise HTTPException(status_code=404, detail="City not found")
-    return city
+    etag = make_etag(snapshot.digests["cities"], city_slug)
+    return (
+        conditional_get.check(request, response, etag, snapshot.changed_at)
+        or fast_response(response, encoded_catalog.item(snapshot, "cities", city_slug))
+        or city
+    )
 
 @api_router.get("/service-city/{service_slug}/{city_slug}", response_model=ServiceCityPage)
-async def get_service_city_page(service_slug: str, city_slug: str):
-    service = await db.services.find_one({"slug": service_slug}, {"_id": 0})
-    city = await db.cities.find_one({"slug": city_slug}, {"_id": 0})
+async def get_service_city_page(service_slug: str, city_slug: str, request: Request):
+    snapshot = await catalog.get()
+    page = service_city_pages.get(service_slug, city_slug)
     
-    if not service or not city:
+    if page is None:
         raise HTTPException(status_code=404, detail="Service or City not found")
     
-    meta_title = f"{service['name']} Company in {city['name']} | PyTech Digital"
-    meta_description = f"Professional {service['name']} services in {city['name']}. PyTech Digital offers expert {service['name'].lower()} solutions. Contact us: +91 9205 222 170"
-    keywords = [
-        f"{service['name'].lower()} company in {city['name'].lower()}",
-        f"{service['name'].lower()} services in {city['name'].lower()}",
-        f"best {service['name'].lower()} agency in {city['name'].lower()}",
-        f"{service['name'].lower()} near me",
-        f"professional {service['name'].lower()} {city['name'].lower()}"
-    ]
-    
-    return ServiceCityPage(
-        service=Service(**service),
-        city=City(**city),
-        meta_title=meta_title,
-        meta_description=meta_description,
-        keywords=keywords
+    response = Response(
+        content=page,
+        media_type="application/json",
+        headers={"X-Page-Generation": str(service_city_pages.generation)}
     )
+    etag = make_etag(snapshot.digests["services"], snapshot.digests["cities"], service_slug, city_slug)
+    return conditional_get.check(request, response, etag, snapshot.changed_at) or response
+
+@api_router.post("/service-city/batch")
+async def get_service_city_pages(batch: ServiceCityBatchRequest):
+    """Resolve many service-city pages in one call, in request order.
+
+    Pairs that don't exist come back with ``"found": false`` and a null page
+    instead of failing the batch.
+    """
+    if len(batch.pairs) > SERVICE_CITY_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {SERVICE_CITY_BATCH_MAX} pairs per batch")
+    snapshot = await catalog.get()
+    parts = []
+    for pair in batch.pairs:
+        page = service_city_pages.get(pair.service_slug, pair.city_slug)
+        if page is not None:
+            found, error = b"true", b""
+        else:
+            page, found = b"null", b"false"
+            missing = "Service" if pair.service_slug not in snapshot.services_by_slug else "City"
+            error = b',"error":' + json.dumps(f"{missing} not found").encode()
+        # Pages are already serialized, so the response is spliced together rather than re-encoded.
+        parts.append(
+            b'{"service_slug":' + json.dumps(pair.service_slug).encode()
+            + b',"city_slug":' + json.dumps(pair.city_slug).encode()
+            + b',"found":' + found + error + b',"page":' + page + b"}"
+        )
+    return Response(
+        content=b'{"results":[' + b",".join(parts) + b"]}",
+        media_type="application/json",
+        headers={"X-Page-Generation": str(service_city_pages.generation)}
+    )
+
+@api_router.get("/service-city-area/{service_slug}/{city_slug}/{area_slug}", response_model=ServiceCityAreaPage)
+async def get_service_city_area_page(service_slug: str, city_slug: str, area_slug: str, request: Request):
+    snapshot = await catalog.get()
+    page = area_pages.get(snapshot, service_slug, city_slug, area_slug)
+
+    if page is None:
+        raise HTTPException(status_code=404, detail="Service, City or Area not found")
+
+    response = Response(content=page, media_type="application/json")
+    etag = make_etag(snapshot.digests["services"], snapshot.digests["cities"], service_slug, city_slug, area_slug)
+    return conditional_get.check(request, response, etag, snapshot.changed_at) or response
 
 @api_router.get("/testimonials", response_model=List[Testimonial])
-async def get_testimonials():
-    testimonials = await db.testimonials.find({}, {"_id": 0}).to_list(100)
-    return testimonials
+async def get_testimonials(
+    request: Request,
+    response: Response,
+    city: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = LIMIT_QUERY,
+):
+    snapshot = await catalog.get()
+    paged = list_page(request, response, snapshot, "testimonials", {"city": city}, fields, cursor, limit)
+    if paged:
+        return paged
+    etag = make_etag(snapshot.digests["testimonials"])
+    return (
+        conditional_get.check(request, response, etag, snapshot.changed_at)
+        or fast_response(response, encoded_catalog.list(snapshot, "testimonials"))
+        or snapshot.testimonials
+    )
 
 @api_router.get("/portfolio", response_model=List[Portfolio])
-async def get_portfolio():
-    portfolio = await db.portfolio.find({}, {"_id": 0}).to_list(100)
-    return portfolio
+async def get_portfolio(
+    request: Request,
+    response: Response,
+    category: Optional[str] = None,
+    city: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = LIMIT_QUERY,
+):
+    snapshot = await catalog.get()
+    paged = list_page(request, response, snapshot, "portfolio", {"category": category, "city": city}, fields, cursor, limit)
+    if paged:
+        return paged
+    etag = make_etag(snapshot.digests["portfolio"])
+    return (
+        conditional_get.check(request, response, etag, snapshot.changed_at)
+        or fast_response(response, encoded_catalog.list(snapshot, "portfolio"))
+        or snapshot.portfolio
+    )
+
+@api_router.get("/home")
+async def get_home(
+    request: Request,
+    response: Response,
+    services: Optional[str] = None,
+    cities: Optional[str] = None,
+    testimonials: Optional[str] = None,
+    portfolio: Optional[str] = None,
+):
+    """Everything the home page renders in one payload.
+
+    Each query parameter is an optional comma-separated field projection for
+    that collection, e.g. ``?services=slug,name,short_description``.
+    """
+    snapshot = await catalog.get()
+    etag = make_etag(snapshot.digest, "home", *(",".join(field_list(p)) or "*" for p in (services, cities, testimonials, portfolio)))
+    not_modified = conditional_get.check(request, response, etag, snapshot.changed_at)
+    if not_modified:
+        return not_modified
+    if not any((services, cities, testimonials, portfolio)):
+        encoded = fast_response(response, encoded_catalog.home(snapshot))
+        if encoded:
+            return encoded
+    return {
+        "services": project_fields(snapshot.services, services, Service),
+        "cities": project_fields(snapshot.cities, cities, City),
+        "testimonials": project_fields(snapshot.testimonials, testimonials, Testimonial),
+        "portfolio": project_fields(snapshot.portfolio, portfolio, Portfolio),
+    }
+
+@api_router.get("/search")
+async def search(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20),
+):
+    """Ranked service, city, area and service-city suggestions for a typeahead"""
+    snapshot = await catalog.get()
+    etag = make_etag(snapshot.digest, "search", q.strip().lower(), str(limit))
+    not_modified = conditional_get.check(request, response, etag, snapshot.changed_at)
+    if not_modified:
+        return not_modified
+    return {"query": q, "results": search_index.search(q, limit)}
+
+def client_address(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        # Proxies append, so only the entry our own outermost proxy added can be trusted.
+        forwarded = [hop.strip() for hop in ",".join(request.headers.getlist("x-forwarded-for")).split(",") if hop.strip()]
+        if len(forwarded) >= FORWARDED_FOR_HOPS:
+            return forwarded[-FORWARDED_FOR_HOPS]
+    return request.client.host if request.client else "unknown"
 
 @api_router.post("/contact", response_model=ContactSubmission)
-async def submit_contact(form: ContactForm):
+async def submit_contact(
+    form: ContactForm,
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=128),
+):
+    if contact_queue is None:
+        raise HTTPException(status_code=503, detail="This node does not accept submissions")
+
+    client = client_address(request)
+    key, body_hash = submission_key(form.model_dump(), client, idempotency_key)
+    try:
+        previous = admission.recall(key, body_hash)
+    except IdempotencyConflict:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different submission")
+    if previous is not None:
+        # A repeat (double-click, retry or replay): answer as before without writing again.
+        response.headers["Idempotent-Replayed"] = "true"
+        return previous
+    try:
+        admission.admit(client)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many submissions, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
     submission = ContactSubmission(**form.model_dump())
     doc = submission.model_dump()
     doc['timestamp'] = doc['timestamp'].isoformat()
+    # Remembered before the write so a repeat arriving meanwhile is not written twice.
+    admission.remember(key, body_hash, submission)
+    try:
+        await contact_queue.submit(doc)
+    except ContactQueueFull as e:
+        admission.forget(key)
+        raise HTTPException(
+            status_code=503,
+            detail="Too many submissions right now, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except BaseException:
+        admission.forget(key)
+        raise
     
-    await db.contact_submissions.insert_one(doc)
-    
-    # Here you would typically send an email notification
+    # The notification is sent from the outbox by the notifier workers
     logger.info(f"New contact submission from {form.name} - {form.email}")
     
     return submission
 
+def require_admin(authorization: Optional[str] = Header(None), x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(status_code=503, detail="Admin API is not configured")
+    token = x_admin_token
+    if authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:].strip()
+    if not token:
+        raise HTTPException(status_code=401, detail="Admin token required", headers={"WWW-Authenticate": "Bearer"})
+    if not hmac.compare_digest(token.encode(), ADMIN_API_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def require_leads_db():
+    if db is None:
+        raise HTTPException(status_code=503, detail="Lead data is not available on this node")
+
+LEAD_EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", export_ndjson),
+    "csv": ("text/csv; charset=utf-8", export_csv),
+}
+
+@api_router.get("/admin/admission", dependencies=[Depends(require_admin)])
+async def get_admission():
+    return admission.stats()
+
+@api_router.patch("/admin/admission", dependencies=[Depends(require_admin)])
+async def update_admission(update: AdmissionLimitsUpdate):
+    """Change contact admission limits at runtime; omitted fields keep their value"""
+    limits = admission.configure(**update.model_dump(exclude_none=True))
+    logger.info(f"Contact admission limits changed: {limits}")
+    return admission.stats()
+
+@api_router.get("/admin/leads/export", dependencies=[Depends(require_admin)])
+async def export_leads(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    city: Optional[str] = None,
+    service: Optional[str] = None,
+):
+    """Stream matching contact submissions, oldest first, as NDJSON or CSV"""
+    require_leads_db()
+    media_type, render = LEAD_EXPORT_FORMATS[format]
+    query = lead_filter(start, end, city, service)
+    return StreamingResponse(
+        render(db.contact_submissions, query),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="leads.{format}"'},
+    )
+
+@api_router.get("/admin/leads/rollups", dependencies=[Depends(require_admin)])
+async def get_lead_rollups(
+    start: Optional[str] = Query(None, alias="from", pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    end: Optional[str] = Query(None, alias="to", pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    city: Optional[str] = None,
+    service: Optional[str] = None,
+):
+    """Lead counts per day, city and service; ``from``/``to`` are inclusive YYYY-MM-DD days"""
+    require_leads_db()
+    rollups = await lead_rollups.query(start, end, city, service)
+    return {"total": sum(r["count"] for r in rollups), "rollups": rollups}
+
 @api_router.get("/sitemap-data")
-async def get_sitemap_data():
+async def get_sitemap_data(request: Request, response: Response):
     """Returns all service-city combinations for sitemap generation"""
-    services = await db.services.find({}, {"_id": 0, "slug": 1, "name": 1}).to_list(100)
-    cities = await db.cities.find({}, {"_id": 0, "slug": 1, "name": 1}).to_list(1000)
+    snapshot = await catalog.get()
+    etag = make_etag(snapshot.digests["services"], snapshot.digests["cities"], "sitemap-data")
+    not_modified = conditional_get.check(request, response, etag, snapshot.changed_at)
+    if not_modified:
+        return not_modified
     
     urls = []
-    for service in services:
-        for city in cities:
+    for service in snapshot.services:
+        for city in snapshot.cities:
             urls.append({
                 "url": f"/{service['slug']}/{city['slug']}",
                 "service": service['name'],
@@ -187,9 +578,81 @@ async def get_sitemap_data():
         "urls": urls
     }
 
+def sitemap_etag(snapshot, *parts):
+    return make_etag(snapshot.digests["services"], snapshot.digests["cities"], "sitemap", *parts)
+
+@api_router.get("/sitemap.xml")
+async def get_sitemap(request: Request):
+    """The whole sitemap when it fits in one shard, otherwise the sitemap index"""
+    snapshot = await catalog.get()
+    if sitemaps.shard_count(snapshot) > 1:
+        return await get_sitemap_index(request)
+    return await get_sitemap_shard(0, request)
+
+@api_router.get("/sitemap-index.xml")
+async def get_sitemap_index(request: Request, gz: bool = False):
+    snapshot = await catalog.get()
+    response = StreamingResponse(sitemaps.iter_index(snapshot, gzipped=gz), media_type="application/xml")
+    etag = sitemap_etag(snapshot, "index", str(gz))
+    return conditional_get.check(request, response, etag, snapshot.changed_at) or response
+
+@api_router.get("/sitemap-{shard}.xml")
+async def get_sitemap_shard(shard: int, request: Request):
+    snapshot = await catalog.get()
+    if not sitemaps.has_shard(snapshot, shard):
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    etag = sitemap_etag(snapshot, str(shard))
+    if negotiate(request.headers.get("accept-encoding", ""), ("gzip",)):
+        # The shard's gzip encoding is already cached per catalog version; send it as-is.
+        response = Response(
+            content=await sitemaps.shard_gzip(snapshot, shard),
+            media_type="application/xml",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+        not_modified = conditional_get.check(request, response, etag, snapshot.changed_at)
+        response.headers["ETag"] = encoded_etag(etag, "gzip")
+        return not_modified or response
+    response = StreamingResponse(sitemaps.iter_shard(snapshot, shard), media_type="application/xml")
+    return conditional_get.check(request, response, etag, snapshot.changed_at) or response
+
+@api_router.get("/sitemap-{shard}.xml.gz")
+async def get_sitemap_shard_gzip(shard: int, request: Request):
+    snapshot = await catalog.get()
+    if not sitemaps.has_shard(snapshot, shard):
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    response = Response(content=await sitemaps.shard_gzip(snapshot, shard), media_type="application/gzip")
+    etag = sitemap_etag(snapshot, str(shard), "gz")
+    return conditional_get.check(request, response, etag, snapshot.changed_at) or response
+
+@api_router.get("/stats", dependencies=[Depends(require_admin)])
+async def get_stats():
+    """Cache and subsystem counters for load testing and dashboards"""
+    return {
+        "catalog": catalog.stats(),
+        "service_city_pages": service_city_pages.stats(),
+        "area_pages": area_pages.stats(),
+        "fast_json": encoded_catalog.stats(),
+        "conditional_get": conditional_get.stats(),
+        "sitemaps": sitemaps.stats(),
+        "search": search_index.stats(),
+        "listings": listings.stats(),
+        "compression": compressed_variants.stats(),
+        "storage": storage.stats(),
+        "admission": admission.stats(),
+        "contact_queue": contact_queue.stats() if contact_queue else None,
+        "notifications": await notifier.stats() if notifier else None,
+        "lead_rollups": lead_rollups.stats() if lead_rollups else None,
+        "catalog_snapshot": catalog_snapshot.stats() if catalog_snapshot else None,
+    }
+
 # Include the router in the main app
 app.include_router(api_router)
 
+# Prometheus scrape endpoint, served outside /api so it is not itself measured
+@app.get("/metrics")
+async def get_metrics():
+    return Response(content=render_metrics(http_metrics, mongo_metrics), media_type="text/plain; version=0.0.4")
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -198,6 +661,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli negotiated from Accept-Encoding
+app.add_middleware(
+    CompressionMiddleware,
+    variants=compressed_variants,
+    minimum_size=int(os.environ.get('COMPRESSION_MIN_SIZE', '1024')),
+    # Search ETags follow the free-text query, so caching their variants would be unbounded work
+    uncached_paths=("/api/search",),
+)
+
+# Per-route latency, in-flight and status metrics, plus the slow-request log
+http_metrics = HttpMetrics(slow_request_ms=float(os.environ.get('SLOW_REQUEST_MS', '500')))
+app.add_middleware(MetricsMiddleware, metrics=http_metrics, router=app.router)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -205,387 +681,57 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def prepare_database():
+    """Reconcile indexes and apply seed data under the cross-process startup lease"""
+    if db is None:
+        return
+    try:
+        async with startup_lease:
+            try:
+                await ensure_indexes(db)
+            except Exception as e:
+                logger.error(f"Error reconciling indexes: {e}")
+
+            try:
+                await seed_database(db)
+            except Exception as e:
+                logger.error(f"Error during startup seeding: {e}")
+    except LeaseTimeout as e:
+        logger.error(f"{e}; continuing without reconciling indexes or seed data")
+    except Exception as e:
+        logger.error(f"Error acquiring startup lease: {e}")
+
 @app.on_event("startup")
 async def startup_db():
-    """Initialize database with seed data if empty"""
+    """Warm the catalog cache, from this node's snapshot file when it is fresh"""
+    started = time.perf_counter()
+    global database_ready
+    snapshot = catalog_snapshot.load() if catalog_snapshot else None
+    if snapshot is not None:
+        # Another worker already seeded and published: serve now, check the database in the background
+        database_ready = asyncio.create_task(prepare_database())
+        logger.info(f"Catalog loaded from snapshot {catalog_snapshot.path}")
+    else:
+        await prepare_database()
+
     try:
-        # Check if data exists
-        service_count = await db.services.count_documents({})
-        city_count = await db.cities.count_documents({})
-        
-        if service_count == 0:
-            logger.info("Seeding services...")
-            await seed_services()
-        
-        if city_count == 0:
-            logger.info("Seeding cities...")
-            await seed_cities()
-            
-        testimonial_count = await db.testimonials.count_documents({})
-        if testimonial_count == 0:
-            logger.info("Seeding testimonials...")
-            await seed_testimonials()
-            
-        portfolio_count = await db.portfolio.count_documents({})
-        if portfolio_count == 0:
-            logger.info("Seeding portfolio...")
-            await seed_portfolio()
-            
+        await catalog.start(initial=snapshot.collections() if snapshot else None)
     except Exception as e:
-        logger.error(f"Error during startup seeding: {e}")
-
-async def seed_services():
-    services = [
-        {
-            "id": "1",
-            "name": "Branding Services",
-            "slug": "branding-services",
-            "description": "Transform your business identity with our comprehensive branding services. We create memorable brand experiences that resonate with your target audience and set you apart from competitors.",
-            "short_description": "Build a powerful brand identity that stands out",
-            "features": [
-                "Logo Design & Brand Identity",
-                "Brand Strategy & Positioning",
-                "Visual Identity Systems",
-                "Brand Guidelines & Standards",
-                "Marketing Collateral Design",
-                "Brand Messaging & Voice"
-            ],
-            "process_steps": [
-                {"step": 1, "title": "Discovery", "description": "Understand your business, goals, and target audience"},
-                {"step": 2, "title": "Strategy", "description": "Develop brand positioning and messaging framework"},
-                {"step": 3, "title": "Design", "description": "Create visual identity and brand assets"},
-                {"step": 4, "title": "Implementation", "description": "Apply branding across all touchpoints"},
-                {"step": 5, "title": "Guidelines", "description": "Deliver comprehensive brand guidelines"}
-            ],
-            "keywords": ["branding", "brand identity", "logo design", "visual identity"]
-        },
-        {
-            "id": "2",
-            "name": "Website Design",
-            "slug": "website-design",
-            "description": "Create stunning, high-performing websites that drive results. Our expert team designs responsive, user-friendly websites optimized for conversions and search engines.",
-            "short_description": "Professional websites that convert visitors into customers",
-            "features": [
-                "Custom Website Design",
-                "Responsive Mobile Design",
-                "E-commerce Development",
-                "CMS Integration",
-                "SEO-Optimized Structure",
-                "Fast Loading Performance"
-            ],
-            "process_steps": [
-                {"step": 1, "title": "Consultation", "description": "Discuss your requirements and objectives"},
-                {"step": 2, "title": "Design", "description": "Create mockups and design concepts"},
-                {"step": 3, "title": "Development", "description": "Build responsive, functional website"},
-                {"step": 4, "title": "Testing", "description": "Quality assurance and cross-browser testing"},
-                {"step": 5, "title": "Launch", "description": "Deploy and provide ongoing support"}
-            ],
-            "keywords": ["website design", "web development", "responsive design", "ecommerce"]
-        },
-        {
-            "id": "3",
-            "name": "App Development",
-            "slug": "app-development",
-            "description": "Build powerful mobile applications that engage users and grow your business. We develop native and cross-platform apps with exceptional user experience.",
-            "short_description": "Native and cross-platform mobile apps that users love",
-            "features": [
-                "iOS App Development",
-                "Android App Development",
-                "Cross-Platform Solutions",
-                "UI/UX Design",
-                "App Store Optimization",
-                "Maintenance & Support"
-            ],
-            "process_steps": [
-                {"step": 1, "title": "Planning", "description": "Define features and technical requirements"},
-                {"step": 2, "title": "Design", "description": "Create intuitive UI/UX designs"},
-                {"step": 3, "title": "Development", "description": "Build app with latest technologies"},
-                {"step": 4, "title": "Testing", "description": "Rigorous testing across devices"},
-                {"step": 5, "title": "Deployment", "description": "Launch on app stores with ongoing support"}
-            ],
-            "keywords": ["app development", "mobile app", "ios development", "android development"]
-        },
-        {
-            "id": "4",
-            "name": "Digital Marketing Services",
-            "slug": "digital-marketing-services",
-            "description": "Accelerate your online growth with data-driven digital marketing strategies. We help businesses reach their target audience and maximize ROI through comprehensive digital campaigns.",
-            "short_description": "Data-driven marketing strategies that deliver results",
-            "features": [
-                "Search Engine Optimization (SEO)",
-                "Pay-Per-Click Advertising (PPC)",
-                "Social Media Marketing",
-                "Content Marketing",
-                "Email Marketing Campaigns",
-                "Analytics & Reporting"
-            ],
-            "process_steps": [
-                {"step": 1, "title": "Audit", "description": "Analyze current digital presence"},
-                {"step": 2, "title": "Strategy", "description": "Develop customized marketing plan"},
-                {"step": 3, "title": "Execution", "description": "Implement campaigns across channels"},
-                {"step": 4, "title": "Optimization", "description": "Continuously improve performance"},
-                {"step": 5, "title": "Reporting", "description": "Provide detailed analytics and insights"}
-            ],
-            "keywords": ["digital marketing", "seo", "ppc", "social media marketing"]
-        },
-        {
-            "id": "5",
-            "name": "Enquiry Generation Services",
-            "slug": "enquiry-generation-services",
-            "description": "Generate high-quality leads that convert into customers. Our targeted enquiry generation strategies help businesses fill their sales pipeline with qualified prospects.",
-            "short_description": "Qualified leads that turn into paying customers",
-            "features": [
-                "Lead Generation Campaigns",
-                "Landing Page Optimization",
-                "Conversion Rate Optimization",
-                "Lead Nurturing Systems",
-                "Multi-Channel Outreach",
-                "CRM Integration"
-            ],
-            "process_steps": [
-                {"step": 1, "title": "Target", "description": "Identify ideal customer profile"},
-                {"step": 2, "title": "Attract", "description": "Create compelling lead magnets"},
-                {"step": 3, "title": "Capture", "description": "Optimize conversion touchpoints"},
-                {"step": 4, "title": "Nurture", "description": "Engage leads with relevant content"},
-                {"step": 5, "title": "Convert", "description": "Close deals with qualified prospects"}
-            ],
-            "keywords": ["lead generation", "enquiry generation", "conversion optimization", "sales funnel"]
-        },
-        {
-            "id": "6",
-            "name": "Search Engine Optimization",
-            "slug": "search-engine-optimization",
-            "description": "Dominate search results and drive organic traffic with our expert SEO services. We optimize your website to rank higher on Google and other search engines, bringing qualified traffic to your business.",
-            "short_description": "Rank higher on Google and drive organic traffic",
-            "features": [
-                "Technical SEO Audit",
-                "On-Page Optimization",
-                "Off-Page SEO & Link Building",
-                "Local SEO",
-                "Keyword Research & Strategy",
-                "SEO Performance Reporting"
-            ],
-            "process_steps": [
-                {"step": 1, "title": "Audit", "description": "Comprehensive SEO audit of your website"},
-                {"step": 2, "title": "Research", "description": "Keyword research and competitor analysis"},
-                {"step": 3, "title": "Optimize", "description": "Implement on-page and technical SEO"},
-                {"step": 4, "title": "Build", "description": "Quality link building and content strategy"},
-                {"step": 5, "title": "Monitor", "description": "Track rankings and optimize continuously"}
-            ],
-            "keywords": ["seo", "search engine optimization", "google ranking", "organic traffic"]
-        },
-        {
-            "id": "7",
-            "name": "App Marketing",
-            "slug": "app-marketing",
-            "description": "Boost your app downloads and user engagement with comprehensive app marketing strategies. From app store optimization to user acquisition campaigns, we help your app succeed.",
-            "short_description": "Drive app downloads and user engagement",
-            "features": [
-                "App Store Optimization (ASO)",
-                "User Acquisition Campaigns",
-                "In-App Marketing",
-                "App Analytics & Insights",
-                "Retention Strategies",
-                "Influencer Marketing"
-            ],
-            "process_steps": [
-                {"step": 1, "title": "Analysis", "description": "Analyze app market and competitors"},
-                {"step": 2, "title": "Optimize", "description": "ASO for app stores"},
-                {"step": 3, "title": "Launch", "description": "User acquisition campaigns"},
-                {"step": 4, "title": "Engage", "description": "In-app engagement strategies"},
-                {"step": 5, "title": "Retain", "description": "User retention and re-engagement"}
-            ],
-            "keywords": ["app marketing", "aso", "user acquisition", "app downloads"]
-        },
-        {
-            "id": "8",
-            "name": "Content Marketing",
-            "slug": "content-marketing",
-            "description": "Engage your audience with compelling content that drives results. Our content marketing services help you build authority, generate leads, and grow your business through strategic content.",
-            "short_description": "Strategic content that engages and converts",
-            "features": [
-                "Content Strategy Development",
-                "Blog Writing & Management",
-                "Video Content Creation",
-                "Infographics & Visual Content",
-                "Social Media Content",
-                "Content Distribution"
-            ],
-            "process_steps": [
-                {"step": 1, "title": "Strategy", "description": "Develop content marketing strategy"},
-                {"step": 2, "title": "Create", "description": "Produce high-quality content"},
-                {"step": 3, "title": "Optimize", "description": "SEO optimization for content"},
-                {"step": 4, "title": "Distribute", "description": "Multi-channel content distribution"},
-                {"step": 5, "title": "Measure", "description": "Track performance and refine"}
-            ],
-            "keywords": ["content marketing", "blog writing", "content strategy", "video content"]
-        },
-        {
-            "id": "9",
-            "name": "PPC/Paid Marketing",
-            "slug": "ppc-paid-marketing",
-            "description": "Maximize ROI with targeted paid advertising campaigns. Our PPC experts manage Google Ads, Facebook Ads, and other paid channels to drive qualified traffic and conversions.",
-            "short_description": "Targeted paid ads that deliver high ROI",
-            "features": [
-                "Google Ads Management",
-                "Facebook & Instagram Ads",
-                "LinkedIn Advertising",
-                "Display & Remarketing",
-                "Shopping Ads",
-                "Campaign Optimization"
-            ],
-            "process_steps": [
-                {"step": 1, "title": "Research", "description": "Audience and keyword research"},
-                {"step": 2, "title": "Setup", "description": "Campaign structure and ad creation"},
-                {"step": 3, "title": "Launch", "description": "Launch campaigns across platforms"},
-                {"step": 4, "title": "Monitor", "description": "Real-time monitoring and adjustments"},
-                {"step": 5, "title": "Optimize", "description": "Continuous optimization for ROI"}
-            ],
-            "keywords": ["ppc", "google ads", "paid marketing", "facebook ads"]
-        }
-    ]
-    await db.services.insert_many(services)
-
-async def seed_cities():
-    cities = [
-        # Metro Cities
-        {"id": "1", "name": "Delhi", "slug": "delhi", "state": "Delhi", "tier": "metro", "areas": ["Connaught Place", "Karol Bagh", "Nehru Place", "Dwarka", "Rohini"]},
-        {"id": "2", "name": "Mumbai", "slug": "mumbai", "state": "Maharashtra", "tier": "metro", "areas": ["Andheri", "Bandra", "Powai", "Navi Mumbai", "Thane"]},
-        {"id": "3", "name": "Bangalore", "slug": "bangalore", "state": "Karnataka", "tier": "metro", "areas": ["Koramangala", "Whitefield", "Indiranagar", "Electronic City", "HSR Layout"]},
-        {"id": "4", "name": "Hyderabad", "slug": "hyderabad", "state": "Telangana", "tier": "metro", "areas": ["Hitech City", "Gachibowli", "Madhapur", "Banjara Hills", "Secunderabad"]},
-        {"id": "5", "name": "Chennai", "slug": "chennai", "state": "Tamil Nadu", "tier": "metro", "areas": ["T Nagar", "Anna Nagar", "Velachery", "OMR", "Porur"]},
-        {"id": "6", "name": "Kolkata", "slug": "kolkata", "state": "West Bengal", "tier": "metro", "areas": ["Salt Lake", "Park Street", "Ballygunge", "New Town", "Howrah"]},
-        {"id": "7", "name": "Pune", "slug": "pune", "state": "Maharashtra", "tier": "metro", "areas": ["Hinjewadi", "Kothrud", "Viman Nagar", "Wakad", "Baner"]},
-        
-        # State Capitals & Major Cities
-        {"id": "8", "name": "Noida", "slug": "noida", "state": "Uttar Pradesh", "tier": "tier1", "areas": ["Sector 62", "Sector 18", "Greater Noida", "Sector 142", "Film City"]},
-        {"id": "9", "name": "Gurgaon", "slug": "gurgaon", "state": "Haryana", "tier": "tier1", "areas": ["Cyber City", "DLF Phase 1", "Golf Course Road", "Sohna Road", "MG Road"]},
-        {"id": "10", "name": "Jaipur", "slug": "jaipur", "state": "Rajasthan", "tier": "tier1", "areas": ["Malviya Nagar", "Vaishali Nagar", "C-Scheme", "Mansarovar", "Jagatpura"]},
-        {"id": "11", "name": "Lucknow", "slug": "lucknow", "state": "Uttar Pradesh", "tier": "tier1", "areas": ["Gomti Nagar", "Hazratganj", "Indira Nagar", "Aliganj", "Alambagh"]},
-        {"id": "12", "name": "Chandigarh", "slug": "chandigarh", "state": "Punjab", "tier": "tier1", "areas": ["Sector 17", "Sector 35", "Mohali", "Panchkula", "Zirakpur"]},
-        {"id": "13", "name": "Ahmedabad", "slug": "ahmedabad", "state": "Gujarat", "tier": "tier1", "areas": ["Satellite", "Vastrapur", "SG Highway", "Bodakdev", "Prahlad Nagar"]},
-        {"id": "14", "name": "Surat", "slug": "surat", "state": "Gujarat", "tier": "tier1", "areas": ["Adajan", "Vesu", "Citylight", "Pal", "Rander"]},
-        {"id": "15", "name": "Indore", "slug": "indore", "state": "Madhya Pradesh", "tier": "tier1", "areas": ["Vijay Nagar", "Palasia", "Rau", "Bypass Road", "Bhanwarkua"]},
-        {"id": "16", "name": "Bhopal", "slug": "bhopal", "state": "Madhya Pradesh", "tier": "tier1", "areas": ["MP Nagar", "Arera Colony", "Koh-e-Fiza", "Hoshangabad Road", "Ayodhya Bypass"]},
-        {"id": "17", "name": "Patna", "slug": "patna", "state": "Bihar", "tier": "tier1", "areas": ["Boring Road", "Kankarbagh", "Rajendra Nagar", "Danapur", "Patliputra"]},
-        {"id": "18", "name": "Nagpur", "slug": "nagpur", "state": "Maharashtra", "tier": "tier1", "areas": ["Dharampeth", "Sadar", "Sitabuldi", "MIHAN", "Wardha Road"]},
-        {"id": "19", "name": "Visakhapatnam", "slug": "visakhapatnam", "state": "Andhra Pradesh", "tier": "tier1", "areas": ["MVP Colony", "Madhurawada", "Gajuwaka", "Rushikonda", "Dwaraka Nagar"]},
-        {"id": "20", "name": "Coimbatore", "slug": "coimbatore", "state": "Tamil Nadu", "tier": "tier1", "areas": ["RS Puram", "Saibaba Colony", "Peelamedu", "Ganapathy", "Singanallur"]},
-        {"id": "21", "name": "Kochi", "slug": "kochi", "state": "Kerala", "tier": "tier1", "areas": ["Kakkanad", "Edappally", "Marine Drive", "Palarivattom", "Vytilla"]},
-        {"id": "22", "name": "Thiruvananthapuram", "slug": "thiruvananthapuram", "state": "Kerala", "tier": "tier1", "areas": ["Technopark", "Kazhakootam", "Kesavadasapuram", "Vazhuthacaud", "Pattom"]},
-        {"id": "23", "name": "Vadodara", "slug": "vadodara", "state": "Gujarat", "tier": "tier2", "areas": ["Alkapuri", "Sayajigunj", "Fatehgunj", "Manjalpur", "Gotri"]},
-        {"id": "24", "name": "Rajkot", "slug": "rajkot", "state": "Gujarat", "tier": "tier2", "areas": ["Kalawad Road", "University Road", "150 Feet Ring Road", "Raiya Road", "Mavdi"]},
-        {"id": "25", "name": "Guwahati", "slug": "guwahati", "state": "Assam", "tier": "tier2", "areas": ["Paltan Bazaar", "Ganeshguri", "Beltola", "Khanapara", "Guwahati Club"]},
-        {"id": "26", "name": "Bhubaneswar", "slug": "bhubaneswar", "state": "Odisha", "tier": "tier2", "areas": ["Saheed Nagar", "Patia", "Chandrasekharpur", "Khandagiri", "Jaydev Vihar"]},
-        {"id": "27", "name": "Ranchi", "slug": "ranchi", "state": "Jharkhand", "tier": "tier2", "areas": ["Hinoo", "Kanke", "Harmu", "Doranda", "Lalpur"]},
-        {"id": "28", "name": "Raipur", "slug": "raipur", "state": "Chhattisgarh", "tier": "tier2", "areas": ["Shankar Nagar", "Devendra Nagar", "Kota", "Pandri", "Mowa"]},
-        {"id": "29", "name": "Dehradun", "slug": "dehradun", "state": "Uttarakhand", "tier": "tier2", "areas": ["Rajpur Road", "Sahastradhara Road", "Clement Town", "Patel Nagar", "ISBT"]},
-        {"id": "30", "name": "Shimla", "slug": "shimla", "state": "Himachal Pradesh", "tier": "tier2", "areas": ["Mall Road", "Sanjauli", "Lakkar Bazaar", "Summer Hill", "Tutikandi"]},
-        {"id": "31", "name": "Jammu", "slug": "jammu", "state": "Jammu and Kashmir", "tier": "tier2", "areas": ["Residency Road", "Trikuta Nagar", "Bahu Plaza", "Gandhi Nagar", "Janipur"]},
-        {"id": "32", "name": "Srinagar", "slug": "srinagar", "state": "Jammu and Kashmir", "tier": "tier2", "areas": ["Lal Chowk", "Rajbagh", "Jawahar Nagar", "Sonwar", "Dalgate"]},
-        {"id": "33", "name": "Agra", "slug": "agra", "state": "Uttar Pradesh", "tier": "tier2", "areas": ["Sanjay Place", "Kamla Nagar", "Dayalbagh", "Sikandra", "Tajganj"]},
-        {"id": "34", "name": "Varanasi", "slug": "varanasi", "state": "Uttar Pradesh", "tier": "tier2", "areas": ["Sigra", "Cantt", "Lanka", "Bhelupur", "Godowlia"]},
-        {"id": "35", "name": "Kanpur", "slug": "kanpur", "state": "Uttar Pradesh", "tier": "tier2", "areas": ["Civil Lines", "Swaroop Nagar", "Kalyanpur", "Kidwai Nagar", "Kakadeo"]},
-        {"id": "36", "name": "Allahabad", "slug": "allahabad", "state": "Uttar Pradesh", "tier": "tier2", "areas": ["Civil Lines", "Georgetown", "Kareli", "Naini", "Ashok Nagar"]},
-        {"id": "37", "name": "Amritsar", "slug": "amritsar", "state": "Punjab", "tier": "tier2", "areas": ["Lawrence Road", "Mall Road", "Ranjit Avenue", "Chheharta", "Majitha Road"]},
-        {"id": "38", "name": "Ludhiana", "slug": "ludhiana", "state": "Punjab", "tier": "tier2", "areas": ["Ferozepur Road", "Model Town", "Sarabha Nagar", "Civil Lines", "Pakhowal Road"]},
-        {"id": "39", "name": "Jalandhar", "slug": "jalandhar", "state": "Punjab", "tier": "tier2", "areas": ["Model Town", "Civil Lines", "Nakodar Road", "Kapurthala Road", "Urban Estate"]},
-        {"id": "40", "name": "Mysore", "slug": "mysore", "state": "Karnataka", "tier": "tier2", "areas": ["Saraswathipuram", "VV Mohalla", "Kuvempunagar", "Hebbal", "Vijayanagar"]},
-        {"id": "41", "name": "Mangalore", "slug": "mangalore", "state": "Karnataka", "tier": "tier2", "areas": ["Kadri", "Kankanady", "Bejai", "Mallikatte", "Balmatta"]},
-        {"id": "42", "name": "Hubli", "slug": "hubli", "state": "Karnataka", "tier": "tier2", "areas": ["Vidyanagar", "Gokul Road", "Unkal", "Keshwapur", "Navanagar"]},
-        {"id": "43", "name": "Vijayawada", "slug": "vijayawada", "state": "Andhra Pradesh", "tier": "tier2", "areas": ["MG Road", "Benz Circle", "Governorpet", "Labbipet", "Patamata"]},
-        {"id": "44", "name": "Tirupati", "slug": "tirupati", "state": "Andhra Pradesh", "tier": "tier2", "areas": ["Tirumala", "Renigunta", "Air Bypass Road", "Balaji Colony", "TP Area"]},
-        {"id": "45", "name": "Madurai", "slug": "madurai", "state": "Tamil Nadu", "tier": "tier2", "areas": ["Anna Nagar", "KK Nagar", "Gomathipuram", "SS Colony", "Vilangudi"]},
-        {"id": "46", "name": "Trichy", "slug": "trichy", "state": "Tamil Nadu", "tier": "tier2", "areas": ["Thillai Nagar", "KK Nagar", "Srirangam", "Cantonment", "Puthur"]},
-        {"id": "47", "name": "Salem", "slug": "salem", "state": "Tamil Nadu", "tier": "tier2", "areas": ["Junction", "Fairlands", "Hasthampatti", "Ammapet", "Shevapet"]},
-        {"id": "48", "name": "Kozhikode", "slug": "kozhikode", "state": "Kerala", "tier": "tier2", "areas": ["Mavoor Road", "Arayidathupalam", "West Hill", "Medical College", "Kunnamangalam"]},
-        {"id": "49", "name": "Thrissur", "slug": "thrissur", "state": "Kerala", "tier": "tier2", "areas": ["Round", "Shornur Road", "East Fort", "Puzhakkal", "Medical College"]},
-        {"id": "50", "name": "Kollam", "slug": "kollam", "state": "Kerala", "tier": "tier2", "areas": ["Asramam", "Chinnakada", "Pallimukku", "Kottiyam", "Karunagappally"]}
-    ]
-    await db.cities.insert_many(cities)
-
-async def seed_testimonials():
-    testimonials = [
-        {
-            "id": "1",
-            "client_name": "Rajesh Kumar",
-            "company": "TechStart Solutions",
-            "rating": 5,
-            "content": "PyTech Digital transformed our online presence completely. Their website design and digital marketing services helped us increase leads by 300%. Highly professional team!",
-            "city": "Delhi"
-        },
-        {
-            "id": "2",
-            "client_name": "Priya Sharma",
-            "company": "StyleHub Fashion",
-            "rating": 5,
-            "content": "Excellent branding services! They created a modern brand identity that perfectly captures our essence. The team was creative and delivered beyond expectations.",
-            "city": "Mumbai"
-        },
-        {
-            "id": "3",
-            "client_name": "Amit Patel",
-            "company": "FitLife Wellness",
-            "rating": 5,
-            "content": "Our mobile app developed by PyTech Digital has been a game changer. User-friendly interface and seamless performance. Great job!",
-            "city": "Bangalore"
-        },
-        {
-            "id": "4",
-            "client_name": "Sneha Reddy",
-            "company": "EduTech Academy",
-            "rating": 5,
-            "content": "Their enquiry generation services brought us quality leads consistently. ROI has been excellent and the team is always responsive.",
-            "city": "Hyderabad"
-        },
-        {
-            "id": "5",
-            "client_name": "Vikram Singh",
-            "company": "AutoParts India",
-            "rating": 5,
-            "content": "Professional, reliable, and result-oriented. PyTech Digital helped us rank on first page of Google for our key business terms.",
-            "city": "Pune"
-        }
-    ]
-    await db.testimonials.insert_many(testimonials)
-
-async def seed_portfolio():
-    portfolio = [
-        {
-            "id": "1",
-            "title": "E-commerce Platform",
-            "category": "Website Design",
-            "description": "Modern e-commerce website with seamless checkout experience",
-            "image_url": "https://images.unsplash.com/photo-1661956602116-aa6865609028?w=800",
-            "city": "Mumbai"
-        },
-        {
-            "id": "2",
-            "title": "Mobile Banking App",
-            "category": "App Development",
-            "description": "Secure and user-friendly mobile banking application",
-            "image_url": "https://images.unsplash.com/photo-1563986768609-322da13575f3?w=800",
-            "city": "Bangalore"
-        },
-        {
-            "id": "3",
-            "title": "Brand Identity Design",
-            "category": "Branding Services",
-            "description": "Complete brand identity for luxury hospitality brand",
-            "image_url": "https://images.unsplash.com/photo-1561070791-2526d30994b5?w=800",
-            "city": "Delhi"
-        },
-        {
-            "id": "4",
-            "title": "SEO Campaign Success",
-            "category": "Digital Marketing Services",
-            "description": "300% organic traffic growth in 6 months",
-            "image_url": "https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=800",
-            "city": "Hyderabad"
-        }
-    ]
-    await db.portfolio.insert_many(portfolio)
+        logger.error(f"Error loading catalog cache: {e}")
+
+    if contact_queue:
+        await contact_queue.start()
+    if notifier:
+        await notifier.start()
+    logger.info(f"Startup completed in {(time.perf_counter() - started) * 1000:.1f}ms")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    if database_ready:
+        await database_ready
+    await catalog.stop()
+    if contact_queue:
+        await contact_queue.stop()
+    if notifier:
+        await notifier.stop()
+    storage.close()
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""Request coalescing and short-lived negative caching.
+
+``SingleFlight`` lets concurrent callers asking for the same key share one
+in-flight execution and its result (or exception). The work runs as its own
+task, so a caller that disconnects does not cancel it for the others.
+``NegativeCache`` remembers keys that resolved to nothing for a few seconds,
+so scanners probing junk slugs do not repeat the lookup.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.counters = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.counters["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.counters["executions"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._done, key))
+        else:
+            self.counters["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            self.counters["errors"] += 1
+
+    def stats(self) -> dict:
+        return {**self.counters, "in_flight": len(self._inflight)}
+
+
+class NegativeCache:
+    def __init__(self, ttl: float = 30.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._expires: "OrderedDict[Hashable, float]" = OrderedDict()
+        self.counters = {"hits": 0, "added": 0}
+
+    def __contains__(self, key: Hashable) -> bool:
+        expires = self._expires.get(key)
+        if expires is None:
+            return False
+        if time.monotonic() >= expires:
+            del self._expires[key]
+            return False
+        self.counters["hits"] += 1
+        return True
+
+    def add(self, key: Hashable) -> None:
+        self._expires[key] = time.monotonic() + self.ttl
+        self._expires.move_to_end(key)
+        self.counters["added"] += 1
+        while len(self._expires) > self.max_entries:
+            self._expires.popitem(last=False)
+
+    def clear(self) -> None:
+        self._expires.clear()
+
+    def stats(self) -> dict:
+        return {**self.counters, "entries": len(self._expires), "ttl": self.ttl}
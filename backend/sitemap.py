@@ -0,0 +1,137 @@
+"""Streaming, sharded XML sitemaps for the service x city landing pages.
+
+URLs are produced lazily from the catalog snapshot, so building a shard never
+materializes the cross product, including the service x city x area pages
+(which are themselves only rendered on request). Shards are split at the 50,000-URL protocol
+limit; each shard's gzip encoding is built once per catalog version in a
+worker thread (concurrent requests for the same shard share the build) and
+the plain XML is streamed back out of it.
+"""
+import asyncio
+import gzip
+import io
+import zlib
+from functools import partial
+from itertools import islice
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from catalog import CatalogSnapshot
+from pages import area_slug
+from singleflight import SingleFlight
+
+MAX_URLS_PER_SHARD = 50000
+
+_URLSET_OPEN = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+_URLSET_CLOSE = '</urlset>\n'
+_INDEX_OPEN = '<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+_INDEX_CLOSE = '</sitemapindex>\n'
+_CHUNK_URLS = 500
+_CHUNK_BYTES = 64 * 1024
+
+
+def count_paths(snapshot: CatalogSnapshot) -> int:
+    places = sum(1 + len(city.get("areas") or []) for city in snapshot.cities)
+    return len(snapshot.services) * places
+
+
+def iter_paths(snapshot: CatalogSnapshot) -> Iterator[str]:
+    """Every landing-page path, city and area level, in a stable order."""
+    for service in snapshot.services:
+        for city in snapshot.cities:
+            city_path = f"/{service['slug']}/{city['slug']}"
+            yield city_path
+            for area in city.get("areas") or []:
+                yield f"{city_path}/{area_slug(area)}"
+
+
+class SitemapBuilder:
+    def __init__(self, site_url: str, shard_size: int = MAX_URLS_PER_SHARD, api_url: Optional[str] = None):
+        self.site_url = site_url.rstrip("/")
+        # Where the shards themselves are served; the index must point there.
+        self.api_url = (api_url or site_url).rstrip("/")
+        self.shard_size = min(shard_size, MAX_URLS_PER_SHARD)
+        self._gzip_cache: Dict[Tuple[int, int], bytes] = {}
+        self._flight = SingleFlight()
+        # Bumped on invalidation so a build that straddles it is not cached.
+        self._epoch = 0
+        self.counters = {"shard_builds": 0, "cache_hits": 0}
+
+    def invalidate(self, old: Optional[CatalogSnapshot], new: CatalogSnapshot) -> None:
+        """Catalog listener: drop shards built from an older catalog version."""
+        self._epoch += 1
+        self._gzip_cache.clear()
+
+    def shard_count(self, snapshot: CatalogSnapshot) -> int:
+        return max(1, -(-count_paths(snapshot) // self.shard_size))
+
+    def has_shard(self, snapshot: CatalogSnapshot, shard: int) -> bool:
+        return 0 <= shard < self.shard_count(snapshot)
+
+    def shard_url(self, shard: int, gzipped: bool = False) -> str:
+        return f"{self.api_url}/api/sitemap-{shard}.xml" + (".gz" if gzipped else "")
+
+    def iter_index(self, snapshot: CatalogSnapshot, gzipped: bool = False) -> Iterator[bytes]:
+        parts = [_INDEX_OPEN]
+        for shard in range(self.shard_count(snapshot)):
+            parts.append(f"  <sitemap><loc>{escape(self.shard_url(shard, gzipped))}</loc></sitemap>\n")
+        parts.append(_INDEX_CLOSE)
+        yield "".join(parts).encode()
+
+    def iter_shard_xml(self, snapshot: CatalogSnapshot, shard: int) -> Iterator[bytes]:
+        """Generate one shard's XML in small chunks."""
+        start = shard * self.shard_size
+        paths = islice(iter_paths(snapshot), start, start + self.shard_size)
+        yield _URLSET_OPEN.encode()
+        while True:
+            chunk = list(islice(paths, _CHUNK_URLS))
+            if not chunk:
+                break
+            yield "".join(f"  <url><loc>{escape(self.site_url + path)}</loc></url>\n" for path in chunk).encode()
+        yield _URLSET_CLOSE.encode()
+
+    async def shard_gzip(self, snapshot: CatalogSnapshot, shard: int) -> bytes:
+        key = (snapshot.version, shard)
+        cached = self._gzip_cache.get(key)
+        if cached is not None:
+            self.counters["cache_hits"] += 1
+            return cached
+        return await self._flight.do(key, partial(self._build_shard, snapshot, shard))
+
+    async def _build_shard(self, snapshot: CatalogSnapshot, shard: int) -> bytes:
+        epoch = self._epoch
+        # Level-9 gzip of a full shard takes a few hundred ms: keep it off the event loop.
+        compressed = await asyncio.to_thread(self._compress_shard, snapshot, shard)
+        if epoch == self._epoch:
+            self._gzip_cache[(snapshot.version, shard)] = compressed
+        self.counters["shard_builds"] += 1
+        return compressed
+
+    def _compress_shard(self, snapshot: CatalogSnapshot, shard: int) -> bytes:
+        buffer = io.BytesIO()
+        # mtime=0 keeps the bytes (and so any ETag over them) reproducible.
+        with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as gz:
+            for chunk in self.iter_shard_xml(snapshot, shard):
+                gz.write(chunk)
+        return buffer.getvalue()
+
+    async def iter_shard(self, snapshot: CatalogSnapshot, shard: int) -> AsyncIterator[bytes]:
+        """Plain XML for a shard, streamed out of the cached gzip encoding."""
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        compressed = memoryview(await self.shard_gzip(snapshot, shard))
+        for offset in range(0, len(compressed), _CHUNK_BYTES):
+            data = decompressor.decompress(compressed[offset:offset + _CHUNK_BYTES])
+            if data:
+                yield data
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "cached_shards": len(self._gzip_cache),
+            "cached_bytes": sum(len(v) for v in self._gzip_cache.values()),
+            "shard_size": self.shard_size,
+            "single_flight": self._flight.stats(),
+        }
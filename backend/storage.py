@@ -0,0 +1,118 @@
+"""Where the catalog is read from and contact submissions are written to.
+
+``MotorStorage`` is the MongoDB deployment. ``EmbeddedStorage`` needs no
+database: it reads the catalog from a local snapshot file (falling back to the
+seed files) and, if configured, appends contact submissions to a JSON-lines
+log, so edge or read-replica nodes can serve catalog traffic from memory and
+start without a database connection. Components that need MongoDB itself
+(change streams, the notification outbox, index reconciliation, seeding)
+check ``storage.db`` and stay off when it is None.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from catalog import CATALOG_COLLECTIONS
+from catalog_snapshot import MappedCatalogSnapshot
+from seed import load_seed_data
+
+logger = logging.getLogger(__name__)
+
+
+class MotorStorage:
+    name = "mongo"
+
+    def __init__(self, url: str, db_name: str, event_listeners=()):
+        self.client = AsyncIOMotorClient(url, event_listeners=list(event_listeners))
+        self.db = self.client[db_name]
+        self.contacts = self.db.contact_submissions
+
+    async def load_catalog(self) -> Dict[str, List[dict]]:
+        results = await asyncio.gather(
+            *(self.db[name].find({}, {"_id": 0}).to_list(None) for name in CATALOG_COLLECTIONS)
+        )
+        return dict(zip(CATALOG_COLLECTIONS, results))
+
+    def close(self) -> None:
+        self.client.close()
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "database": self.db.name}
+
+
+class ContactLog:
+    """Append-only JSON-lines file with the ``insert_one``/``insert_many`` calls the contact queue makes."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.written = 0
+
+    async def insert_one(self, doc: dict) -> None:
+        await self.insert_many([doc])
+
+    async def insert_many(self, docs: List[dict], ordered: bool = True) -> None:
+        data = "".join(json.dumps(doc, separators=(",", ":"), default=str) + "\n" for doc in docs).encode()
+        await asyncio.to_thread(self._append, data)
+        self.written += len(docs)
+
+    def _append(self, data: bytes) -> None:
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+
+class EmbeddedStorage:
+    name = "embedded"
+    db = None
+
+    def __init__(self, snapshot_path: Optional[Path] = None, contact_log: Optional[Path] = None):
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.contacts = ContactLog(contact_log) if contact_log else None
+        self.source: Optional[str] = None
+
+    async def load_catalog(self) -> Dict[str, List[dict]]:
+        """The catalog from the snapshot file whatever its age, else from the seed files."""
+        snapshot = MappedCatalogSnapshot.open(self.snapshot_path) if self.snapshot_path else None
+        if snapshot is None:
+            if self.source != "seed":
+                logger.info("No catalog snapshot file, serving the seed data")
+            self.source = "seed"
+            return load_seed_data()
+        try:
+            self.source = "snapshot"
+            return snapshot.collections()
+        finally:
+            snapshot.close()
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "catalog_source": self.source,
+            "snapshot_path": str(self.snapshot_path) if self.snapshot_path else None,
+            "contact_log": str(self.contacts.path) if self.contacts else None,
+            "contacts_written": self.contacts.written if self.contacts else 0,
+        }
+
+
+def storage_from_env(event_listeners=(), snapshot_path: Optional[str] = None):
+    kind = os.environ.get('STORAGE_BACKEND', 'mongo')
+    if kind == "mongo":
+        return MotorStorage(os.environ['MONGO_URL'], os.environ['DB_NAME'], event_listeners)
+    if kind == "embedded":
+        return EmbeddedStorage(
+            snapshot_path=os.environ.get('EMBEDDED_SNAPSHOT_PATH') or snapshot_path,
+            contact_log=os.environ.get('EMBEDDED_CONTACT_LOG'),
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND: {kind}")
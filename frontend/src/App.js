@@ -55,6 +55,7 @@ function App() {
         <Routes>
           <Route path="/" element={<HomePage />} />
           <Route path="/:serviceSlug/:citySlug" element={<ServiceCityPage />} />
+          <Route path="/:serviceSlug/:citySlug/:areaSlug" element={<ServiceCityPage />} />
           <Route path="/about" element={<AboutPage />} />
           <Route path="/portfolio" element={<PortfolioPage />} />
           <Route path="/contact" element={<ContactPage />} />
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import axios from 'axios';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
@@ -30,8 +30,15 @@ const ContactSection = () => {
     message: '',
   });
   const [loading, setLoading] = useState(false);
+  // One key per filled-in form, so retries and double submits are recorded once
+  const submissionKey = useRef(null);
+
+  const newSubmissionKey = () =>
+    window.crypto?.randomUUID?.() || `${Date.now()}-${Math.random().toString(36).slice(2)}`;
 
   const handleChange = (e) => {
+    // An edited form is a different submission, even if the last attempt reached the server
+    submissionKey.current = null;
     setFormData({
       ...formData,
       [e.target.name]: e.target.value,
@@ -40,7 +47,9 @@ const ContactSection = () => {
 
   const handleSubmit = async (e) => {
     e.preventDefault();
+    if (loading) return;
     setLoading(true);
+    if (!submissionKey.current) submissionKey.current = newSubmissionKey();
 
     try {
       // Format message for WhatsApp
@@ -62,11 +71,14 @@ const ContactSection = () => {
       window.open(`https://wa.me/${whatsappNumber}?text=${encodedMessage}`, '_blank');
       
       // Also save to database for record keeping
-      await axios.post(`${API}/contact`, formData);
+      await axios.post(`${API}/contact`, formData, {
+        headers: { 'Idempotency-Key': submissionKey.current },
+      });
       
       toast.success('Redirecting to WhatsApp...');
       
       // Clear form
+      submissionKey.current = null;
       setFormData({
         name: '',
         email: '',
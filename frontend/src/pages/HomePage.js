@@ -37,17 +37,18 @@ const HomePage = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [servicesRes, citiesRes, testimonialsRes, portfolioRes] = await Promise.all([
-          axios.get(`${API}/services`),
-          axios.get(`${API}/cities`),
-          axios.get(`${API}/testimonials`),
-          axios.get(`${API}/portfolio`)
-        ]);
+        // One round-trip for the whole page, trimmed to the fields the sections render
+        const response = await axios.get(`${API}/home`, {
+          params: {
+            services: 'id,slug,name,short_description',
+            cities: 'id,slug,name,state'
+          }
+        });
 
-        setServices(servicesRes.data);
-        setCities(citiesRes.data);
-        setTestimonials(testimonialsRes.data);
-        setPortfolio(portfolioRes.data);
+        setServices(response.data.services);
+        setCities(response.data.cities);
+        setTestimonials(response.data.testimonials);
+        setPortfolio(response.data.portfolio);
       } catch (error) {
         console.error('Error fetching data:', error);
       } finally {
@@ -32,7 +32,7 @@ console.log('ServiceCityPage - BACKEND_URL:', BACKEND_URL);
 console.log('ServiceCityPage - Full API URL:', API);
 
 const ServiceCityPage = () => {
-  const { serviceSlug, citySlug } = useParams();
+  const { serviceSlug, citySlug, areaSlug } = useParams();
   const [pageData, setPageData] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -40,9 +40,12 @@ const ServiceCityPage = () => {
   useEffect(() => {
     const fetchPageData = async () => {
       try {
-        console.log('Fetching data for:', serviceSlug, citySlug);
-        console.log('API URL:', `${API}/service-city/${serviceSlug}/${citySlug}`);
-        const response = await axios.get(`${API}/service-city/${serviceSlug}/${citySlug}`);
+        const url = areaSlug
+          ? `${API}/service-city-area/${serviceSlug}/${citySlug}/${areaSlug}`
+          : `${API}/service-city/${serviceSlug}/${citySlug}`;
+        console.log('Fetching data for:', serviceSlug, citySlug, areaSlug);
+        console.log('API URL:', url);
+        const response = await axios.get(url);
         console.log('Page data received:', response.data);
         setPageData(response.data);
       } catch (error) {
@@ -61,7 +64,7 @@ const ServiceCityPage = () => {
       setError('Invalid page parameters');
       setLoading(false);
     }
-  }, [serviceSlug, citySlug, API]);
+  }, [serviceSlug, citySlug, areaSlug, API]);
 
   if (loading) {
     return (
@@ -99,7 +102,9 @@ const ServiceCityPage = () => {
     );
   }
 
-  const { service, city, meta_title, meta_description, keywords } = pageData;
+  const { service, city, area, meta_title, meta_description, keywords } = pageData;
+  const placeName = area ? `${area}, ${city.name}` : city.name;
+  const pagePath = area ? `${serviceSlug}/${citySlug}/${areaSlug}` : `${serviceSlug}/${citySlug}`;
 
   // Schema markup for SEO
   const schemaMarkup = {
@@ -117,7 +122,7 @@ const ServiceCityPage = () => {
     },
     "telephone": "+919205222170",
     "email": "info@pytechdigital.com",
-    "url": `https://pytech.digital/${serviceSlug}/${citySlug}`,
+    "url": `https://pytech.digital/${pagePath}`,
     "priceRange": "$$",
     "areaServed": {
       "@type": "City",
@@ -142,7 +147,7 @@ const ServiceCityPage = () => {
         <title>{meta_title}</title>
         <meta name="description" content={meta_description} />
         <meta name="keywords" content={keywords.join(', ')} />
-        <link rel="canonical" href={`https://pytech.digital/${serviceSlug}/${citySlug}`} />
+        <link rel="canonical" href={`https://pytech.digital/${pagePath}`} />
         <script type="application/ld+json">{JSON.stringify(schemaMarkup)}</script>
       </Helmet>
 
@@ -155,10 +160,10 @@ const ServiceCityPage = () => {
             <div className="text-center">
               <div className="inline-flex items-center px-4 py-2 bg-white/80 backdrop-blur-sm rounded-full shadow-sm mb-6">
                 <MapPin className="h-4 w-4 text-cyan-600 mr-2" />
-                <span className="text-sm font-medium text-gray-700">{city.name}, {city.state}</span>
+                <span className="text-sm font-medium text-gray-700">{placeName}, {city.state}</span>
               </div>
               <h1 className="text-4xl sm:text-5xl lg:text-6xl font-bold text-gray-900 mb-6 leading-tight">
-                {service.name} Company in {city.name}
+                {service.name} Company in {placeName}
               </h1>
               <p className="text-lg text-gray-600 max-w-3xl mx-auto">
                 {service.description}
@@ -172,15 +177,15 @@ const ServiceCityPage = () => {
           <div className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
             <div className="max-w-4xl mx-auto">
               <h2 className="text-3xl font-bold text-gray-900 mb-6">
-                Welcome to PyTech Digital - Your Trusted {service.name} Partner in {city.name}
+                Welcome to PyTech Digital - Your Trusted {service.name} Partner in {placeName}
               </h2>
               <p className="text-gray-600 text-lg leading-relaxed mb-6">
-                Looking for professional {service.name.toLowerCase()} in {city.name}? PyTech Digital is your trusted partner
+                Looking for professional {service.name.toLowerCase()} in {placeName}? PyTech Digital is your trusted partner
                 for delivering exceptional digital solutions. With over 10 years of experience and a team of expert professionals,
-                we've helped hundreds of businesses in {city.name} and across India achieve their digital goals.
+                we've helped hundreds of businesses in {placeName} and across India achieve their digital goals.
               </p>
               <p className="text-gray-600 text-lg leading-relaxed">
-                Our {service.name.toLowerCase()} solutions are tailored to meet the unique needs of businesses in {city.name}.
+                Our {service.name.toLowerCase()} solutions are tailored to meet the unique needs of businesses in {placeName}.
                 We understand the local market dynamics and combine our expertise with cutting-edge technology to deliver results
                 that exceed expectations.
               </p>
@@ -210,7 +215,7 @@ const ServiceCityPage = () => {
                   <CheckCircle2 className="h-8 w-8 text-cyan-600 mb-4" />
                   <h3 className="text-lg font-semibold text-gray-900 mb-2">{feature}</h3>
                   <p className="text-gray-600 text-sm">
-                    Professional {feature.toLowerCase()} services tailored for businesses in {city.name}
+                    Professional {feature.toLowerCase()} services tailored for businesses in {placeName}
                   </p>
                 </div>
               ))}
@@ -223,7 +228,7 @@ const ServiceCityPage = () => {
           <div className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
             <div className="text-center mb-12">
               <h2 className="text-3xl sm:text-4xl font-bold text-gray-900 mb-4">
-                Why Choose PyTech Digital in {city.name}?
+                Why Choose PyTech Digital in {placeName}?
               </h2>
             </div>
 
@@ -241,7 +246,7 @@ const ServiceCityPage = () => {
                   <span className="text-2xl font-bold text-cyan-600">200+</span>
                 </div>
                 <h3 className="text-xl font-semibold text-gray-900 mb-2">Happy Clients</h3>
-                <p className="text-gray-600">Trusted by businesses across {city.name} and India</p>
+                <p className="text-gray-600">Trusted by businesses across {placeName} and India</p>
               </div>
 
               <div className="text-center">
@@ -310,7 +315,7 @@ const ServiceCityPage = () => {
           <div className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
             <div className="text-center mb-12">
               <h2 className="text-3xl sm:text-4xl font-bold text-gray-900 mb-4">
-                We Serve {city.name} and Surrounding Areas
+                We Serve {placeName} and Surrounding Areas
               </h2>
             </div>
 
@@ -340,17 +345,17 @@ const ServiceCityPage = () => {
             <div className="space-y-6">
               <div className="bg-white p-6 rounded-xl shadow-sm">
                 <h3 className="text-lg font-semibold text-gray-900 mb-2">
-                  What makes PyTech Digital the best {service.name.toLowerCase()} company in {city.name}?
+                  What makes PyTech Digital the best {service.name.toLowerCase()} company in {placeName}?
                 </h3>
                 <p className="text-gray-600">
                   We combine years of experience, expert professionals, and cutting-edge technology to deliver exceptional results.
-                  Our local presence in {city.name} ensures we understand your market and deliver tailored solutions.
+                  Our local presence in {placeName} ensures we understand your market and deliver tailored solutions.
                 </p>
               </div>
 
               <div className="bg-white p-6 rounded-xl shadow-sm">
                 <h3 className="text-lg font-semibold text-gray-900 mb-2">
-                  How much does {service.name.toLowerCase()} cost in {city.name}?
+                  How much does {service.name.toLowerCase()} cost in {placeName}?
                 </h3>
                 <p className="text-gray-600">
                   Our pricing is competitive and transparent. Costs vary based on project scope and requirements.
@@ -379,7 +384,7 @@ const ServiceCityPage = () => {
 
               <div className="bg-white p-6 rounded-xl shadow-sm">
                 <h3 className="text-lg font-semibold text-gray-900 mb-2">
-                  Can I see examples of your previous {service.name.toLowerCase()} work in {city.name}?
+                  Can I see examples of your previous {service.name.toLowerCase()} work in {placeName}?
                 </h3>
                 <p className="text-gray-600">
                   Absolutely! We have a portfolio of successful projects. Contact us to see relevant case studies and examples.
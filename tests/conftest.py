@@ -0,0 +1,44 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.memory_mongo import MemoryClient  # noqa: E402
+from catalog import CatalogSnapshot  # noqa: E402
+from seed import load_seed_data  # noqa: E402
+
+
+@pytest.fixture
+def memory_db():
+    return MemoryClient()["test"]
+
+
+@pytest.fixture
+def seed_collections():
+    return load_seed_data()
+
+
+@pytest.fixture
+def snapshot(seed_collections):
+    return CatalogSnapshot.build(1, seed_collections, time.time())
+
+
+@pytest.fixture(scope="session")
+def server(tmp_path_factory):
+    """The app on an in-memory database, imported once per test session."""
+    import motor.motor_asyncio
+
+    with pytest.MonkeyPatch.context() as patch:
+        for name, value in {
+            "MONGO_URL": "mongodb://memory", "DB_NAME": "api_test", "CATALOG_SNAPSHOT_PATH": "",
+            "NOTIFY_TRANSPORT": "file", "NOTIFY_FILE": str(tmp_path_factory.mktemp("notify") / "n.jsonl"),
+        }.items():
+            patch.setenv(name, value)
+        patch.setattr(motor.motor_asyncio, "AsyncIOMotorClient", MemoryClient)
+        import server
+
+        yield server
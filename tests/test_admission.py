@@ -0,0 +1,110 @@
+import pytest
+
+import admission as admission_module
+from admission import AdmissionControl, AdmissionLimits, AdmissionRejected, IdempotencyConflict, submission_key
+
+MALLORY = {"name": "Mallory", "email": "m@example.com", "phone": "1", "city": "Delhi", "service": "SEO", "message": "hi"}
+BOB = {**MALLORY, "name": "Bob", "email": "bob@example.com", "phone": "2", "message": "call me"}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission_module.time, "monotonic", clock)
+    return clock
+
+
+def control(**limits) -> AdmissionControl:
+    return AdmissionControl(AdmissionLimits(**{"ip_per_minute": 0, "global_per_second": 0, **limits}))
+
+
+def test_replay_returns_the_original_submission(clock):
+    gate = control()
+    key, body_hash = submission_key(MALLORY, "10.0.0.1", "k1")
+    gate.remember(key, body_hash, {"id": "first"})
+    assert gate.recall(key, body_hash) == {"id": "first"}
+    assert gate.stats()["deduplicated"] == 1
+
+
+def test_content_hash_ignores_case_and_whitespace(clock):
+    gate = control()
+    key, body_hash = submission_key(MALLORY, "10.0.0.1")
+    gate.remember(key, body_hash, {"id": "first"})
+    repeat = {**MALLORY, "name": "  mallory ", "email": "M@example.com"}
+    assert gate.recall(*submission_key(repeat, "10.0.0.2")) == {"id": "first"}
+
+
+def test_reused_key_with_a_different_body_is_a_conflict(clock):
+    gate = control()
+    key, body_hash = submission_key(MALLORY, "10.0.0.1", "k1")
+    gate.remember(key, body_hash, {"id": "mallory", **MALLORY})
+    with pytest.raises(IdempotencyConflict):
+        gate.recall(*submission_key(BOB, "10.0.0.1", "k1"))
+    assert gate.stats()["conflicts"] == 1
+
+
+def test_idempotency_keys_are_scoped_to_the_client(clock):
+    gate = control()
+    key, body_hash = submission_key(MALLORY, "10.0.0.1", "k1")
+    gate.remember(key, body_hash, {"id": "mallory"})
+    assert gate.recall(*submission_key(BOB, "10.0.0.2", "k1")) is None
+    assert gate.recall(*submission_key(MALLORY, "10.0.0.2", "k1")) is None
+
+
+def test_entries_expire_after_the_dedup_window(clock):
+    gate = control(dedup_seconds=60)
+    key, body_hash = submission_key(MALLORY, "10.0.0.1", "k1")
+    gate.remember(key, body_hash, {"id": "first"})
+    clock.now += 59
+    assert gate.recall(key, body_hash) == {"id": "first"}
+    clock.now += 2
+    assert gate.recall(key, body_hash) is None
+    assert gate.stats()["recent_submissions"] == 0
+
+
+def test_dedup_window_of_zero_disables_remembering(clock):
+    gate = control(dedup_seconds=0)
+    key, body_hash = submission_key(MALLORY, "10.0.0.1")
+    gate.remember(key, body_hash, {"id": "first"})
+    assert gate.recall(key, body_hash) is None
+
+
+def test_per_client_bucket_refills_over_time(clock):
+    gate = control(ip_per_minute=6, ip_burst=2)
+    gate.admit("a")
+    gate.admit("a")
+    with pytest.raises(AdmissionRejected) as rejected:
+        gate.admit("a")
+    assert rejected.value.scope == "Client" and rejected.value.retry_after == 10
+    gate.admit("b")
+    clock.now += 10
+    gate.admit("a")
+    assert gate.stats()["rejected_client"] == 1
+
+
+def test_global_rejection_returns_the_client_token(clock):
+    gate = control(ip_per_minute=60, ip_burst=1, global_per_second=1, global_burst=1)
+    gate.admit("a")
+    with pytest.raises(AdmissionRejected) as rejected:
+        gate.admit("b")
+    assert rejected.value.scope == "Global"
+    clock.now += 1
+    # b's own token was given back, so only the global bucket had to refill.
+    gate.admit("b")
+
+
+def test_configure_changes_limits_at_runtime(clock):
+    gate = control(ip_per_minute=1, ip_burst=1)
+    gate.admit("a")
+    with pytest.raises(AdmissionRejected):
+        gate.admit("a")
+    assert gate.configure(ip_per_minute=0).ip_per_minute == 0
+    gate.admit("a")
@@ -0,0 +1,16 @@
+import pytest
+
+from benchmarks.load import is_local_url
+
+
+@pytest.mark.parametrize("url, local", [
+    ("mongodb://localhost:27017", True),
+    ("mongodb://127.0.0.1", True),
+    ("mongodb://user:pw@[::1]:27017/?authSource=admin", True),
+    ("mongodb://localhost:27017,localhost:27018", True),
+    ("mongodb://localhost,db.example.com", False),
+    ("mongodb://db.internal:27017", False),
+    ("mongodb+srv://cluster0.example.mongodb.net", False),
+])
+def test_is_local_url(url, local):
+    assert is_local_url(url) is local
@@ -0,0 +1,111 @@
+import asyncio
+import copy
+
+from catalog import CatalogCache
+
+
+class FakeStorage:
+    name = "fake"
+
+    def __init__(self, collections, db=None):
+        self.collections = collections
+        self.db = db
+        self.loads = 0
+
+    async def load_catalog(self):
+        self.loads += 1
+        return copy.deepcopy(self.collections)
+
+
+class ChangeStream:
+    """Events pushed onto ``events`` as a Motor change stream would deliver them."""
+
+    def __init__(self):
+        self.events = asyncio.Queue()
+
+    def watch(self, pipeline):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.events.get()
+
+    async def try_next(self):
+        return None if self.events.empty() else self.events.get_nowait()
+
+
+def test_reads_are_served_from_memory_until_the_ttl(seed_collections, monkeypatch):
+    async def scenario():
+        storage = FakeStorage(seed_collections)
+        cache = CatalogCache(storage, ttl=60, invalidation="ttl")
+        await cache.start()
+        first = await cache.get()
+        assert await cache.get() is first and storage.loads == 1
+        monkeypatch.setattr("catalog.time.monotonic", lambda: float("inf"))
+        await cache.get()
+        return storage.loads, cache.stats()
+
+    loads, stats = asyncio.run(scenario())
+    assert loads == 2
+    assert stats["hits"] == 2 and stats["misses"] == 1
+    # Reloading identical content keeps the version.
+    assert stats["version"] == 1 and stats["changes"] == 1
+
+
+def test_listeners_see_each_content_change_once(seed_collections):
+    seen = []
+
+    async def scenario():
+        storage = FakeStorage(seed_collections)
+        cache = CatalogCache(storage, ttl=0, invalidation="ttl")
+        cache.subscribe(lambda old, new: seen.append((old and old.version, new.version)))
+        await cache.start()
+        await cache.refresh(force=True)
+        storage.collections["services"][0]["name"] = "Renamed"
+        await cache.refresh(force=True)
+        return cache.snapshot
+
+    snapshot = asyncio.run(scenario())
+    assert seen == [(None, 1), (1, 2)]
+    assert snapshot.services[0]["name"] == "Renamed"
+
+
+def test_concurrent_misses_share_one_reload(seed_collections):
+    async def scenario():
+        storage = FakeStorage(seed_collections)
+        cache = CatalogCache(storage, ttl=0.001, invalidation="ttl")
+        await cache.start()
+        await asyncio.sleep(0.01)
+        snapshots = await asyncio.gather(*(cache.get() for _ in range(20)))
+        return storage.loads, snapshots
+
+    loads, snapshots = asyncio.run(scenario())
+    assert loads == 2
+    assert all(s is snapshots[0] for s in snapshots)
+
+
+def test_a_burst_of_change_events_causes_one_reload(seed_collections):
+    async def scenario():
+        stream = ChangeStream()
+        storage = FakeStorage(seed_collections, db=stream)
+        cache = CatalogCache(storage, ttl=0, invalidation="change_stream", debounce=0.05)
+        await cache.start()
+        await asyncio.sleep(0)
+        for _ in range(68):
+            stream.events.put_nowait({"operationType": "update"})
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.3)
+        await cache.stop()
+        return storage.loads, cache.stats()
+
+    loads, stats = asyncio.run(scenario())
+    assert loads == 2
+    assert stats["coalesced"] == 67
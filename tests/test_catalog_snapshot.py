@@ -0,0 +1,68 @@
+import asyncio
+import copy
+import time
+
+from catalog import CatalogSnapshot
+from catalog_snapshot import CatalogSnapshotFile, MappedCatalogSnapshot
+from pages import ServiceCityPageStore
+
+
+def published(tmp_path, snapshot):
+    pages = ServiceCityPageStore()
+    pages.rebuild(None, snapshot)
+    snapshot_file = CatalogSnapshotFile(tmp_path / "catalog.snap", pages)
+    snapshot_file.publish(None, snapshot)
+    return snapshot_file, pages
+
+
+def test_published_snapshot_round_trips(tmp_path, snapshot, seed_collections):
+    writer, pages = published(tmp_path, snapshot)
+    mapped = MappedCatalogSnapshot.open(tmp_path / "catalog.snap")
+    try:
+        assert mapped.digest == snapshot.digest
+        assert mapped.collections() == seed_collections
+        key = next(iter(pages.pages))
+        assert mapped.pages[key] == pages.pages[key]
+        assert len(mapped.pages) == len(pages.pages)
+    finally:
+        mapped.close()
+    assert writer.counters["writes"] == 1
+
+
+def test_a_second_worker_starts_from_the_file_without_rendering(tmp_path, snapshot):
+    published(tmp_path, snapshot)
+    pages = ServiceCityPageStore()
+    reader = CatalogSnapshotFile(tmp_path / "catalog.snap", pages)
+    assert reader.load() is not None
+    pages.rebuild(None, snapshot)
+    reader.publish(None, snapshot)
+    assert pages.stats()["pages_built"] == 0
+    assert reader.counters == {"loads": 1, "writes": 0, "closed": 0}
+
+
+def test_stale_or_missing_files_are_not_loaded(tmp_path, snapshot):
+    published(tmp_path, snapshot)
+    assert CatalogSnapshotFile(tmp_path / "catalog.snap", ServiceCityPageStore(), max_age=-1).load() is None
+    assert CatalogSnapshotFile(tmp_path / "missing.snap", ServiceCityPageStore()).load() is None
+    (tmp_path / "junk.snap").write_bytes(b"not a snapshot")
+    assert MappedCatalogSnapshot.open(tmp_path / "junk.snap") is None
+
+
+def test_replaced_mappings_are_closed_after_the_grace_period(tmp_path, snapshot):
+    async def scenario():
+        pages = ServiceCityPageStore()
+        snapshot_file = CatalogSnapshotFile(tmp_path / "catalog.snap", pages, retire_after=0.05)
+        pages.rebuild(None, snapshot)
+        snapshot_file.publish(None, snapshot)
+        collections = copy.deepcopy({name: getattr(snapshot, name) for name in ("services", "cities", "testimonials", "portfolio")})
+        collections["services"][0]["name"] = "Renamed"
+        new = CatalogSnapshot.build(2, collections, time.time())
+        pages.rebuild(snapshot, new)
+        snapshot_file.publish(snapshot, new)
+        retiring = snapshot_file.stats()["retiring"]
+        await asyncio.sleep(0.1)
+        return retiring, snapshot_file.stats()
+
+    retiring, stats = asyncio.run(scenario())
+    assert retiring == 1
+    assert stats["retiring"] == 0 and stats["closed"] == 1 and stats["writes"] == 2
@@ -0,0 +1,135 @@
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import compression
+from compression import CompressedVariants, CompressionMiddleware, negotiate
+from http_cache import _etag_matches, encoded_etag, make_etag
+
+BODY = b'{"cities":[' + b",".join(b'{"name":"City %d"}' % i for i in range(200)) + b"]}"
+ETAG = make_etag("cities")
+
+
+def client_for(variants: CompressedVariants, **options) -> TestClient:
+    async def catalog(request):
+        return Response(BODY, media_type="application/json", headers={"ETag": ETAG})
+
+    async def dynamic(request):
+        return Response(BODY, media_type="application/json")
+
+    async def tiny(request):
+        return Response(b"{}", media_type="application/json")
+
+    async def stream(request):
+        async def chunks():
+            for _ in range(3):
+                yield BODY
+        return StreamingResponse(chunks(), media_type="application/xml")
+
+    app = Starlette(routes=[Route("/catalog", catalog), Route("/search", catalog), Route("/dynamic", dynamic),
+                            Route("/tiny", tiny), Route("/stream", stream)])
+    app.add_middleware(CompressionMiddleware, variants=variants, minimum_size=512, **options)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("br, gzip", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "br"),
+    ("identity", None),
+    ("", None),
+])
+def test_negotiate(header, expected):
+    assert negotiate(header) == expected
+
+
+def test_compressed_variant_etag_validates_the_representation():
+    assert encoded_etag(ETAG, "gzip") == ETAG[:-1] + '-gzip"'
+    assert _etag_matches(encoded_etag(ETAG, "gzip"), ETAG)
+    assert _etag_matches(encoded_etag(ETAG, "br"), ETAG)
+    assert not _etag_matches(encoded_etag(make_etag("other"), "gzip"), ETAG)
+
+
+def test_etagged_response_is_compressed_once_per_etag():
+    variants = CompressedVariants()
+    client = client_for(variants)
+    for junk in range(5):
+        response = client.get(f"/catalog?junk={junk}", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] == ETAG[:-1] + '-gzip"'
+        assert response.content == BODY
+    assert variants.stats()["misses"] == 1 and variants.stats()["hits"] == 4
+
+
+def test_brotli_variant_round_trips():
+    client = client_for(CompressedVariants())
+    response = client.get("/catalog", headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.content == BODY
+
+
+def test_identity_and_small_responses_are_left_alone():
+    client = client_for(CompressedVariants())
+    plain = client.get("/catalog", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+    assert plain.headers["etag"] == ETAG
+    tiny = client.get("/tiny", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in tiny.headers
+
+
+def test_dynamic_and_streamed_responses_are_compressed_on_the_fly():
+    variants = CompressedVariants()
+    client = client_for(variants)
+    dynamic = client.get("/dynamic", headers={"Accept-Encoding": "gzip"})
+    assert dynamic.headers["content-encoding"] == "gzip" and dynamic.content == BODY
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as streamed:
+        raw = b"".join(streamed.iter_raw())
+    assert streamed.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(raw) == BODY * 3
+    assert variants.stats()["entries"] == 0 and variants.stats()["streamed"] == 1
+
+
+def test_invalidate_drops_cached_variants(snapshot):
+    variants = CompressedVariants()
+    client_for(variants).get("/catalog", headers={"Accept-Encoding": "gzip"})
+    assert variants.stats()["entries"] == 1
+    variants.invalidate(None, snapshot)
+    assert variants.stats()["entries"] == 0
+
+
+def test_uncached_responses_never_use_the_slow_encoder(monkeypatch):
+    def slow(body, encoding):
+        raise AssertionError("max-quality compression outside the variant cache")
+
+    variants = CompressedVariants()
+    client = client_for(variants, uncached_paths=("/search",))
+    monkeypatch.setattr(compression, "compress", slow)
+    for path in ("/dynamic", "/search"):
+        response = client.get(path, headers={"Accept-Encoding": "br"})
+        assert response.headers["content-encoding"] == "br" and response.content == BODY
+    assert client.get("/search", headers={"Accept-Encoding": "gzip"}).headers["etag"] == ETAG[:-1] + '-gzip"'
+    assert variants.stats()["entries"] == 0
+
+
+def test_unrelated_query_parameters_share_one_variant(server):
+    with TestClient(server.app) as client:
+        server.compressed_variants.invalidate(None, server.catalog.snapshot)
+        misses = server.compressed_variants.stats()["misses"]
+        etags = {
+            client.get(f"/api/cities?limit=200&junk={junk}", headers={"Accept-Encoding": "br"}).headers["etag"]
+            for junk in range(3)
+        }
+        client.get("/api/cities?fields=slug,name,slug&limit=200", headers={"Accept-Encoding": "br"})
+        client.get("/api/cities?fields=slug,name&limit=200&utm_source=x", headers={"Accept-Encoding": "br"})
+        for q in ("del", "mum", "ban"):
+            client.get(f"/api/search?q={q}&limit=20", headers={"Accept-Encoding": "br"})
+        stats = server.compressed_variants.stats()
+    assert len(etags) == 1
+    assert stats["misses"] - misses == 2 and stats["entries"] == 2
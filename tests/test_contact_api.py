@@ -0,0 +1,73 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+MALLORY = {"name": "Mallory", "email": "m@example.com", "phone": "1", "city": "Delhi", "service": "SEO", "message": "hi"}
+BOB = {**MALLORY, "name": "Bob", "email": "bob@example.com", "phone": "2", "message": "call me"}
+
+
+@pytest.fixture
+def client(server):
+    server.admission.configure(ip_per_minute=0, global_per_second=0)
+    with TestClient(server.app) as client:
+        yield client
+
+
+def written(server, email: str) -> int:
+    return sum(1 for doc in server.db.contact_submissions._docs if doc["email"] == email)
+
+
+def test_replay_with_the_same_key_is_not_written_twice(server, client):
+    form = {**MALLORY, "email": "replay@example.com"}
+    first = client.post("/api/contact", json=form, headers={"Idempotency-Key": "replay-1"})
+    again = client.post("/api/contact", json=form, headers={"Idempotency-Key": "replay-1"})
+    assert first.status_code == again.status_code == 200
+    assert again.json()["id"] == first.json()["id"]
+    assert again.headers["idempotent-replayed"] == "true"
+    time.sleep(0.2)
+    assert written(server, "replay@example.com") == 1
+
+
+def test_reused_key_with_a_different_body_is_rejected(server, client):
+    client.post("/api/contact", json=MALLORY, headers={"Idempotency-Key": "k1"})
+    response = client.post("/api/contact", json=BOB, headers={"Idempotency-Key": "k1"})
+    assert response.status_code == 422
+    assert "Mallory" not in response.text and "m@example.com" not in response.text
+
+
+def test_rate_limited_submissions_get_429(server, client):
+    server.admission.configure(ip_per_minute=60, ip_burst=1)
+    ok = client.post("/api/contact", json={**BOB, "email": "limit1@example.com"})
+    limited = client.post("/api/contact", json={**BOB, "email": "limit2@example.com"})
+    assert ok.status_code == 200
+    assert limited.status_code == 429 and int(limited.headers["retry-after"]) >= 1
+
+
+def request_from(peer: str, *forwarded: str) -> Request:
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded]
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers, "client": (peer, 1234)})
+
+
+def test_client_address_uses_the_entry_our_proxy_added(server, monkeypatch):
+    monkeypatch.setattr(server, "TRUST_FORWARDED_FOR", True)
+    assert server.client_address(request_from("10.0.0.9", "6.6.6.6, 203.0.113.7")) == "203.0.113.7"
+    assert server.client_address(request_from("10.0.0.9", "203.0.113.7")) == "203.0.113.7"
+    assert server.client_address(request_from("10.0.0.9")) == "10.0.0.9"
+
+    monkeypatch.setattr(server, "FORWARDED_FOR_HOPS", 2)
+    assert server.client_address(request_from("10.0.0.9", "6.6.6.6, 203.0.113.7", "198.51.100.1")) == "203.0.113.7"
+    # Fewer entries than trusted proxies: the chain was bypassed, so trust nothing in it.
+    assert server.client_address(request_from("10.0.0.9", "6.6.6.6")) == "10.0.0.9"
+
+
+def test_spoofed_forwarded_for_does_not_reset_the_rate_limit(server, client, monkeypatch):
+    monkeypatch.setattr(server, "TRUST_FORWARDED_FOR", True)
+    server.admission.configure(ip_per_minute=60, ip_burst=1)
+    statuses = [
+        client.post("/api/contact", json={**BOB, "email": f"spoof{i}@example.com"},
+                    headers={"X-Forwarded-For": f"6.6.6.{i}, 203.0.113.7"}).status_code
+        for i in range(3)
+    ]
+    assert statuses == [200, 429, 429]
@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect, PyMongoError
+
+from contact_queue import ContactQueueFull, ContactWriteQueue
+
+
+def lead(i: int) -> dict:
+    return {"id": f"lead-{i}", "name": f"Lead {i}", "city": "Delhi", "service": "SEO"}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_submissions_are_written_in_batches(memory_db):
+    async def scenario():
+        queue = ContactWriteQueue(memory_db.contact_submissions, batch_size=10, flush_interval=0.01)
+        await queue.start()
+        for i in range(25):
+            await queue.submit(lead(i))
+        await queue.stop()
+        return queue.stats(), await memory_db.contact_submissions.count_documents({})
+
+    stats, stored = run(scenario())
+    assert stored == 25
+    assert stats["written"] == 25 and stats["batches"] == 3
+    assert stats["max_batch_size"] == 10
+
+
+def test_full_queue_rejects_with_retry_after(memory_db):
+    async def scenario():
+        queue = ContactWriteQueue(memory_db.contact_submissions, max_size=2, flush_interval=0.01)
+        await queue.start()
+        # Nothing is drained until the worker runs, so the third submit overflows.
+        await queue.submit(lead(1))
+        await queue.submit(lead(2))
+        with pytest.raises(ContactQueueFull) as full:
+            await queue.submit(lead(3))
+        await queue.stop()
+        return full.value, queue.stats()
+
+    full, stats = run(scenario())
+    assert full.retry_after >= 1
+    assert stats["rejected"] == 1 and stats["written"] == 2
+
+
+def test_durable_submit_waits_for_the_write(memory_db):
+    async def scenario():
+        queue = ContactWriteQueue(memory_db.contact_submissions, flush_interval=0.01, durable=True)
+        await queue.start()
+        await queue.submit(lead(1))
+        stored = await memory_db.contact_submissions.count_documents({"id": "lead-1"})
+        await queue.stop()
+        return stored
+
+    assert run(scenario()) == 1
+
+
+def test_submit_writes_through_when_not_running(memory_db):
+    written = []
+
+    async def listener(docs):
+        written.extend(docs)
+
+    async def scenario():
+        queue = ContactWriteQueue(memory_db.contact_submissions)
+        queue.subscribe(listener)
+        await queue.submit(lead(1))
+        return await memory_db.contact_submissions.count_documents({})
+
+    assert run(scenario()) == 1
+    assert [doc["id"] for doc in written] == ["lead-1"]
+
+
+def test_retry_after_a_partial_write_counts_stored_documents_as_written(memory_db):
+    notified = []
+    collection = memory_db.contact_submissions
+    insert_many = collection.insert_many
+
+    async def interrupted(docs, ordered=True):
+        # pymongo assigns every _id up front, then the connection drops mid-batch.
+        collection.insert_many = insert_many
+        for doc in docs:
+            doc.setdefault("_id", f"oid-{doc['id']}")
+        await insert_many(docs[:2], ordered=ordered)
+        raise AutoReconnect("connection closed")
+
+    async def listener(docs):
+        notified.extend(doc["id"] for doc in docs)
+
+    async def scenario():
+        collection.insert_many = interrupted
+        queue = ContactWriteQueue(collection, flush_interval=0.01, durable=True)
+        queue.subscribe(listener, required=True)
+        await queue.start()
+        await asyncio.gather(*(queue.submit(lead(i)) for i in range(4)))
+        await queue.stop()
+        return queue.stats(), await collection.count_documents({})
+
+    stats, stored = run(scenario())
+    assert stored == 4
+    assert stats["written"] == 4 and stats["failed"] == 0
+    assert sorted(notified) == [f"lead-{i}" for i in range(4)]
+
+
+def test_required_listener_is_retried_and_optional_one_is_not(memory_db):
+    calls = {"required": 0, "optional": 0}
+
+    async def required(docs):
+        calls["required"] += 1
+        if calls["required"] == 1:
+            raise PyMongoError("outbox unavailable")
+
+    async def optional(docs):
+        calls["optional"] += 1
+        raise RuntimeError("rollup failed")
+
+    async def scenario():
+        queue = ContactWriteQueue(memory_db.contact_submissions, flush_interval=0.01)
+        queue.subscribe(required, required=True)
+        queue.subscribe(optional)
+        await queue.start()
+        await queue.submit(lead(1))
+        await queue.stop()
+        return queue.stats()
+
+    stats = run(scenario())
+    assert calls == {"required": 2, "optional": 1}
+    assert stats["listener_failed"] == 0
+
+
+def test_required_listener_failure_is_counted(memory_db):
+    async def broken(docs):
+        raise PyMongoError("outbox unavailable")
+
+    async def scenario():
+        queue = ContactWriteQueue(memory_db.contact_submissions, flush_interval=0.01)
+        queue.subscribe(broken, required=True)
+        await queue.start()
+        await queue.submit(lead(1))
+        await queue.submit(lead(2))
+        await queue.stop()
+        return queue.stats()
+
+    assert run(scenario())["listener_failed"] == 2
@@ -0,0 +1,51 @@
+from email.utils import formatdate
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from http_cache import ConditionalGet, _etag_matches, make_etag
+
+
+def request_with(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_make_etag_is_stable_and_content_addressed():
+    assert make_etag("a", "b") == make_etag("a", "b")
+    assert make_etag("a", "b") != make_etag("a", "c")
+    assert make_etag("a").startswith('"') and make_etag("a").endswith('"')
+
+
+def test_etag_matching_uses_weak_comparison():
+    etag = make_etag("services")
+    assert _etag_matches(etag, etag)
+    assert _etag_matches(f"W/{etag}", etag)
+    assert _etag_matches(f'"other", {etag}', etag)
+    assert _etag_matches("*", etag)
+    assert not _etag_matches('"other"', etag)
+
+
+def test_conditional_get_answers_304_for_a_current_copy():
+    cache = ConditionalGet("public, max-age=60")
+    etag, modified = make_etag("x"), 1_700_000_000.0
+
+    response = Response()
+    assert cache.check(request_with(if_none_match=etag), response, etag, modified).status_code == 304
+
+    response = Response()
+    assert cache.check(request_with(if_none_match='"stale"'), response, etag, modified) is None
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "public, max-age=60"
+    assert cache.stats()["not_modified"] == 1 and cache.stats()["full"] == 1
+
+
+def test_if_modified_since_only_applies_without_if_none_match():
+    cache = ConditionalGet("no-cache")
+    etag, modified = make_etag("x"), 1_700_000_000.0
+    since = formatdate(modified, usegmt=True)
+
+    assert cache.check(request_with(if_modified_since=since), Response(), etag, modified).status_code == 304
+    assert cache.check(request_with(if_modified_since="not a date"), Response(), etag, modified) is None
+    stale_tag = request_with(if_none_match='"stale"', if_modified_since=since)
+    assert cache.check(stale_tag, Response(), etag, modified) is None
@@ -0,0 +1,54 @@
+import asyncio
+import csv
+import io
+import json
+
+from leads import LeadRollups, export_csv, export_ndjson, lead_filter
+
+
+def submission(i: int, **overrides) -> dict:
+    return {
+        "id": f"lead-{i}", "timestamp": f"2026-01-0{i}T10:00:00+00:00", "name": f"Lead {i}",
+        "email": f"lead{i}@example.com", "phone": "98100 00000", "city": "Delhi",
+        "service": "SEO", "message": "Hello", **overrides,
+    }
+
+
+async def collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+def test_csv_export_neutralises_formulas(memory_db):
+    async def scenario():
+        await memory_db.contact_submissions.insert_many([
+            submission(1, name="=HYPERLINK(\"http://evil\")", message="@SUM(A1)"),
+            submission(2, phone="+91 98100 00000", message="-2+3"),
+        ])
+        return await collect(export_csv(memory_db.contact_submissions, {}))
+
+    rows = list(csv.DictReader(io.StringIO(asyncio.run(scenario()).decode())))
+    assert rows[0]["name"] == "'=HYPERLINK(\"http://evil\")"
+    assert rows[0]["message"] == "'@SUM(A1)"
+    assert rows[1]["phone"] == "'+91 98100 00000"
+    assert rows[1]["message"] == "'-2+3"
+    assert rows[1]["email"] == "lead2@example.com"
+
+
+def test_ndjson_export_filters_and_orders_by_timestamp(memory_db):
+    async def scenario():
+        await memory_db.contact_submissions.insert_many([submission(3), submission(1), submission(2, city="Mumbai")])
+        query = lead_filter(city="Delhi")
+        return await collect(export_ndjson(memory_db.contact_submissions, query))
+
+    lines = [json.loads(line) for line in asyncio.run(scenario()).decode().splitlines()]
+    assert [doc["id"] for doc in lines] == ["lead-1", "lead-3"]
+
+
+def test_rollups_count_per_day_city_and_service(memory_db):
+    async def scenario():
+        rollups = LeadRollups(memory_db)
+        await rollups.record([submission(1), submission(1, id="x"), submission(2, city="Mumbai")])
+        await rollups.record([submission(1, id="y")])
+        return await rollups.query(city="Delhi")
+
+    assert asyncio.run(scenario()) == [{"day": "2026-01-01", "city": "Delhi", "service": "SEO", "count": 3}]
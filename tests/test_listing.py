@@ -0,0 +1,86 @@
+import copy
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from catalog import CatalogSnapshot
+from listing import ListingError, ListingIndex, encode_cursor, parse_fields
+
+
+def all_pages(index, snapshot, name, filters=None, limit=7):
+    fields = parse_fields(name, "id,slug" if name in ("services", "cities") else "id")
+    docs, cursor, pages = [], None, 0
+    while True:
+        page, cursor = index.page(snapshot, name, filters or {}, fields, cursor, limit)
+        docs += page
+        pages += 1
+        if cursor is None:
+            return docs, pages
+
+
+def test_cursor_paging_walks_the_list_in_catalog_order(snapshot):
+    index = ListingIndex()
+    index.rebuild(None, snapshot)
+    docs, pages = all_pages(index, snapshot, "cities", limit=7)
+    assert [d["id"] for d in docs] == [c["id"] for c in snapshot.cities]
+    assert pages == -(-len(snapshot.cities) // 7)
+
+
+def test_filters_are_case_insensitive_and_combine(snapshot):
+    index = ListingIndex()
+    metros = [c["id"] for c in snapshot.cities if c["tier"] == "metro"]
+    docs, _ = all_pages(index, snapshot, "cities", {"tier": "METRO"}, limit=2)
+    assert [d["id"] for d in docs] == metros
+
+    delhi, _ = index.page(snapshot, "cities", {"tier": "metro", "state": "delhi"}, ["slug"], None, None)
+    assert delhi == [{"slug": "delhi"}]
+    nothing, cursor = index.page(snapshot, "cities", {"tier": "no-such-tier"}, ["slug"], None, None)
+    assert nothing == [] and cursor is None
+
+
+def test_limit_is_capped(snapshot):
+    index = ListingIndex(max_limit=5)
+    docs, cursor = index.page(snapshot, "cities", {}, ["id"], None, 100)
+    assert len(docs) == 5 and cursor is not None
+
+
+def test_projection_keeps_only_requested_fields(snapshot):
+    assert parse_fields("cities", None) == ["id", "name", "slug", "state", "tier", "areas"]
+    assert parse_fields("cities", "slug, name,slug") == ["slug", "name"]
+    with pytest.raises(ListingError, match="Unknown fields: password"):
+        parse_fields("cities", "slug,password")
+
+
+def test_bad_cursors_are_rejected(snapshot):
+    index = ListingIndex()
+    with pytest.raises(ListingError, match="Invalid cursor"):
+        index.page(snapshot, "cities", {}, ["id"], "not-a-cursor", 5)
+    with pytest.raises(ListingError, match="Invalid cursor"):
+        index.page(snapshot, "cities", {}, ["id"], encode_cursor("services", "1"), 5)
+
+
+def test_cursor_into_a_removed_document_is_stale(seed_collections, snapshot):
+    index = ListingIndex()
+    _, cursor = index.page(snapshot, "cities", {}, ["id"], None, 3)
+    changed = copy.deepcopy(seed_collections)
+    del changed["cities"][2]
+    newer = CatalogSnapshot.build(2, changed, time.time())
+    index.rebuild(snapshot, newer)
+    with pytest.raises(ListingError, match="no longer valid"):
+        index.page(newer, "cities", {}, ["id"], cursor, 3)
+
+
+def test_list_route_pages_through_headers(server):
+    with TestClient(server.app) as client:
+        first = client.get("/api/cities?limit=5&fields=slug,name")
+        assert first.status_code == 200 and len(first.json()) == 5
+        assert set(first.json()[0]) == {"slug", "name"}
+        cursor = first.headers["x-next-cursor"]
+        assert f"cursor={cursor}" in first.headers["link"] and 'rel="next"' in first.headers["link"]
+        second = client.get(f"/api/cities?limit=5&fields=slug,name&cursor={cursor}")
+        assert second.json()[0] != first.json()[0]
+        again = client.get("/api/cities?limit=5&fields=slug,name", headers={"If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304
+        assert client.get("/api/cities?fields=password").status_code == 400
+        assert client.get("/api/cities?cursor=junk").status_code == 400
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from locks import LOCKS_COLLECTION, LeaseTimeout, MongoLease
+
+
+def test_only_one_holder_at_a_time(memory_db):
+    async def scenario():
+        first, second = MongoLease(memory_db, "startup"), MongoLease(memory_db, "startup")
+        assert await first.try_acquire()
+        assert await first.try_acquire()  # re-entrant for the owner
+        assert not await second.try_acquire()
+        await first.release()
+        assert await second.try_acquire()
+
+    asyncio.run(scenario())
+
+
+def test_waiters_run_one_after_another(memory_db):
+    order = []
+
+    async def worker(name: str):
+        async with MongoLease(memory_db, "startup", poll_interval=0.01):
+            order.append(f"{name} in")
+            await asyncio.sleep(0.05)
+            order.append(f"{name} out")
+
+    async def scenario():
+        await asyncio.gather(worker("a"), worker("b"), worker("c"))
+
+    asyncio.run(scenario())
+    assert all(order[i].split()[0] == order[i + 1].split()[0] for i in range(0, len(order), 2))
+
+
+def test_acquire_times_out_while_the_lease_is_held(memory_db):
+    async def scenario():
+        holder = MongoLease(memory_db, "startup")
+        await holder.acquire()
+        try:
+            with pytest.raises(LeaseTimeout):
+                await MongoLease(memory_db, "startup", wait_timeout=0.05, poll_interval=0.01).acquire()
+        finally:
+            await holder.release()
+
+    asyncio.run(scenario())
+
+
+def test_a_crashed_holders_lease_runs_out(memory_db):
+    async def scenario():
+        crashed = MongoLease(memory_db, "startup", ttl=0.05)
+        assert await crashed.try_acquire()  # never renewed or released
+        successor = MongoLease(memory_db, "startup", poll_interval=0.01, wait_timeout=1)
+        await successor.acquire()
+        lock = await memory_db[LOCKS_COLLECTION].find_one({"_id": "startup"})
+        await successor.release()
+        return successor.owner, lock
+
+    owner, lock = asyncio.run(scenario())
+    assert lock["owner"] == owner
+
+
+def test_the_holder_renews_its_lease(memory_db):
+    async def scenario():
+        holder = MongoLease(memory_db, "startup", ttl=0.06)
+        await holder.acquire()
+        await asyncio.sleep(0.15)
+        taken = await MongoLease(memory_db, "startup").try_acquire()
+        await holder.release()
+        return taken
+
+    assert asyncio.run(scenario()) is False
@@ -0,0 +1,141 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from notifications import DEAD_LETTER, OUTBOX, NotificationWorkerPool
+
+
+def lead(i: int) -> dict:
+    return {"id": f"lead-{i}", "name": f"Lead {i}", "email": f"lead{i}@example.com",
+            "city": "Delhi", "service": "SEO", "message": "Hello"}
+
+
+class Transport:
+    name = "test"
+
+    def __init__(self, failures: int = 0, delay: float = 0.0):
+        self.failures = failures
+        self.delay = delay
+        self.sent = []
+        self.attempts = 0
+
+    async def send(self, notification: dict) -> None:
+        self.attempts += 1
+        await asyncio.sleep(self.delay)
+        if self.attempts <= self.failures:
+            raise ConnectionError("smtp down")
+        self.sent.append(notification["_id"])
+
+
+def pool(memory_db, transport, **options) -> NotificationWorkerPool:
+    options = {"concurrency": 2, "base_delay": 0.01, "poll_interval": 0.05, **options}
+    return NotificationWorkerPool(memory_db, transport, **options)
+
+
+async def drained(memory_db, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while await memory_db[OUTBOX].count_documents({}) and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.01)
+
+
+def test_each_submission_is_delivered_once(memory_db):
+    transport = Transport()
+
+    async def scenario():
+        workers = pool(memory_db, transport)
+        await workers.start()
+        await workers.enqueue([lead(i) for i in range(5)])
+        # A retried contact flush enqueues the same rows again.
+        await workers.enqueue([lead(0), lead(1)])
+        await drained(memory_db)
+        await workers.stop()
+        return workers.counters
+
+    counters = asyncio.run(scenario())
+    assert sorted(transport.sent) == [f"lead-{i}" for i in range(5)]
+    assert counters["delivered"] == 5
+
+
+def test_failed_delivery_is_retried_with_backoff(memory_db):
+    transport = Transport(failures=2)
+
+    async def scenario():
+        workers = pool(memory_db, transport, concurrency=1)
+        await workers.start()
+        await workers.enqueue([lead(1)])
+        await drained(memory_db)
+        await workers.stop()
+        return workers.counters
+
+    counters = asyncio.run(scenario())
+    assert transport.sent == ["lead-1"]
+    assert counters["retried"] == 2 and counters["delivered"] == 1
+
+
+def test_exhausted_rows_move_to_the_dead_letter_collection(memory_db):
+    transport = Transport(failures=100)
+
+    async def scenario():
+        workers = pool(memory_db, transport, concurrency=1, max_attempts=3)
+        await workers.start()
+        await workers.enqueue([lead(1)])
+        await drained(memory_db)
+        await workers.stop()
+        return workers.counters, await memory_db[DEAD_LETTER].find_one({"_id": "lead-1"})
+
+    counters, dead = asyncio.run(scenario())
+    assert transport.attempts == 3 and counters["dead_lettered"] == 1
+    assert dead["attempts"] == 3 and dead["last_error"] == "ConnectionError: smtp down"
+
+
+def test_only_expired_leases_are_reclaimed(memory_db):
+    transport = Transport()
+    now = datetime.now(timezone.utc)
+
+    async def scenario():
+        await memory_db[OUTBOX].insert_many([
+            {"_id": "crashed", "payload": lead(1), "status": "sending", "attempts": 1,
+             "next_attempt_at": now, "lease_until": now - timedelta(seconds=1)},
+            {"_id": "busy", "payload": lead(2), "status": "sending", "attempts": 1,
+             "next_attempt_at": now, "lease_until": now + timedelta(minutes=5)},
+        ])
+        workers = pool(memory_db, transport)
+        await workers.start()
+        await asyncio.sleep(0.1)
+        await workers.stop()
+        return await memory_db[OUTBOX].find_one({"_id": "busy"})
+
+    busy = asyncio.run(scenario())
+    assert transport.sent == ["crashed"]
+    assert busy["status"] == "sending"
+
+
+def test_stop_lets_a_delivery_in_progress_finish(memory_db):
+    transport = Transport(delay=0.2)
+
+    async def scenario():
+        workers = pool(memory_db, transport, concurrency=1)
+        await workers.start()
+        await workers.enqueue([lead(1)])
+        await asyncio.sleep(0.05)
+        await workers.stop()
+        return await memory_db[OUTBOX].count_documents({})
+
+    assert asyncio.run(scenario()) == 0
+    assert transport.sent == ["lead-1"]
+
+
+def test_stop_cancels_deliveries_that_outlast_the_grace_period(memory_db):
+    transport = Transport(delay=5)
+
+    async def scenario():
+        workers = pool(memory_db, transport, concurrency=1, shutdown_grace=0.05)
+        await workers.start()
+        await workers.enqueue([lead(1)])
+        await asyncio.sleep(0.05)
+        await workers.stop()
+        return await memory_db[OUTBOX].find_one({"_id": "lead-1"})
+
+    row = asyncio.run(scenario())
+    assert transport.sent == []
+    # Left leased, so another worker delivers it once the lease runs out.
+    assert row["status"] == "sending"
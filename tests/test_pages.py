@@ -0,0 +1,121 @@
+import copy
+import json
+import time
+
+from catalog import CatalogSnapshot
+from pages import AreaPageCache, ServiceCityPageStore, area_slug, render_service_city_page
+
+
+def next_snapshot(snapshot: CatalogSnapshot, edit) -> CatalogSnapshot:
+    collections = copy.deepcopy({
+        "services": snapshot.services, "cities": snapshot.cities,
+        "testimonials": snapshot.testimonials, "portfolio": snapshot.portfolio,
+    })
+    edit(collections)
+    return CatalogSnapshot.build(snapshot.version + 1, collections, time.time())
+
+
+def test_first_build_renders_every_pair(snapshot):
+    store = ServiceCityPageStore()
+    store.rebuild(None, snapshot)
+    assert len(store) == len(snapshot.services) * len(snapshot.cities)
+    service, city = snapshot.services[0], snapshot.cities[0]
+    assert store.get(service["slug"], city["slug"]) == render_service_city_page(service, city)
+    assert store.get(service["slug"], "atlantis") is None
+    assert store.stats()["full_builds"] == 1 and store.generation == 1
+
+
+def test_rebuild_renders_only_the_changed_service(snapshot):
+    store = ServiceCityPageStore()
+    store.rebuild(None, snapshot)
+    untouched = dict(store.pages)
+    renamed = snapshot.services[0]["slug"]
+
+    def rename(collections):
+        collections["services"][0]["name"] = "Renamed Service"
+
+    new = next_snapshot(snapshot, rename)
+    store.rebuild(snapshot, new)
+
+    stats = store.stats()
+    assert stats["incremental_builds"] == 1
+    assert stats["pages_built"] == len(untouched) + len(snapshot.cities)
+    for (service_slug, city_slug), page in store.pages.items():
+        if service_slug == renamed:
+            assert json.loads(page)["service"]["name"] == "Renamed Service"
+        else:
+            # Pages of unchanged services are the same objects, not re-rendered copies.
+            assert page is untouched[(service_slug, city_slug)]
+
+
+def test_removed_and_added_cities(snapshot):
+    store = ServiceCityPageStore()
+    store.rebuild(None, snapshot)
+    gone = snapshot.cities[0]["slug"]
+
+    def replace_city(collections):
+        city = collections["cities"].pop(0)
+        collections["cities"].append({**city, "name": "Newtown", "slug": "newtown"})
+
+    new = next_snapshot(snapshot, replace_city)
+    store.rebuild(snapshot, new)
+    service_slug = snapshot.services[0]["slug"]
+    assert store.get(service_slug, gone) is None
+    assert json.loads(store.get(service_slug, "newtown"))["city"]["name"] == "Newtown"
+    assert len(store) == len(new.services) * len(new.cities)
+    assert store.stats()["pages_built"] == len(store) + len(new.services)
+
+
+def test_attached_pages_are_adopted_without_rendering(snapshot):
+    source = ServiceCityPageStore()
+    source.rebuild(None, snapshot)
+    store = ServiceCityPageStore()
+    store.attach(source.pages, snapshot.digest)
+    store.rebuild(None, snapshot)
+    assert store.pages is source.pages
+    assert store.stats()["pages_built"] == 0 and store.stats()["attached"] == 1
+
+
+def area_of(snapshot):
+    city = next(c for c in snapshot.cities if c.get("areas"))
+    return snapshot.services[0]["slug"], city, city["areas"][0]
+
+
+def test_area_pages_render_once_per_catalog_version(snapshot):
+    cache = AreaPageCache()
+    service_slug, city, area = area_of(snapshot)
+    page = cache.get(snapshot, service_slug, city["slug"], area_slug(area))
+    assert json.loads(page)["area"] == area
+    assert cache.get(snapshot, service_slug, city["slug"], area_slug(area)) is page
+    assert cache.stats()["renders"] == 1 and cache.stats()["hits"] == 1
+
+    newer = next_snapshot(snapshot, lambda collections: None)
+    cache.get(newer, service_slug, city["slug"], area_slug(area))
+    assert cache.stats()["renders"] == 2
+
+
+def test_unknown_areas_are_negatively_cached(snapshot):
+    cache = AreaPageCache(negative_ttl=60)
+    service_slug, city, _ = area_of(snapshot)
+    for _ in range(3):
+        assert cache.get(snapshot, service_slug, city["slug"], "nowhere") is None
+    assert cache.get(snapshot, "no-such-service", city["slug"], "nowhere") is None
+    stats = cache.stats()
+    assert stats["not_found"] == 4 and stats["negative_cache"]["hits"] == 2
+    assert stats["entries"] == 0
+
+
+def test_area_cache_evicts_least_recently_used(snapshot):
+    cache = AreaPageCache(max_entries=2)
+    service_slug, city, _ = area_of(snapshot)
+    first, second, third = (area_slug(a) for a in city["areas"][:3])
+    cache.get(snapshot, service_slug, city["slug"], first)
+    cache.get(snapshot, service_slug, city["slug"], second)
+    cache.get(snapshot, service_slug, city["slug"], first)
+    cache.get(snapshot, service_slug, city["slug"], third)
+    assert cache.stats()["evictions"] == 1
+    cache.get(snapshot, service_slug, city["slug"], first)
+    assert cache.stats()["hits"] == 2
+
+    cache.invalidate(snapshot, snapshot)
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,68 @@
+import copy
+import time
+
+from catalog import CatalogSnapshot
+from search import SearchIndex
+
+
+def index_for(snapshot) -> SearchIndex:
+    index = SearchIndex()
+    index.update(None, snapshot)
+    return index
+
+
+def test_exact_name_ranks_first(snapshot):
+    results = index_for(snapshot).search("branding")
+    assert results[0]["type"] == "service"
+    assert results[0]["service_slug"] == "branding-services"
+
+
+def test_prefix_matches_complete_the_word(snapshot):
+    results = index_for(snapshot).search("mumb")
+    assert results[0] == {**results[0], "type": "city", "city_slug": "mumbai"}
+
+
+def test_one_typo_is_tolerated(snapshot):
+    index = index_for(snapshot)
+    assert index.search("brandign")[0]["service_slug"] == "branding-services"
+    assert index.search("hyderbad")[0]["city_slug"] == "hyderabad"
+    # Below the typo-tolerance length only real prefixes match.
+    assert all(r.get("city_slug") != "delhi" for r in index.search("dlh"))
+
+
+def test_exact_match_outranks_typo_match(snapshot):
+    results = index_for(snapshot).search("delhi")
+    assert results[0]["city_slug"] == "delhi"
+    scores = [r["score"] for r in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_service_and_place_combine_into_a_landing_page(snapshot):
+    top = index_for(snapshot).search("branding delhi")[0]
+    assert top["type"] == "service_city"
+    assert top["path"] == "/branding-services/delhi"
+
+    area = index_for(snapshot).search("branding bandra")[0]
+    assert area["type"] == "service_city"
+    assert area["path"] == "/branding-services/mumbai/bandra"
+
+
+def test_limit_and_empty_queries(snapshot):
+    index = index_for(snapshot)
+    assert len(index.search("marketing", limit=2)) == 2
+    assert index.search("!!!") == []
+
+
+def test_update_reindexes_only_changed_documents(seed_collections, snapshot):
+    index = index_for(snapshot)
+    changed = copy.deepcopy(seed_collections)
+    removed = changed["cities"].pop()
+    changed["services"][0]["name"] = "Brand Studio"
+    before = index.stats()["entries_updated"]
+
+    index.update(snapshot, CatalogSnapshot.build(2, changed, time.time()))
+
+    # One service re-indexed; the removed city (and its areas) only dropped.
+    assert index.stats()["entries_updated"] - before == 1
+    assert all(r.get("city_slug") != removed["slug"] for r in index.search(removed["name"]))
+    assert index.search("studio")[0]["label"] == "Brand Studio"
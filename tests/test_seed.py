@@ -0,0 +1,55 @@
+import asyncio
+
+from seed import META_COLLECTION, META_ID, SEED_COLLECTIONS, load_seed_data, seed_database
+
+
+def test_cold_start_seeds_every_collection_then_stays_warm(memory_db):
+    async def scenario():
+        first = await seed_database(memory_db)
+        second = await seed_database(memory_db)
+        counts = {name: await memory_db[name].count_documents({}) for name in SEED_COLLECTIONS}
+        return first, second, counts
+
+    first, second, counts = asyncio.run(scenario())
+    seed = load_seed_data()
+    assert first == counts == {name: len(seed[name]) for name in SEED_COLLECTIONS}
+    assert second == {}
+
+
+def test_existing_data_without_a_checksum_is_adopted_untouched(memory_db):
+    seed = load_seed_data()
+
+    async def scenario():
+        services = memory_db.services
+        await services.insert_many([dict(doc) for doc in seed["services"][1:]])
+        await services.update_one({"id": seed["services"][1]["id"]}, {"$set": {"name": "Edited"}})
+        changed = await seed_database(memory_db)
+        meta = await memory_db[META_COLLECTION].find_one({"_id": META_ID})
+        return changed, services, meta
+
+    changed, services, meta = asyncio.run(scenario())
+    assert changed["services"] == 0 and changed["cities"] == len(seed["cities"])
+    assert "checksum" in meta["collections"]["services"]
+    docs = services._docs
+    # The deleted first service stays deleted and the edit is kept.
+    assert len(docs) == len(seed["services"]) - 1
+    assert docs[0]["name"] == "Edited"
+
+
+def test_seed_file_change_adds_documents_without_overwriting_edits(memory_db):
+    seed = load_seed_data()
+
+    async def scenario():
+        await seed_database(memory_db)
+        edited, removed = seed["cities"][0]["id"], seed["cities"][1]["id"]
+        await memory_db.cities.update_one({"id": edited}, {"$set": {"name": "Edited"}})
+        await memory_db.cities.delete_one({"id": removed})
+        # As if cities.json had been bumped since the last start.
+        await memory_db[META_COLLECTION].update_one({"_id": META_ID}, {"$set": {"collections.cities.checksum": "old"}})
+        changed = await seed_database(memory_db)
+        return changed, await memory_db.cities.find_one({"id": edited}), await memory_db.cities.count_documents({})
+
+    changed, edited, count = asyncio.run(scenario())
+    assert changed == {"cities": 1}
+    assert edited["name"] == "Edited"
+    assert count == len(seed["cities"])
@@ -0,0 +1,37 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client(server):
+    with TestClient(server.app) as client:
+        yield client
+
+
+def test_batch_resolves_pairs_in_request_order(server, client):
+    snapshot = server.catalog.snapshot
+    service, city = snapshot.services[0]["slug"], snapshot.cities[0]["slug"]
+    pairs = [
+        {"service_slug": service, "city_slug": city},
+        {"service_slug": "no-such-service", "city_slug": city},
+        {"service_slug": service, "city_slug": "atlantis"},
+        {"service_slug": service, "city_slug": city},
+    ]
+    response = client.post("/api/service-city/batch", json={"pairs": pairs})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["service_slug"], r["city_slug"], r["found"]) for r in results] == [
+        (p["service_slug"], p["city_slug"], i in (0, 3)) for i, p in enumerate(pairs)
+    ]
+    assert results[1] == {**pairs[1], "found": False, "error": "Service not found", "page": None}
+    assert results[2]["error"] == "City not found"
+    single = client.get(f"/api/service-city/{service}/{city}")
+    assert results[0]["page"] == json.loads(single.content)
+
+
+def test_batch_size_is_capped(server, client):
+    pair = {"service_slug": "a", "city_slug": "b"}
+    response = client.post("/api/service-city/batch", json={"pairs": [pair] * (server.SERVICE_CITY_BATCH_MAX + 1)})
+    assert response.status_code == 400
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from singleflight import NegativeCache, SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return object()
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("catalog", load) for _ in range(10)))
+        again = await flight.do("catalog", load)
+        return flight.stats(), results, again
+
+    stats, results, again = asyncio.run(scenario())
+    assert all(r is results[0] for r in results) and again is not results[0]
+    assert len(calls) == 2
+    assert stats == {"calls": 11, "executions": 2, "coalesced": 9, "errors": 0, "in_flight": 0}
+
+
+def test_different_keys_do_not_coalesce():
+    async def scenario():
+        flight = SingleFlight()
+        await asyncio.gather(flight.do("a", lambda: asyncio.sleep(0.01)), flight.do("b", lambda: asyncio.sleep(0.01)))
+        return flight.stats()
+
+    assert asyncio.run(scenario())["executions"] == 2
+
+
+def test_the_error_reaches_every_waiter():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ConnectionError("mongo down")
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+        return flight.stats(), results
+
+    stats, results = asyncio.run(scenario())
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert stats["executions"] == 1 and stats["errors"] == 1
+
+
+def test_a_cancelled_caller_does_not_cancel_the_others():
+    async def load():
+        await asyncio.sleep(0.05)
+        return "loaded"
+
+    async def scenario():
+        flight = SingleFlight()
+        impatient = asyncio.create_task(flight.do("k", load))
+        patient = asyncio.create_task(flight.do("k", load))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        return await patient
+
+    assert asyncio.run(scenario()) == "loaded"
+
+
+def test_negative_cache_expires_and_is_bounded(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("singleflight.time.monotonic", lambda: now[0])
+    cache = NegativeCache(ttl=30, max_entries=2)
+    cache.add("a")
+    assert "a" in cache
+    now[0] += 30
+    assert "a" not in cache
+    for key in ("b", "c", "d"):
+        cache.add(key)
+    assert "b" not in cache and "c" in cache and "d" in cache
+    assert cache.stats()["entries"] == 2
@@ -0,0 +1,60 @@
+import asyncio
+import gzip
+import re
+
+from sitemap import SitemapBuilder, count_paths, iter_paths
+
+LOC = re.compile(rb"<loc>([^<]+)</loc>")
+
+
+def test_shards_cover_every_path_once(snapshot):
+    builder = SitemapBuilder("https://example.com/", shard_size=100)
+    total = count_paths(snapshot)
+    assert builder.shard_count(snapshot) == -(-total // 100)
+    assert not builder.has_shard(snapshot, builder.shard_count(snapshot))
+
+    urls = []
+    for shard in range(builder.shard_count(snapshot)):
+        locs = LOC.findall(b"".join(builder.iter_shard_xml(snapshot, shard)))
+        assert 0 < len(locs) <= 100
+        urls.extend(locs)
+    assert len(urls) == total
+    assert urls == [f"https://example.com{path}".encode() for path in iter_paths(snapshot)]
+
+
+def test_index_points_at_the_api_url(snapshot):
+    builder = SitemapBuilder("https://example.com", shard_size=100, api_url="https://api.example.com")
+    index = b"".join(builder.iter_index(snapshot, gzipped=True))
+    locs = LOC.findall(index)
+    assert len(locs) == builder.shard_count(snapshot)
+    assert locs[0] == b"https://api.example.com/api/sitemap-0.xml.gz"
+
+
+def test_gzip_shard_is_built_once_and_streams_back_as_xml(snapshot):
+    builder = SitemapBuilder("https://example.com", shard_size=100)
+
+    async def scenario():
+        shards = await asyncio.gather(*(builder.shard_gzip(snapshot, 1) for _ in range(10)))
+        streamed = b"".join([chunk async for chunk in builder.iter_shard(snapshot, 1)])
+        return shards, streamed
+
+    shards, streamed = asyncio.run(scenario())
+    expected = b"".join(builder.iter_shard_xml(snapshot, 1))
+    assert all(shard is shards[0] for shard in shards)
+    assert gzip.decompress(shards[0]) == expected and streamed == expected
+    stats = builder.stats()
+    assert stats["shard_builds"] == 1 and stats["cached_shards"] == 1
+    assert stats["single_flight"]["coalesced"] == 9 and stats["cache_hits"] == 1
+
+
+def test_invalidate_drops_cached_shards(snapshot):
+    builder = SitemapBuilder("https://example.com", shard_size=100)
+
+    async def scenario():
+        await builder.shard_gzip(snapshot, 0)
+        builder.invalidate(snapshot, snapshot)
+        assert builder.stats()["cached_shards"] == 0
+        await builder.shard_gzip(snapshot, 0)
+
+    asyncio.run(scenario())
+    assert builder.stats()["shard_builds"] == 2